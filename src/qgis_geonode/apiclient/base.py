@@ -1,3 +1,4 @@
+import dataclasses
 import typing
 from functools import partial
 
@@ -11,25 +12,134 @@ from .. import (
     conf,
     network,
 )
+from .. import styles as geonode_styles
+from ..catalog import (
+    LocalCatalog,
+    get_local_catalog,
+)
+from ..dataset_cache import (
+    DatasetDetailCache,
+    get_dataset_cache,
+)
+from ..scheduler import get_request_scheduler
+from ..style_cache import (
+    CachedStyle,
+    StyleCache,
+    get_style_cache,
+)
 
 from ..tasks import network_task
 from . import models
+from .keywords import (
+    KeywordTrie,
+    KeywordVocabulary,
+    KeywordVocabularyCache,
+    get_keyword_vocabulary_cache,
+)
 from .models import GeonodeApiSearchFilters
+from .search_cache import (
+    SearchCacheKey,
+    SearchPage,
+    SearchPageCache,
+    get_search_page_cache,
+)
 from ..utils import log
 
+# number of times a prefetch is postponed because the remote is busy, before giving up
+_MAX_PREFETCH_ATTEMPTS = 3
+_PREFETCH_BACKOFF_DELAY = 1000  # milliseconds
+
+
+class ClientOperation(QtCore.QObject):
+    """Handle of a single call made through an API client
+
+    Each call gets its own handle, which owns the network task that performs the
+    call. Handlers read the responses from the handle rather than from the client,
+    so several calls may be in flight on the same client at once. The outcome of
+    the call is reported through the handle's own signals, in addition to the
+    signals of the client.
+
+    """
+
+    result_received = QtCore.pyqtSignal(object)
+    error_received = QtCore.pyqtSignal(str, int, str)
+
+    description: str
+    task: typing.Optional[qgis.core.QgsTask]
+    result: typing.Optional[typing.Any]
+    error_message: typing.Optional[str]
+    done: bool
+
+    def __init__(self, description: str):
+        super().__init__()
+        self.description = description
+        self.task = None
+        self.result = None
+        self.error_message = None
+        self.done = False
+
+    @property
+    def response_contents(
+        self,
+    ) -> typing.List[typing.Optional[network.ParsedNetworkReply]]:
+        return getattr(self.task, "response_contents", [])
+
+    @property
+    def processed_response(self) -> typing.Optional[typing.Any]:
+        return getattr(self.task, "processed_response", None)
+
+    def start(self, task: qgis.core.QgsTask) -> None:
+        """Run the input task on behalf of this operation"""
+        self.task = task
+        qgis.core.QgsApplication.taskManager().addTask(task)
+
+    def cancel(self) -> bool:
+        """Cancel the operation without reporting its outcome
+
+        Returns whether its task was still running.
+
+        """
+
+        self.done = True
+        return _cancel_task(self.task)
+
+    def resolve(self, result: typing.Optional[typing.Any] = None) -> None:
+        if not self.done:
+            self.done = True
+            self.result = result
+            self.result_received.emit(result)
+
+    def reject(
+        self, message: str, http_status_code: int = 0, http_status_reason: str = ""
+    ) -> None:
+        if not self.done:
+            self.done = True
+            self.error_message = message
+            self.error_received.emit(message, http_status_code, http_status_reason)
+
 
 class BaseGeonodeClient(QtCore.QObject):
     auth_config: str
     base_url: str
-    network_fetcher_task: typing.Optional[network_task.NetworkRequestTask]
     capabilities: typing.List[models.ApiClientCapability]
     page_size: int
     wfs_version: conf.WfsVersion
     network_requests_timeout: int
+    search_cache: SearchPageCache
+    local_catalog: typing.Optional[LocalCatalog]
+    keyword_cache: KeywordVocabularyCache
+    dataset_cache: DatasetDetailCache
+    style_cache: StyleCache
+    _current_search_filters: typing.Optional[GeonodeApiSearchFilters]
+    _dataset_list_operation: typing.Optional[ClientOperation]
+    _keyword_operation: typing.Optional[ClientOperation]
+    _operations: typing.Set[ClientOperation]
+    _prefetch_tasks: typing.Dict[str, network_task.NetworkRequestTask]
 
     dataset_list_received = QtCore.pyqtSignal(list, models.GeonodePaginationInfo)
     dataset_detail_received = QtCore.pyqtSignal(object)
     dataset_detail_error_received = QtCore.pyqtSignal([str], [str, int, str])
+    dataset_details_received = QtCore.pyqtSignal(models.DatasetDetails)
     style_detail_received = QtCore.pyqtSignal(QtXml.QDomElement)
     style_detail_error_received = QtCore.pyqtSignal([str], [str, int, str])
     keyword_list_received = QtCore.pyqtSignal(list)
@@ -44,6 +154,7 @@ class BaseGeonodeClient(QtCore.QObject):
         wfs_version: conf.WfsVersion,
         network_requests_timeout: int,
         auth_config: typing.Optional[str] = None,
+        local_catalog: typing.Optional[LocalCatalog] = None,
     ):
         super().__init__()
         self.auth_config = auth_config or ""
@@ -51,18 +162,102 @@ class BaseGeonodeClient(QtCore.QObject):
         self.page_size = page_size
         self.wfs_version = wfs_version
         self.network_requests_timeout = network_requests_timeout
-        self.network_fetcher_task = None
+        self.search_cache = get_search_page_cache()
+        self.local_catalog = local_catalog
+        if local_catalog is not None:
+            # the extents of harvested datasets are indexed by the local catalog
+            self.capabilities = [
+                *self.capabilities,
+                models.ApiClientCapability.FILTER_BY_SPATIAL_EXTENT,
+            ]
+        self.keyword_cache = get_keyword_vocabulary_cache()
+        self.dataset_cache = get_dataset_cache()
+        self.style_cache = get_style_cache()
+        self._current_search_filters = None
+        self._dataset_list_operation = None
+        self._keyword_operation = None
+        self._operations = set()
+        self._prefetch_tasks = {}
 
     @classmethod
     def from_connection_settings(cls, connection_settings: conf.ConnectionSettings):
+        if connection_settings.local_catalog:
+            local_catalog = get_local_catalog(
+                connection_settings.id, connection_settings.auth_config
+            )
+        else:
+            local_catalog = None
         return cls(
             base_url=connection_settings.base_url,
             page_size=connection_settings.page_size,
             wfs_version=connection_settings.wfs_version,
             auth_config=connection_settings.auth_config,
             network_requests_timeout=connection_settings.network_requests_timeout,
+            local_catalog=local_catalog,
         )
 
+    def cancel_pending_requests(self) -> bool:
+        """Cancel the ongoing search and prefetching, without handling their outcome
+
+        Other operations are cancelled through their own handles.
+
+        Returns whether a search was in progress.
+
+        """
+
+        search_cancelled = (
+            self._dataset_list_operation is not None
+            and self._dataset_list_operation.cancel()
+        )
+        self._cancel_prefetching()
+        self._dataset_list_operation = None
+        return search_cancelled
+
+    def _start_operation(self, description: str) -> ClientOperation:
+        # keep a reference to pending operations, so that they are not garbage
+        # collected before their outcome is known
+        self._operations = {op for op in self._operations if not op.done}
+        operation = ClientOperation(description)
+        self._operations.add(operation)
+        return operation
+
+    def _emit_error(
+        self,
+        operation: ClientOperation,
+        error_signal: QtCore.pyqtBoundSignal,
+        message: str,
+        http_status_code: typing.Optional[int] = None,
+        http_status_reason: typing.Optional[str] = None,
+    ) -> None:
+        if http_status_code is None:
+            error_signal[str].emit(message)
+        else:
+            error_signal[str, int, str].emit(
+                message, http_status_code, http_status_reason
+            )
+        operation.reject(message, http_status_code or 0, http_status_reason or "")
+
+    def _emit_dataset_list(
+        self,
+        operation: ClientOperation,
+        brief_datasets: typing.List[models.BriefDataset],
+        pagination_info: models.GeonodePaginationInfo,
+    ) -> None:
+        self.dataset_list_received.emit(brief_datasets, pagination_info)
+        operation.resolve((brief_datasets, pagination_info))
+
+    def _emit_dataset_detail(
+        self, operation: ClientOperation, dataset: models.Dataset
+    ) -> None:
+        self.dataset_detail_received.emit(dataset)
+        operation.resolve(dataset)
+
+    def _emit_dataset_details(
+        self, operation: ClientOperation, details: models.DatasetDetails
+    ) -> None:
+        self.dataset_details_received.emit(details)
+        operation.resolve(details)
+
     def get_ordering_fields(self) -> typing.List[typing.Tuple[str, str]]:
         raise NotImplementedError
 
@@ -77,46 +272,569 @@ class BaseGeonodeClient(QtCore.QObject):
     def get_dataset_upload_url(self) -> QtCore.QUrl:
         raise NotImplementedError
 
-    def get_dataset_list(self, search_filters: GeonodeApiSearchFilters) -> None:
-        self.network_fetcher_task = network_task.NetworkRequestTask(
-            [network.RequestToPerform(url=self.get_dataset_list_url(search_filters))],
+    def get_dataset_list(
+        self, search_filters: GeonodeApiSearchFilters, force_refresh: bool = False
+    ) -> ClientOperation:
+        """Search for datasets, emitting `dataset_list_received` with the results
+
+        Recent results are served from the search cache straight away. If they are
+        stale, the search is performed again in the background and the results are
+        emitted a second time, but only if they have changed. This second emission
+        is done solely through the `dataset_list_received` signal, as the returned
+        operation has already been resolved by then.
+
+        Connections that keep a local catalog answer searches from it, once it has
+        been harvested. Setting `force_refresh` skips both the local catalog and the
+        search cache.
+
+        """
+
+        # results of an older search are not going to be shown anymore
+        if self._dataset_list_operation is not None:
+            self._dataset_list_operation.cancel()
+        operation = self._start_operation("Get dataset list")
+        self._dataset_list_operation = operation
+        self._current_search_filters = search_filters
+        url = self.get_dataset_list_url(search_filters)
+        # an ongoing prefetch of the requested page is joined by the new request
+        self._cancel_prefetching(keep=url.toString())
+        if force_refresh:
+            local_page = None
+            cached_page = None
+        else:
+            local_page = self._search_local_catalog(search_filters)
+            cached_page = self.search_cache.get(self._get_search_cache_key(url))
+        if local_page is not None:
+            self._emit_dataset_list(operation, *local_page)
+        elif cached_page is None:
+            self._fetch_dataset_list(operation, url)
+        else:
+            self._emit_dataset_list(
+                operation, cached_page.brief_datasets, cached_page.pagination_info
+            )
+            if self.search_cache.is_stale(cached_page):
+                task = self._create_dataset_list_task(url)
+                task.task_done.connect(
+                    partial(self._handle_revalidated_dataset_list, task, cached_page)
+                )
+                operation.start(task)
+        return operation
+
+    def _fetch_dataset_list(self, operation: ClientOperation, url: QtCore.QUrl) -> None:
+        task = self._create_dataset_list_task(url)
+        task.task_done.connect(partial(self.handle_dataset_list, operation))
+        operation.start(task)
+
+    def _create_dataset_list_task(
+        self, url: QtCore.QUrl
+    ) -> network_task.NetworkRequestTask:
+        task = network_task.NetworkRequestTask(
+            [
+                network.RequestToPerform(
+                    url=url, operation=network.RequestOperation.SEARCH
+                )
+            ],
             self.network_requests_timeout,
             self.auth_config,
             description="Get dataset list",
+            response_handler=self.parse_dataset_list,
+        )
+        task.task_done.connect(partial(self._cache_dataset_list, task, url))
+        return task
+
+    def _handle_revalidated_dataset_list(
+        self,
+        task: network_task.NetworkRequestTask,
+        cached_page: SearchPage,
+        result: bool,
+    ) -> None:
+        """Show the results of a search that was repeated because they were stale"""
+        if result and task.processed_response is not None:
+            brief_datasets, pagination_info = task.processed_response
+            if (brief_datasets, pagination_info) != (
+                cached_page.brief_datasets,
+                cached_page.pagination_info,
+            ):
+                self.dataset_list_received.emit(brief_datasets, pagination_info)
+        else:
+            log("Could not revalidate cached search results, keeping them")
+
+    def _search_local_catalog(
+        self, search_filters: GeonodeApiSearchFilters
+    ) -> typing.Optional[
+        typing.Tuple[typing.List[models.BriefDataset], models.GeonodePaginationInfo]
+    ]:
+        """Answer a search from the local catalog, if it has been harvested"""
+        return None
+
+    def get_catalog_harvest_url(
+        self, watermark: typing.Optional[str], page: int
+    ) -> QtCore.QUrl:
+        raise NotImplementedError
+
+    def store_catalog_page(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[typing.Tuple[typing.Optional[str], bool, typing.List[int]]]:
+        """Store a page of harvested datasets in the local catalog
+
+        This runs on the harvesting task's worker thread. Returns the newest
+        `last_updated` value found in the page, whether there are more pages to
+        harvest and the primary keys of the stored datasets, or `None` if the
+        response could not be used.
+
+        """
+
+        raise NotImplementedError
+
+    def sync_local_catalog(self) -> typing.Optional[ClientOperation]:
+        """Harvest the datasets that changed since the local catalog was last synced
+
+        Pages are requested with the lowest priority, so that harvesting does not
+        delay requests made on behalf of the user. The sync watermark is moved
+        forward only once all pages have been stored, so an interrupted harvest is
+        picked up again on the next sync. When the catalog is due for reconciliation,
+        the whole remote catalog is harvested instead, and the datasets that it no
+        longer includes are dropped once all pages have been stored.
+
+        Returns `None` if the connection does not keep a local catalog or if it is
+        already being synced.
+
+        """
+
+        if self.local_catalog is None or self.local_catalog.harvesting:
+            result = None
+        else:
+            result = self._start_operation("Sync local catalog")
+            self.local_catalog.harvesting = True
+            if self.local_catalog.needs_reconciliation:
+                watermark = None
+                harvested_pks = set()
+            else:
+                watermark = self.local_catalog.sync_watermark
+                harvested_pks = None
+            self._harvest_catalog_page(result, watermark, watermark, 1, harvested_pks)
+        return result
+
+    def _harvest_catalog_page(
+        self,
+        operation: ClientOperation,
+        watermark: typing.Optional[str],
+        newest: typing.Optional[str],
+        page: int,
+        harvested_pks: typing.Optional[typing.Set[int]],
+    ) -> None:
+        task = network_task.NetworkRequestTask(
+            [
+                network.RequestToPerform(
+                    url=self.get_catalog_harvest_url(watermark, page),
+                    priority=network.RequestPriority.PREFETCH,
+                    operation=network.RequestOperation.PREFETCH,
+                )
+            ],
+            self.network_requests_timeout,
+            self.auth_config,
+            description="Sync local catalog",
+            response_handler=self.store_catalog_page,
+        )
+        task.task_done.connect(
+            partial(
+                self.handle_catalog_page,
+                operation,
+                watermark,
+                newest,
+                page,
+                harvested_pks,
+            )
+        )
+        operation.start(task)
+
+    def handle_catalog_page(
+        self,
+        operation: ClientOperation,
+        watermark: typing.Optional[str],
+        newest: typing.Optional[str],
+        page: int,
+        harvested_pks: typing.Optional[typing.Set[int]],
+        task_result: bool,
+    ) -> None:
+        harvested = operation.processed_response if task_result else None
+        if operation.done:
+            self.local_catalog.harvesting = False
+        elif harvested is None:
+            self.local_catalog.harvesting = False
+            log(f"Could not sync the local catalog of {self.base_url!r}")
+            operation.reject("Could not sync the local catalog")
+        else:
+            page_newest, has_more_pages, page_pks = harvested
+            if page_newest is not None and (newest is None or page_newest > newest):
+                newest = page_newest
+            if harvested_pks is not None:
+                harvested_pks.update(page_pks)
+            if has_more_pages:
+                self._harvest_catalog_page(
+                    operation, watermark, newest, page + 1, harvested_pks
+                )
+            else:
+                self.local_catalog.harvesting = False
+                if harvested_pks is not None:
+                    dropped = self.local_catalog.reconcile(harvested_pks)
+                    log(f"Dropped {dropped} datasets missing from {self.base_url!r}")
+                # an empty watermark marks an empty remote as being synced
+                self.local_catalog.set_sync_watermark(newest or "")
+                operation.resolve(self.local_catalog.count())
+
+    def get_keyword_list_url(self, page: int) -> QtCore.QUrl:
+        raise NotImplementedError
+
+    def parse_keyword_page(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[typing.Tuple[typing.List[str], bool]]:
+        """Extract the keywords of a page of the remote's keyword vocabulary
+
+        This runs on the task's worker thread. Returns the keywords and whether there
+        are more pages to fetch, or `None` if the response could not be used.
+
+        """
+
+        raise NotImplementedError
+
+    @property
+    def keyword_vocabulary(self) -> typing.Optional[KeywordTrie]:
+        """Keywords known to the remote, if they have been fetched recently"""
+        vocabulary = self.keyword_cache.get((self.base_url, self.auth_config))
+        return vocabulary.keywords if vocabulary is not None else None
+
+    def get_keyword_list(self) -> ClientOperation:
+        """Fetch the remote's keyword vocabulary, emitting `keyword_list_received`
+
+        All pages of the vocabulary are fetched in the background, with the lowest
+        priority. Vocabularies are cached for a while, and a fetch that is already
+        in progress is joined rather than repeated.
+
+        """
+
+        if self._keyword_operation is not None and not self._keyword_operation.done:
+            result = self._keyword_operation
+        else:
+            result = self._start_operation("Get keyword list")
+            vocabulary = self.keyword_vocabulary
+            if vocabulary is not None:
+                self._emit_keyword_list(result, vocabulary)
+            else:
+                self._keyword_operation = result
+                self._fetch_keyword_page(result, [], 1)
+        return result
+
+    def _fetch_keyword_page(
+        self, operation: ClientOperation, keywords: typing.List[str], page: int
+    ) -> None:
+        task = network_task.NetworkRequestTask(
+            [
+                network.RequestToPerform(
+                    url=self.get_keyword_list_url(page),
+                    priority=network.RequestPriority.PREFETCH,
+                    operation=network.RequestOperation.PREFETCH,
+                )
+            ],
+            self.network_requests_timeout,
+            self.auth_config,
+            description="Get keyword list",
+            response_handler=self.parse_keyword_page,
         )
-        self.network_fetcher_task.task_done.connect(self.handle_dataset_list)
-        qgis.core.QgsApplication.taskManager().addTask(self.network_fetcher_task)
+        task.task_done.connect(
+            partial(self.handle_keyword_page, operation, keywords, page)
+        )
+        operation.start(task)
+
+    def handle_keyword_page(
+        self,
+        operation: ClientOperation,
+        keywords: typing.List[str],
+        page: int,
+        task_result: bool,
+    ) -> None:
+        keyword_page = operation.processed_response if task_result else None
+        if operation.done:
+            pass
+        elif keyword_page is None:
+            log(f"Could not retrieve the keywords of {self.base_url!r}")
+            operation.reject("Could not retrieve the keyword list")
+        else:
+            page_keywords, has_more_pages = keyword_page
+            keywords.extend(page_keywords)
+            if has_more_pages:
+                self._fetch_keyword_page(operation, keywords, page + 1)
+            else:
+                vocabulary = KeywordTrie(keywords)
+                self.keyword_cache.store(
+                    (self.base_url, self.auth_config), KeywordVocabulary(vocabulary)
+                )
+                self._emit_keyword_list(operation, vocabulary)
+
+    def _emit_keyword_list(
+        self, operation: ClientOperation, vocabulary: KeywordTrie
+    ) -> None:
+        keywords = vocabulary.complete("")
+        self.keyword_list_received.emit(keywords)
+        operation.resolve(keywords)
+
+    def prefetch_adjacent_pages(
+        self, pagination_info: models.GeonodePaginationInfo
+    ) -> None:
+        """Fetch the pages next to the one being shown, in the background
+
+        This is meant to be called once a page of search results has been rendered.
+        Prefetched pages go into the search cache, from where they are served when
+        the user moves to them.
+
+        """
+
+        cache_settings = conf.settings_manager.get_search_cache_settings()
+        current_page = pagination_info.current_page
+        pages = []
+        if (
+            cache_settings.prefetch_next_page
+            and current_page < pagination_info.total_pages
+        ):
+            pages.append(current_page + 1)
+        if cache_settings.prefetch_previous_page and current_page > 1:
+            pages.append(current_page - 1)
+        # pages of a harvested local catalog are answered locally anyway
+        catalog_synced = self.local_catalog is not None and self.local_catalog.is_synced
+        if self._current_search_filters is not None and not catalog_synced:
+            for page in pages:
+                self._prefetch_page(
+                    dataclasses.replace(self._current_search_filters, page=page)
+                )
+
+    def _prefetch_page(
+        self, search_filters: GeonodeApiSearchFilters, attempt: int = 0
+    ) -> None:
+        current_filters = self._current_search_filters
+        is_current_search = current_filters is not None and search_filters == (
+            dataclasses.replace(current_filters, page=search_filters.page)
+        )
+        url = self.get_dataset_list_url(search_filters)
+        if not is_current_search:
+            pass  # the user has moved on to another search in the meantime
+        elif url.toString() in self._prefetch_tasks:
+            pass
+        elif self._has_fresh_search_page(url):
+            pass
+        elif get_request_scheduler().is_busy(url.host()):
+            # prefetching must not delay requests made on behalf of the user
+            if attempt < _MAX_PREFETCH_ATTEMPTS:
+                QtCore.QTimer.singleShot(
+                    _PREFETCH_BACKOFF_DELAY * 2**attempt,
+                    partial(self._prefetch_page, search_filters, attempt + 1),
+                )
+        else:
+            task = network_task.NetworkRequestTask(
+                [
+                    network.RequestToPerform(
+                        url=url,
+                        priority=network.RequestPriority.PREFETCH,
+                        operation=network.RequestOperation.PREFETCH,
+                    )
+                ],
+                self.network_requests_timeout,
+                self.auth_config,
+                description="Prefetch dataset list",
+                response_handler=self.parse_dataset_list,
+            )
+            task.task_done.connect(partial(self._handle_prefetched_page, task, url))
+            self._prefetch_tasks[url.toString()] = task
+            qgis.core.QgsApplication.taskManager().addTask(task)
+
+    def _handle_prefetched_page(
+        self, task: network_task.NetworkRequestTask, url: QtCore.QUrl, result: bool
+    ) -> None:
+        self._prefetch_tasks.pop(url.toString(), None)
+        self._cache_dataset_list(task, url, result)
+
+    def _cancel_prefetching(self, keep: typing.Optional[str] = None) -> None:
+        for url, task in list(self._prefetch_tasks.items()):
+            if url != keep:
+                _cancel_task(task)
+                del self._prefetch_tasks[url]
+
+    def _cache_dataset_list(
+        self, task: network_task.NetworkRequestTask, url: QtCore.QUrl, result: bool
+    ) -> None:
+        if result and task.processed_response is not None:
+            brief_datasets, pagination_info = task.processed_response
+            self.search_cache.store(
+                self._get_search_cache_key(url),
+                SearchPage(brief_datasets, pagination_info),
+            )
+
+    def _has_fresh_search_page(self, url: QtCore.QUrl) -> bool:
+        cached_page = self.search_cache.get(self._get_search_cache_key(url))
+        return cached_page is not None and not self.search_cache.is_stale(cached_page)
+
+    def _get_search_cache_key(self, url: QtCore.QUrl) -> SearchCacheKey:
+        return self.base_url, self.auth_config, url.toString()
+
+    def parse_dataset_list(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[
+        typing.Tuple[typing.List[models.BriefDataset], models.GeonodePaginationInfo]
+    ]:
+        """Build the list of datasets out of the responses of a search task
 
-    def handle_dataset_list(self, result: bool):
+        This runs on the task's worker thread, so it must not touch any GUI object nor
+        emit any of this client's signals. Returning `None` means the response is to
+        be handled on the main thread instead, by `handle_dataset_list`.
+
+        """
+
+        return None
+
+    def handle_dataset_list(self, operation: ClientOperation, result: bool):
         """Handle the list of datasets returned by the remote
 
-        This must emit the `dataset_list_received` signal.
+        This must emit the `dataset_list_received` signal and resolve the operation.
         """
         raise NotImplementedError
 
     def get_dataset_style(
-        self, dataset: models.Dataset, emit_dataset_detail_received: bool = False
+        self,
+        dataset: models.Dataset,
+        emit_dataset_detail_received: bool = False,
+        operation: typing.Optional[ClientOperation] = None,
+        force_revalidation: bool = False,
+    ) -> ClientOperation:
+        """Retrieve the SLD of the dataset's default style
+
+        An existing `operation` may be passed in, in order to retrieve the style as
+        one more step of it.
+
+        Styles retrieved recently are served from the style cache. Older cached
+        styles are revalidated with the remote, which only sends the style again if
+        it has changed. Setting `force_revalidation` revalidates the cached style
+        even if it is recent.
+
+        """
+
+        if operation is None:
+            operation = self._start_operation("Get dataset style")
+        sld_url = dataset.default_style.sld_url
+        cached_style = self.style_cache.get(sld_url, self.auth_config)
+        if (
+            not force_revalidation
+            and cached_style is not None
+            and self.style_cache.is_fresh(cached_style)
+        ):
+            self._emit_later(
+                self._emit_cached_style,
+                operation,
+                dataset,
+                cached_style,
+                emit_dataset_detail_received,
+            )
+        else:
+            self._fetch_dataset_style(operation, dataset, emit_dataset_detail_received)
+        return operation
+
+    def _fetch_dataset_style(
+        self,
+        operation: ClientOperation,
+        dataset: models.Dataset,
+        emit_dataset_detail_received: bool,
+        revalidate: bool = True,
     ) -> None:
-        self.network_fetcher_task = network_task.NetworkRequestTask(
-            [network.RequestToPerform(QtCore.QUrl(dataset.default_style.sld_url))],
+        task = network_task.NetworkRequestTask(
+            [self._create_style_request(dataset.default_style.sld_url, revalidate)],
             self.network_requests_timeout,
             self.auth_config,
             description="Get dataset style",
         )
-        self.network_fetcher_task.task_done.connect(
+        task.task_done.connect(
             partial(
                 self.handle_dataset_style,
+                operation,
                 dataset,
                 emit_dataset_detail_received=emit_dataset_detail_received,
             )
         )
-        qgis.core.QgsApplication.taskManager().addTask(self.network_fetcher_task)
+        operation.start(task)
+
+    def _create_style_request(
+        self, sld_url: str, revalidate: bool = True
+    ) -> network.RequestToPerform:
+        """Prepare the request for an SLD style
+
+        When `revalidate` is set and the style is cached, the remote is asked to only
+        send the style if it has changed since it was cached.
+
+        """
+
+        cached_style = self.style_cache.get(sld_url, self.auth_config)
+        return network.RequestToPerform(
+            QtCore.QUrl(sld_url),
+            priority=network.RequestPriority.DETAIL,
+            streamed=True,
+            operation=network.RequestOperation.STYLE,
+            etag=(
+                cached_style.etag if revalidate and cached_style is not None else None
+            ),
+        )
+
+    def _has_fresh_style(self, sld_url: str) -> bool:
+        cached_style = self.style_cache.get(sld_url, self.auth_config)
+        return cached_style is not None and self.style_cache.is_fresh(cached_style)
+
+    def _emit_cached_style(
+        self,
+        operation: ClientOperation,
+        dataset: models.Dataset,
+        cached_style: CachedStyle,
+        emit_dataset_detail_received: bool,
+    ) -> None:
+        # the cached element has already been cleaned up, it just needs parsing
+        sld_named_layer, error_message = geonode_styles.deserialize_sld_named_layer(
+            cached_style.named_layer
+        )
+        self._emit_dataset_style(
+            operation,
+            dataset,
+            sld_named_layer,
+            error_message,
+            emit_dataset_detail_received,
+        )
+
+    def _emit_dataset_style(
+        self,
+        operation: ClientOperation,
+        dataset: models.Dataset,
+        sld_named_layer: typing.Optional[QtXml.QDomElement],
+        error_message: str,
+        emit_dataset_detail_received: bool,
+    ) -> None:
+        if sld_named_layer is None:
+            message = f"Could not load SLD: {error_message}"
+            log(
+                f"{message}. Dataset {dataset.pk!r} is used without its style",
+                debug=False,
+            )
+            self.style_detail_error_received[str].emit(message)
+        dataset.default_style.sld = sld_named_layer
+        # the dataset is still usable without its style
+        if emit_dataset_detail_received:
+            self._emit_dataset_detail(operation, dataset)
+        else:
+            operation.resolve(dataset)
 
     def handle_dataset_style(
         self,
+        operation: ClientOperation,
         dataset: models.Dataset,
         task_result: bool,
         emit_dataset_detail_received: typing.Optional[bool] = False,
+        contents_index: int = 0,
     ) -> None:
         raise NotImplementedError
 
@@ -125,7 +843,15 @@ class BaseGeonodeClient(QtCore.QObject):
         dataset: typing.Union[models.BriefDataset, models.Dataset],
         get_style_too: bool = False,
         authenticated: bool = False,
-    ) -> None:
+        force_refresh: bool = False,
+    ) -> ClientOperation:
+        """Retrieve the details of a dataset, and optionally its style
+
+        Details retrieved recently are served from the dataset cache, in which case
+        only the style may need to be requested. Setting `force_refresh` skips the
+        cache and asks the remote.
+
+        """
 
         auth_manager = qgis.core.QgsApplication.authManager()
         auth_provider_name = auth_manager.configAuthMethodKey(self.auth_config).lower()
@@ -133,42 +859,171 @@ class BaseGeonodeClient(QtCore.QObject):
         if auth_provider_name == "basic":
             authenticated = True
 
-        self.network_fetcher_task = network_task.NetworkRequestTask(
-            [network.RequestToPerform(url=self.get_dataset_detail_url(dataset.pk))],
+        if force_refresh:
+            cached_dataset = None
+        else:
+            cached_dataset = self._get_cached_dataset(dataset.pk)
+        if cached_dataset is not None:
+            operation = self._start_operation("Get dataset detail")
+            if get_style_too and authenticated and self._can_load_style(cached_dataset):
+                self.get_dataset_style(
+                    cached_dataset,
+                    emit_dataset_detail_received=True,
+                    operation=operation,
+                )
+            else:
+                self._emit_later(self._emit_dataset_detail, operation, cached_dataset)
+        else:
+            operation = self._fetch_dataset_detail(
+                dataset, get_style_too, authenticated
+            )
+        return operation
+
+    def _fetch_dataset_detail(
+        self,
+        dataset: typing.Union[models.BriefDataset, models.Dataset],
+        get_style_too: bool,
+        authenticated: bool,
+    ) -> ClientOperation:
+        requests_to_perform = [
+            network.RequestToPerform(
+                url=self.get_dataset_detail_url(dataset.pk),
+                priority=network.RequestPriority.DETAIL,
+                operation=network.RequestOperation.DETAIL,
+            )
+        ]
+        sld_url = dataset.default_style.sld_url
+        if (
+            get_style_too
+            and authenticated
+            and sld_url
+            and self._can_load_style(dataset)
+            and not self._has_fresh_style(sld_url)
+        ):
+            # the SLD URL is already known, no need to wait for the detail response
+            requests_to_perform.append(self._create_style_request(sld_url))
+        operation = self._start_operation("Get dataset detail")
+        task = network_task.NetworkRequestTask(
+            requests_to_perform,
             self.network_requests_timeout,
             self.auth_config,
             description="Get dataset detail",
+            response_handler=self.parse_dataset_detail,
         )
-        self.network_fetcher_task.task_done.connect(
+        task.task_done.connect(
             partial(
                 self.handle_dataset_detail,
+                operation,
                 get_style_too=get_style_too,
                 authenticated=authenticated,
             )
         )
-        qgis.core.QgsApplication.taskManager().addTask(self.network_fetcher_task)
+        operation.start(task)
+        return operation
+
+    def _get_cached_dataset(self, dataset_id: int) -> typing.Optional[models.Dataset]:
+        return self.dataset_cache.get(self.base_url, self.auth_config, dataset_id)
+
+    def forget_dataset(self, dataset_id: int) -> None:
+        """Drop the cached details of a dataset that has been modified remotely"""
+        self.dataset_cache.invalidate(self.base_url, self.auth_config, dataset_id)
+
+    def forget_style(self, sld_url: str) -> None:
+        """Drop a cached style that has been replaced remotely"""
+        self.style_cache.invalidate(sld_url, self.auth_config)
+
+    def _emit_later(self, emitter: typing.Callable, *args) -> None:
+        """Emit an already known result on the next iteration of the event loop
+
+        Otherwise the result would be emitted before the caller has had the chance
+        to connect to the operation's signals.
 
-    def handle_dataset_detail(self, result: bool):
+        """
+
+        QtCore.QTimer.singleShot(0, partial(emitter, *args))
+
+    def _can_load_style(
+        self, dataset: typing.Union[models.BriefDataset, models.Dataset]
+    ) -> bool:
+        return (
+            dataset.dataset_sub_type == models.GeonodeResourceType.VECTOR_LAYER
+            and models.ApiClientCapability.LOAD_VECTOR_LAYER_STYLE in self.capabilities
+        )
+
+    def parse_dataset_detail(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[models.Dataset]:
+        """Build a dataset out of the responses of a detail task
+
+        Just like `parse_dataset_list`, this runs on the task's worker thread.
+
+        """
+
+        return None
+
+    def handle_dataset_detail(self, operation: ClientOperation, result: bool):
         """Handle dataset detail retrieval outcome.
 
         This method should emit either `dataset_detail_received` or
-        `dataset_detail_error_received`.
+        `dataset_detail_error_received` and either resolve or reject the operation.
 
         """
 
         raise NotImplementedError
 
-    def get_dataset_detail_from_id(self, dataset_id: int):
-        self.network_fetcher_task = network_task.NetworkRequestTask(
-            [network.RequestToPerform(url=self.get_dataset_detail_url(dataset_id))],
-            self.network_requests_timeout,
-            self.auth_config,
-            description="Get dataset detail",
-        )
-        self.network_fetcher_task.task_done.connect(self.handle_dataset_detail_from_id)
-        qgis.core.QgsApplication.taskManager().addTask(self.network_fetcher_task)
+    def get_dataset_detail_from_id(self, dataset_id: int) -> ClientOperation:
+        operation = self._start_operation("Get dataset detail")
+        cached_dataset = self._get_cached_dataset(dataset_id)
+        if cached_dataset is not None:
+            self._emit_later(
+                self.complete_dataset_detail_from_id, operation, cached_dataset
+            )
+        else:
+            task = network_task.NetworkRequestTask(
+                [
+                    network.RequestToPerform(
+                        url=self.get_dataset_detail_url(dataset_id),
+                        priority=network.RequestPriority.DETAIL,
+                        operation=network.RequestOperation.DETAIL,
+                    )
+                ],
+                self.network_requests_timeout,
+                self.auth_config,
+                description="Get dataset detail",
+                response_handler=self.parse_dataset_detail,
+            )
+            task.task_done.connect(
+                partial(self.handle_dataset_detail_from_id, operation)
+            )
+            operation.start(task)
+        return operation
+
+    def handle_dataset_detail_from_id(
+        self, operation: ClientOperation, task_result: bool
+    ):
+        raise NotImplementedError
+
+    def complete_dataset_detail_from_id(
+        self, operation: ClientOperation, dataset: models.Dataset
+    ) -> None:
+        """Emit a dataset retrieved by id, after retrieving its style if needed"""
+        if dataset.dataset_sub_type == models.GeonodeResourceType.VECTOR_LAYER:
+            self.get_dataset_style(
+                dataset, emit_dataset_detail_received=True, operation=operation
+            )
+        else:
+            self._emit_dataset_detail(operation, dataset)
+
+    def get_dataset_details(self, dataset_ids: typing.Iterable[int]) -> ClientOperation:
+        """Retrieve the details of several datasets, using as few requests as possible
+
+        This must emit `dataset_details_received` and resolve the operation with a
+        `models.DatasetDetails`, which holds the reason why each of the datasets
+        that could not be retrieved is missing.
+
+        """
 
-    def handle_dataset_detail_from_id(self, task_result: bool):
         raise NotImplementedError
 
     def get_uploader_task(
@@ -178,25 +1033,28 @@ class BaseGeonodeClient(QtCore.QObject):
 
     def upload_layer(
         self, layer: qgis.core.QgsMapLayer, allow_public_access: bool
-    ) -> None:
-        self.network_fetcher_task = self.get_uploader_task(
+    ) -> ClientOperation:
+        operation = self._start_operation("Upload layer")
+        task = self.get_uploader_task(
             layer, allow_public_access, timeout=10 * 60 * 1000
         )  # the GeoNode GUI also uses a 10 minute timeout for uploads
-        self.network_fetcher_task.task_done.connect(self.handle_layer_upload)
-        qgis.core.QgsApplication.taskManager().addTask(self.network_fetcher_task)
+        task.task_done.connect(partial(self.handle_layer_upload, operation))
+        operation.start(task)
+        return operation
 
-    def handle_layer_upload(self, result: bool):
+    def handle_layer_upload(self, operation: ClientOperation, result: bool):
         """Handle layer upload outcome.
 
         This method should emit either `dataset_uploaded` or
-        `dataset_upload_error_received`.
+        `dataset_upload_error_received` and either resolve or reject the operation.
 
         """
 
         raise NotImplementedError
 
+    @staticmethod
     def parse_permissions(
-        self, raw_permissions: typing.List[str]
+        raw_permissions: typing.List[str],
     ) -> typing.List[models.GeonodePermission]:
         permissions = []
         for raw_perm in raw_permissions:
@@ -205,3 +1063,21 @@ class BaseGeonodeClient(QtCore.QObject):
             except ValueError:
                 log(f"Unknown permission: {raw_perm!r}, skipping...")
         return permissions
+
+
+def _cancel_task(task: typing.Optional[qgis.core.QgsTask]) -> bool:
+    """Cancel the input task, if it is still running, without handling its outcome"""
+    try:
+        is_running = task is not None and task.status() not in (
+            qgis.core.QgsTask.Complete,
+            qgis.core.QgsTask.Terminated,
+        )
+    except RuntimeError:  # the task manager has already deleted the finished task
+        is_running = False
+    if is_running:
+        try:
+            task.task_done.disconnect()
+        except TypeError:
+            pass  # there was nothing connected
+        task.cancel()
+    return is_running
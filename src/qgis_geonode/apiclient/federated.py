@@ -0,0 +1,179 @@
+"""Search several GeoNode connections at the same time"""
+
+import dataclasses
+import time
+import typing
+from functools import partial
+
+from qgis.PyQt import QtCore
+
+from .. import conf
+from . import (
+    get_geonode_client,
+    models,
+)
+from .base import (
+    BaseGeonodeClient,
+    ClientOperation,
+)
+
+
+@dataclasses.dataclass()
+class FederatedResult:
+    brief_dataset: models.BriefDataset
+    api_client: BaseGeonodeClient
+    connection_settings: conf.ConnectionSettings
+
+
+@dataclasses.dataclass()
+class ServerSearchOutcome:
+    connection_settings: conf.ConnectionSettings
+    latency: float  # milliseconds, since the federated search started
+    pagination_info: typing.Optional[models.GeonodePaginationInfo] = None
+    error_message: typing.Optional[str] = None
+
+
+class FederatedSearch(QtCore.QObject):
+    """Perform the same search against several connections concurrently
+
+    Each connection gets its own API client, whose searches run in parallel. The
+    results of each server are merged with those received so far as soon as they
+    arrive, so the total wait is that of the slowest server. Merged results are
+    ordered by title, then by connection name and primary key, which keeps their
+    order stable regardless of the order in which servers reply.
+
+    Only the first page of results of each server is retrieved.
+
+    """
+
+    results_updated = QtCore.pyqtSignal(list)
+    server_finished = QtCore.pyqtSignal(ServerSearchOutcome)
+    search_finished = QtCore.pyqtSignal()
+
+    connections: typing.List[conf.ConnectionSettings]
+    results: typing.List[FederatedResult]
+    outcomes: typing.List[ServerSearchOutcome]
+    _api_clients: typing.Dict[str, typing.Optional[BaseGeonodeClient]]
+    _operations: typing.List[ClientOperation]
+    _started_at: float
+    _reverse_ordering: bool
+
+    def __init__(self, connections: typing.Sequence[conf.ConnectionSettings]):
+        super().__init__()
+        self.connections = list(connections)
+        self.results = []
+        self.outcomes = []
+        self._api_clients = {
+            str(connection.id): get_geonode_client(connection)
+            for connection in self.connections
+        }
+        self._operations = []
+        self._started_at = time.monotonic()
+        self._reverse_ordering = False
+
+    def search(
+        self,
+        search_filters: models.GeonodeApiSearchFilters,
+        force_refresh: bool = False,
+    ) -> None:
+        self.cancel()
+        self.results = []
+        self.outcomes = []
+        self._reverse_ordering = bool(search_filters.reverse_ordering)
+        self._started_at = time.monotonic()
+        first_page_filters = dataclasses.replace(search_filters, page=1)
+        for connection in self.connections:
+            api_client = self._api_clients[str(connection.id)]
+            if api_client is None:
+                self._add_outcome(
+                    ServerSearchOutcome(
+                        connection,
+                        latency=0,
+                        error_message="Unknown or unsupported GeoNode version",
+                    )
+                )
+            else:
+                operation = api_client.get_dataset_list(
+                    first_page_filters, force_refresh=force_refresh
+                )
+                operation.result_received.connect(
+                    partial(self._handle_server_results, connection, api_client)
+                )
+                operation.error_received.connect(
+                    partial(self._handle_server_error, connection)
+                )
+                self._operations.append(operation)
+                # results served from the search cache have already been resolved
+                if operation.done and operation.result is not None:
+                    self._handle_server_results(
+                        connection, api_client, operation.result
+                    )
+
+    @property
+    def is_finished(self) -> bool:
+        return len(self.outcomes) == len(self.connections)
+
+    def cancel(self) -> None:
+        for operation in self._operations:
+            operation.result_received.disconnect()
+            operation.error_received.disconnect()
+            operation.cancel()
+        self._operations = []
+
+    def _handle_server_results(
+        self,
+        connection: conf.ConnectionSettings,
+        api_client: BaseGeonodeClient,
+        result: typing.Tuple[
+            typing.List[models.BriefDataset], models.GeonodePaginationInfo
+        ],
+    ) -> None:
+        brief_datasets, pagination_info = result
+        self.results.extend(
+            FederatedResult(brief_dataset, api_client, connection)
+            for brief_dataset in brief_datasets
+        )
+        self.results.sort(key=_get_ordering_key, reverse=self._reverse_ordering)
+        self.results_updated.emit(self.results)
+        self._add_outcome(
+            ServerSearchOutcome(
+                connection, self._get_latency(), pagination_info=pagination_info
+            )
+        )
+
+    def _handle_server_error(
+        self,
+        connection: conf.ConnectionSettings,
+        message: str,
+        http_status_code: int,
+        http_status_reason: str,
+    ) -> None:
+        message_fragments = [
+            message,
+            f"HTTP {http_status_code}" if http_status_code != 0 else None,
+            http_status_reason,
+        ]
+        self._add_outcome(
+            ServerSearchOutcome(
+                connection,
+                self._get_latency(),
+                error_message=" - ".join(i for i in message_fragments if i),
+            )
+        )
+
+    def _add_outcome(self, outcome: ServerSearchOutcome) -> None:
+        self.outcomes.append(outcome)
+        self.server_finished.emit(outcome)
+        if self.is_finished:
+            self.search_finished.emit()
+
+    def _get_latency(self) -> float:
+        return (time.monotonic() - self._started_at) * 1000
+
+
+def _get_ordering_key(result: FederatedResult) -> typing.Tuple[str, str, int]:
+    return (
+        result.brief_dataset.title.casefold(),
+        result.connection_settings.name.casefold(),
+        result.brief_dataset.pk,
+    )
@@ -3,6 +3,7 @@
 import datetime as dt
 import typing
 import uuid
+from functools import partial
 
 import qgis.core
 import qgis.utils
@@ -13,10 +14,79 @@ from qgis.PyQt import (
 from .. import network
 from .. import styles as geonode_styles
 from ..utils import log, url_from_geoserver
-from ..tasks import tasks
+from ..tasks import (
+    network_task,
+    tasks,
+)
 
 from . import models
-from .base import BaseGeonodeClient
+from .base import (
+    BaseGeonodeClient,
+    ClientOperation,
+)
+
+# fields of the dataset list response that are used for building brief datasets
+SPARSE_DATASET_FIELDS = (
+    "pk",
+    "uuid",
+    "name",
+    "alternate",
+    "title",
+    "abstract",
+    "raw_abstract",
+    "thumbnail_url",
+    "link",
+    "detail_url",
+    "subtype",
+    "links",
+    "bbox_polygon",
+    "srid",
+    "date",
+    "date_type",
+    "temporal_extent_start",
+    "temporal_extent_end",
+    "keywords",
+    "category",
+    "default_style",
+    "perms",
+    "last_updated",
+)
+
+# fields which must be present in order to build a dataset
+_REQUIRED_DATASET_FIELDS = (
+    "pk",
+    "uuid",
+    "thumbnail_url",
+    "link",
+    "detail_url",
+    "bbox_polygon",
+    "srid",
+    "date_type",
+)
+
+# fields whose parsing may fail, which are therefore parsed as soon as a brief dataset
+# is built, in the background thread, rather than when it is shown
+_EAGER_DATASET_FIELDS = (
+    "pk",
+    "uuid",
+    "spatial_extent",
+    "srid",
+    "published_date",
+    "temporal_extent",
+    "keywords",
+)
+
+# maximum number of datasets whose details are requested together
+DETAIL_BATCH_SIZE = 100
+
+# number of datasets requested per page when harvesting the local catalog
+CATALOG_HARVEST_PAGE_SIZE = 100
+
+# number of keywords requested per page when fetching the keyword vocabulary
+KEYWORD_PAGE_SIZE = 500
+
+# base URLs of remotes which did not honor the request for sparse fields
+_sparse_fields_unsupported: typing.Set[str] = set()
 
 
 class GeoNodeApiClient(BaseGeonodeClient):
@@ -46,6 +116,7 @@ class GeoNodeApiClient(BaseGeonodeClient):
 
     _DATASET_NAME = "dataset"
     _DATASET_NAME_PLURAL = "datasets"
+    _field_parsers: typing.Optional[models.FieldParsers] = None
 
     @property
     def api_url(self):
@@ -74,9 +145,19 @@ class GeoNodeApiClient(BaseGeonodeClient):
         if search_filters.abstract is not None:
             query.addQueryItem("filter{abstract.icontains}", search_filters.abstract)
         if search_filters.keyword is not None:
-            query.addQueryItem(
-                "filter{keywords.name.icontains}", search_filters.keyword
+            vocabulary = self.keyword_vocabulary
+            known_keyword = (
+                vocabulary.get(search_filters.keyword)
+                if vocabulary is not None
+                else None
             )
+            if known_keyword is not None:
+                # exact matches are cheaper for the remote to look up
+                query.addQueryItem("filter{keywords.name}", known_keyword)
+            else:
+                query.addQueryItem(
+                    "filter{keywords.name.icontains}", search_filters.keyword
+                )
         if search_filters.topic_category is not None:
             query.addQueryItem(
                 "filter{category.identifier}",
@@ -102,13 +183,8 @@ class GeoNodeApiClient(BaseGeonodeClient):
                 "filter{date.lte}",
                 search_filters.publication_date_end.toString(QtCore.Qt.ISODate),
             )
-        # TODO revisit once the support for spatial extent is available on
-        # GeoNode API V2
-        if (
-            search_filters.spatial_extent is not None
-            and not search_filters.spatial_extent.isNull()
-        ):
-            pass
+        # GeoNode API V2 cannot filter by spatial extent, which is instead done by
+        # the local catalog, when there is one
         if search_filters.layer_types is None:
             types = [
                 models.GeonodeResourceType.VECTOR_LAYER,
@@ -128,23 +204,171 @@ class GeoNodeApiClient(BaseGeonodeClient):
             )
         return query
 
-    def handle_dataset_detail_from_id(self, task_result: bool) -> None:
-        deserialized_resource = self._retrieve_response(
-            task_result, 0, self.dataset_detail_error_received
+    def handle_dataset_detail_from_id(
+        self, operation: ClientOperation, task_result: bool
+    ) -> None:
+        dataset = self._get_processed_dataset_detail(operation, task_result)
+        if dataset is not None:
+            self.complete_dataset_detail_from_id(operation, dataset)
+
+    def get_dataset_details_url(
+        self, dataset_ids: typing.Sequence[int], page: int = 1
+    ) -> QtCore.QUrl:
+        url = QtCore.QUrl(self.dataset_list_url)
+        query = QtCore.QUrlQuery()
+        for dataset_id in dataset_ids:
+            query.addQueryItem("filter{pk.in}", str(dataset_id))
+        query.addQueryItem("page", str(page))
+        query.addQueryItem("page_size", str(len(dataset_ids)))
+        url.setQuery(query.query())
+        return url
+
+    def get_dataset_details(self, dataset_ids: typing.Iterable[int]) -> ClientOperation:
+        operation = self._start_operation("Get dataset details")
+        details = models.DatasetDetails()
+        missing_ids = []
+        for dataset_id in dict.fromkeys(dataset_ids):
+            cached_dataset = self._get_cached_dataset(dataset_id)
+            if cached_dataset is not None:
+                details.datasets[dataset_id] = cached_dataset
+            else:
+                missing_ids.append(dataset_id)
+        batches = [
+            (missing_ids[index : index + DETAIL_BATCH_SIZE], 1)
+            for index in range(0, len(missing_ids), DETAIL_BATCH_SIZE)
+        ]
+        if len(batches) > 0:
+            self._fetch_dataset_details(operation, details, batches)
+        else:
+            self._emit_later(self._emit_dataset_details, operation, details)
+        return operation
+
+    def _fetch_dataset_details(
+        self,
+        operation: ClientOperation,
+        details: models.DatasetDetails,
+        batches: typing.List[typing.Tuple[typing.List[int], int]],
+    ) -> None:
+        """Request a page of results for each batch of dataset ids, all at once"""
+        task = network_task.NetworkRequestTask(
+            [
+                network.RequestToPerform(
+                    url=self.get_dataset_details_url(dataset_ids, page),
+                    priority=network.RequestPriority.DETAIL,
+                    operation=network.RequestOperation.DETAIL,
+                )
+                for dataset_ids, page in batches
+            ],
+            self.network_requests_timeout,
+            self.auth_config,
+            description="Get dataset details",
+            response_handler=self.parse_dataset_details,
         )
-        if deserialized_resource is not None:
+        task.task_done.connect(
+            partial(self.handle_dataset_details, operation, details, batches)
+        )
+        operation.start(task)
+
+    def parse_dataset_details(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.List[typing.Optional[typing.Tuple[models.DatasetDetails, bool]]]:
+        """Parse each page of dataset details and tell whether more pages follow"""
+        result = []
+        for response_content in response_contents:
+            deserialized_content = _deserialize_response(response_content)
+            if deserialized_content is not None:
+                page_details = self._build_dataset_details(deserialized_content)
+                page = deserialized_content.get("page") or 1
+                page_size = deserialized_content.get("page_size") or 0
+                total = deserialized_content.get("total") or 0
+                result.append((page_details, page * page_size < total))
+            else:
+                result.append(None)
+        return result
+
+    def _build_dataset_details(
+        self, deserialized_content: typing.Dict
+    ) -> models.DatasetDetails:
+        result = models.DatasetDetails()
+        for raw_dataset in deserialized_content.get(self._DATASET_NAME_PLURAL, []):
             try:
-                dataset = self._parse_dataset_detail(deserialized_resource["dataset"])
-            except KeyError as exc:
-                log(
-                    f"Could not parse server response into a dataset: {str(exc)}",
-                    debug=False,
-                )
+                dataset = self._parse_dataset_detail(raw_dataset)
+            except (KeyError, TypeError, ValueError) as exc:
+                try:
+                    result.errors[
+                        int(raw_dataset["pk"])
+                    ] = f"Could not parse server response into a dataset: {exc}"
+                except (KeyError, TypeError, ValueError):
+                    log(f"Could not parse {raw_dataset!r} into a dataset", debug=False)
+            else:
+                result.datasets[dataset.pk] = dataset
+                self._cache_dataset(raw_dataset, dataset)
+        return result
+
+    def _cache_dataset(self, raw_dataset: typing.Dict, dataset: models.Dataset) -> None:
+        self.dataset_cache.store(
+            self.base_url, self.auth_config, dataset, raw_dataset.get("last_updated")
+        )
+
+    def _invalidate_modified_datasets(
+        self, raw_datasets: typing.Iterable[typing.Dict]
+    ) -> None:
+        """Drop cached details of the datasets that have been modified since"""
+        last_updated = {}
+        for raw_dataset in raw_datasets:
+            try:
+                pk = int(raw_dataset["pk"])
+            except (KeyError, TypeError, ValueError):
+                pk = None
+            # datasets are not required to report when they were updated
+            if pk is not None and raw_dataset.get("last_updated"):
+                last_updated[pk] = raw_dataset["last_updated"]
+        self.dataset_cache.invalidate_modified(
+            self.base_url, self.auth_config, last_updated
+        )
+
+    def handle_dataset_details(
+        self,
+        operation: ClientOperation,
+        details: models.DatasetDetails,
+        batches: typing.List[typing.Tuple[typing.List[int], int]],
+        task_result: bool,
+    ) -> None:
+        processed_pages = operation.processed_response
+        response_contents = operation.response_contents
+        next_batches = []
+        for index, (dataset_ids, page) in enumerate(batches):
+            if processed_pages is not None:
+                processed_page = processed_pages[index]
             else:
-                if dataset.dataset_sub_type == models.GeonodeResourceType.VECTOR_LAYER:
-                    self.get_dataset_style(dataset, emit_dataset_detail_received=True)
+                processed_page = None
+            if processed_page is not None:
+                page_details, has_more_pages = processed_page
+                details.datasets.update(page_details.datasets)
+                details.errors.update(page_details.errors)
+                if has_more_pages:
+                    next_batches.append((dataset_ids, page + 1))
                 else:
-                    self.dataset_detail_received.emit(dataset)
+                    for dataset_id in dataset_ids:
+                        if dataset_id not in details.datasets:
+                            details.errors.setdefault(
+                                dataset_id, "Dataset not found on the remote"
+                            )
+            else:
+                try:
+                    error_message = response_contents[index].qt_error
+                except (AttributeError, IndexError):
+                    error_message = None
+                for dataset_id in dataset_ids:
+                    if dataset_id not in details.datasets:
+                        details.errors[dataset_id] = (
+                            error_message or "Could not complete network request"
+                        )
+        if len(next_batches) > 0:
+            self._fetch_dataset_details(operation, details, next_batches)
+        else:
+            self._emit_dataset_details(operation, details)
 
     def get_uploader_task(
         self, layer: qgis.core.QgsMapLayer, allow_public_access: bool, timeout: int
@@ -156,151 +380,399 @@ class GeoNodeApiClient(BaseGeonodeClient):
             self.auth_config,
             network_task_timeout=timeout,
             description="Upload layer to GeoNode",
+            upload_timeout=timeout,
         )
 
-    def handle_layer_upload(self, result: bool):
+    def handle_layer_upload(self, operation: ClientOperation, result: bool):
         success_statuses = (
             200,
             201,
         )
         if result:
-            response_contents = self.network_fetcher_task.response_contents[0]
+            response_contents = operation.response_contents[0]
             if response_contents.http_status_code in success_statuses:
+                # cached search results do not include the new dataset
+                self.search_cache.clear(self.base_url)
                 self.dataset_uploaded.emit()
+                operation.resolve()
             else:
-                self.dataset_upload_error_received[str, int, str].emit(
+                self._emit_error(
+                    operation,
+                    self.dataset_upload_error_received,
                     response_contents.qt_error,
                     response_contents.http_status_code,
                     response_contents.http_status_reason,
                 )
         else:
-            self.dataset_upload_error_received[str].emit(
-                "Could not upload layer to GeoNode"
+            self._emit_error(
+                operation,
+                self.dataset_upload_error_received,
+                "Could not upload layer to GeoNode",
             )
 
-    def _get_service_urls(
-        self,
-        raw_links: typing.Dict,
-        dataset_type: models.GeonodeResourceType,
-    ) -> typing.Dict[models.GeonodeService, str]:
-        result = {models.GeonodeService.OGC_WMS: _get_link(raw_links, "OGC:WMS")}
-        if dataset_type == models.GeonodeResourceType.VECTOR_LAYER:
-            result[models.GeonodeService.OGC_WFS] = _get_link(raw_links, "OGC:WFS")
-        elif dataset_type == models.GeonodeResourceType.RASTER_LAYER:
-            result[models.GeonodeService.OGC_WCS] = _get_link(raw_links, "OGC:WCS")
-        else:
-            log(f"Invalid dataset type: {dataset_type}")
-            result = {}
-        auth_manager = qgis.core.QgsApplication.authManager()
-        auth_provider_name = auth_manager.configAuthMethodKey(self.auth_config).lower()
-        if auth_provider_name == "basic":
-            for service_type, retrieved_url in result.items():
-                try:
-                    result[service_type] = url_from_geoserver(
-                        self.base_url, retrieved_url
-                    )
-                    log(f"result[service_type]: {result[service_type]}")
-                except AttributeError:
-                    pass
-        return result
-
     def get_dataset_list_url(
         self, search_filters: models.GeonodeApiSearchFilters
     ) -> QtCore.QUrl:
         url = QtCore.QUrl(self.dataset_list_url)
         query = self.build_search_query(search_filters)
+        if self.base_url not in _sparse_fields_unsupported:
+            # ask only for the fields needed by brief datasets
+            query.addQueryItem("exclude[]", "*")
+            for field_name in SPARSE_DATASET_FIELDS:
+                query.addQueryItem("include[]", field_name)
         url.setQuery(query.query())
         return url
 
     def get_dataset_detail_url(self, dataset_id: int) -> QtCore.QUrl:
         return QtCore.QUrl(f"{self.dataset_list_url}{dataset_id}/")
 
-    def handle_dataset_list(self, task_result: bool) -> None:
-        deserialized_content = self._retrieve_response(
-            task_result, 0, self.search_error_received
-        )
+    def get_catalog_harvest_url(
+        self, watermark: typing.Optional[str], page: int
+    ) -> QtCore.QUrl:
+        url = QtCore.QUrl(self.dataset_list_url)
+        query = QtCore.QUrlQuery()
+        query.addQueryItem("page", str(page))
+        query.addQueryItem("page_size", str(CATALOG_HARVEST_PAGE_SIZE))
+        # a stable ordering keeps pages from overlapping while harvesting
+        query.addQueryItem("sort[]", "pk")
+        query.addQueryItem("filter{subtype.in}", "vector")
+        query.addQueryItem("filter{subtype.in}", "raster")
+        if watermark:
+            query.addQueryItem("filter{last_updated.gt}", watermark)
+        if self.base_url not in _sparse_fields_unsupported:
+            query.addQueryItem("exclude[]", "*")
+            for field_name in SPARSE_DATASET_FIELDS + ("ll_bbox_polygon",):
+                query.addQueryItem("include[]", field_name)
+        url.setQuery(query.query())
+        return url
+
+    def get_keyword_list_url(self, page: int) -> QtCore.QUrl:
+        url = QtCore.QUrl(f"{self.api_url}/keywords/")
+        query = QtCore.QUrlQuery()
+        query.addQueryItem("page", str(page))
+        query.addQueryItem("page_size", str(KEYWORD_PAGE_SIZE))
+        url.setQuery(query.query())
+        return url
+
+    def parse_keyword_page(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[typing.Tuple[typing.List[str], bool]]:
+        deserialized_content = _deserialize_response(response_contents[0])
+        if deserialized_content is not None:
+            keywords = [
+                raw_keyword["name"]
+                for raw_keyword in deserialized_content.get("keywords", [])
+                if raw_keyword.get("name")
+            ]
+            page = deserialized_content.get("page") or 1
+            page_size = deserialized_content.get("page_size") or 0
+            total = deserialized_content.get("total") or 0
+            result = keywords, page * page_size < total
+        else:
+            result = None
+        return result
+
+    def store_catalog_page(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[typing.Tuple[typing.Optional[str], bool, typing.List[int]]]:
+        deserialized_content = _deserialize_response(response_contents[0])
         if deserialized_content is not None:
+            raw_datasets = [
+                raw_dataset
+                for raw_dataset in deserialized_content.get(
+                    self._DATASET_NAME_PLURAL, []
+                )
+                if all(field in raw_dataset for field in _REQUIRED_DATASET_FIELDS)
+            ]
+            newest = self.local_catalog.store(raw_datasets)
+            self._invalidate_modified_datasets(raw_datasets)
+            page = deserialized_content.get("page") or 1
+            page_size = deserialized_content.get("page_size") or 0
+            total = deserialized_content.get("total") or 0
+            result = (
+                newest,
+                page * page_size < total,
+                [int(raw_dataset["pk"]) for raw_dataset in raw_datasets],
+            )
+        else:
+            result = None
+        return result
+
+    def _search_local_catalog(
+        self, search_filters: models.GeonodeApiSearchFilters
+    ) -> typing.Optional[
+        typing.Tuple[typing.List[models.BriefDataset], models.GeonodePaginationInfo]
+    ]:
+        if self.local_catalog is not None and self.local_catalog.is_synced:
+            raw_datasets, total = self.local_catalog.search(
+                search_filters, self.page_size
+            )
             brief_datasets = []
-            for raw_brief_ds in deserialized_content.get(self._DATASET_NAME_PLURAL, []):
+            for raw_dataset in raw_datasets:
                 try:
-                    parsed_properties = self._get_common_model_properties(raw_brief_ds)
-                    brief_dataset = models.BriefDataset(**parsed_properties)
-                except ValueError as exc:
+                    brief_datasets.append(self._build_brief_dataset(raw_dataset))
+                except (KeyError, ValueError) as exc:
                     log(
-                        f"Could not parse {raw_brief_ds!r} into a valid item: {str(exc)}",
+                        f"Could not parse {raw_dataset!r} into a valid item: {exc}",
                         debug=False,
                     )
-                else:
-                    brief_datasets.append(brief_dataset)
-            pagination_info = models.GeonodePaginationInfo(
-                total_records=deserialized_content.get("total") or 0,
-                current_page=deserialized_content.get("page") or 1,
-                page_size=deserialized_content.get("page_size") or 0,
+            result = brief_datasets, models.GeonodePaginationInfo(
+                total_records=total,
+                current_page=search_filters.page or 1,
+                page_size=self.page_size,
             )
-            self.dataset_list_received.emit(brief_datasets, pagination_info)
+        else:
+            result = None
+        return result
 
-    def handle_dataset_detail(
+    def parse_dataset_list(
         self,
-        task_result: bool,
-        get_style_too: bool = False,
-        authenticated: bool = False,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[
+        typing.Tuple[typing.List[models.BriefDataset], models.GeonodePaginationInfo]
+    ]:
+        deserialized_content = _deserialize_response(response_contents[0])
+        try:
+            if deserialized_content is not None:
+                result = self._build_dataset_list(deserialized_content)
+            else:
+                result = None
+        except KeyError:
+            result = None  # let the GUI thread decide how to recover
+        return result
+
+    def handle_dataset_list(
+        self, operation: ClientOperation, task_result: bool
     ) -> None:
-        log("inside the API client's handle_dataset_detail")
-        deserialized_resource = self._retrieve_response(
-            task_result, 0, self.dataset_detail_error_received
-        )
-        if deserialized_resource is not None:
+        dataset_list = operation.processed_response
+        if dataset_list is None:
+            deserialized_content = self._retrieve_response(
+                operation, task_result, 0, self.search_error_received
+            )
+            if deserialized_content is not None:
+                try:
+                    dataset_list = self._build_dataset_list(deserialized_content)
+                except KeyError as exc:
+                    self._handle_incomplete_dataset_list(operation, str(exc))
+        if dataset_list is not None:
+            brief_datasets, pagination_info = dataset_list
+            self._emit_dataset_list(operation, brief_datasets, pagination_info)
+
+    def _handle_incomplete_dataset_list(
+        self, operation: ClientOperation, missing_field: str
+    ) -> None:
+        """Handle datasets that lack some of the fields needed by the plugin
+
+        This happens on remotes that honor excluding fields, but not including them
+        back, in which case the fields are missing from all the returned datasets.
+        Such remotes are searched with full dataset representations from then on.
+
+        """
+
+        if self.base_url not in _sparse_fields_unsupported:
+            log(
+                f"Remote did not return the requested fields (missing "
+                f"{missing_field}), repeating the search without sparse fields..."
+            )
+            _sparse_fields_unsupported.add(self.base_url)
+            self._fetch_dataset_list(
+                operation, self.get_dataset_list_url(self._current_search_filters)
+            )
+        else:
+            self._emit_error(
+                operation,
+                self.search_error_received,
+                f"Could not parse response from remote GeoNode: missing {missing_field}",
+            )
+
+    def _build_dataset_list(
+        self, deserialized_content: typing.Dict
+    ) -> typing.Tuple[typing.List[models.BriefDataset], models.GeonodePaginationInfo]:
+        """Build the brief datasets of a page of search results
+
+        Malformed datasets are skipped. A `KeyError` is raised only if a required
+        field is missing from every dataset of the page, which means the remote did
+        not honor the request for sparse fields.
+
+        """
+
+        brief_datasets = []
+        raw_brief_datasets = deserialized_content.get(self._DATASET_NAME_PLURAL, [])
+        missing_fields = [
+            field_name
+            for field_name in _REQUIRED_DATASET_FIELDS
+            if raw_brief_datasets
+            and not any(field_name in raw for raw in raw_brief_datasets)
+        ]
+        if missing_fields:
+            raise KeyError(missing_fields[0])
+        self._invalidate_modified_datasets(raw_brief_datasets)
+        for raw_brief_ds in raw_brief_datasets:
             try:
-                dataset = self._parse_dataset_detail(
-                    deserialized_resource[self._DATASET_NAME]
-                )
-            except KeyError as exc:
+                brief_dataset = self._build_brief_dataset(raw_brief_ds)
+            except (KeyError, ValueError) as exc:
                 log(
-                    f"Could not parse server response into a dataset: {str(exc)}",
+                    f"Could not parse {raw_brief_ds!r} into a valid item: {str(exc)}",
                     debug=False,
                 )
             else:
-                # check if the request is from a WFS to see if it will retrieve the style
-                if get_style_too and authenticated:
-                    is_vector = (
-                        dataset.dataset_sub_type
-                        == models.GeonodeResourceType.VECTOR_LAYER
-                    )
-                    should_load_vector_style = (
-                        models.ApiClientCapability.LOAD_VECTOR_LAYER_STYLE
-                        in self.capabilities
+                brief_datasets.append(brief_dataset)
+        pagination_info = models.GeonodePaginationInfo(
+            total_records=deserialized_content.get("total") or 0,
+            current_page=deserialized_content.get("page") or 1,
+            page_size=deserialized_content.get("page_size") or 0,
+        )
+        return brief_datasets, pagination_info
+
+    def parse_dataset_detail(
+        self,
+        response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]],
+    ) -> typing.Optional[models.Dataset]:
+        deserialized_resource = _deserialize_response(response_contents[0])
+        if deserialized_resource is not None:
+            result = self._build_dataset_detail(deserialized_resource)
+        else:
+            result = None
+        return result
+
+    def handle_dataset_detail(
+        self,
+        operation: ClientOperation,
+        task_result: bool,
+        get_style_too: bool = False,
+        authenticated: bool = False,
+    ) -> None:
+        log("inside the API client's handle_dataset_detail")
+        response_contents = operation.response_contents
+        # the style may have been requested together with the detail
+        style_included = len(response_contents) > 1
+        if style_included:
+            detail_result = response_contents[0] is not None
+        else:
+            detail_result = task_result
+        dataset = self._get_processed_dataset_detail(operation, detail_result)
+        if dataset is not None:
+            # check if the request is from a WFS to see if it will retrieve the style
+            # and if the layer is vector and there are permissions to read the style
+            if get_style_too and authenticated and self._can_load_style(dataset):
+                if style_included:
+                    self.handle_dataset_style(
+                        operation,
+                        dataset,
+                        response_contents[1] is not None,
+                        emit_dataset_detail_received=True,
+                        contents_index=1,
                     )
-                    # Check if the layer is vector and if it has the permissions to read the style
-                    if is_vector and should_load_vector_style:
-                        self.get_dataset_style(
-                            dataset, emit_dataset_detail_received=True
-                        )
                 else:
-                    self.dataset_detail_received.emit(dataset)
+                    self.get_dataset_style(
+                        dataset, emit_dataset_detail_received=True, operation=operation
+                    )
+            else:
+                self._emit_dataset_detail(operation, dataset)
+        if style_included and response_contents[1] is not None:
+            response_contents[1].release_body()  # in case it was not used
+
+    def _get_processed_dataset_detail(
+        self, operation: ClientOperation, task_result: bool
+    ) -> typing.Optional[models.Dataset]:
+        """Return the dataset built by the task, building it here if needed"""
+        result = operation.processed_response
+        if result is None:
+            deserialized_resource = self._retrieve_response(
+                operation, task_result, 0, self.dataset_detail_error_received
+            )
+            if deserialized_resource is not None:
+                result = self._build_dataset_detail(deserialized_resource)
+                if result is None:
+                    self._emit_error(
+                        operation,
+                        self.dataset_detail_error_received,
+                        "Could not parse server response into a dataset",
+                    )
+        return result
+
+    def _build_dataset_detail(
+        self, deserialized_resource: typing.Dict
+    ) -> typing.Optional[models.Dataset]:
+        try:
+            raw_dataset = deserialized_resource[self._DATASET_NAME]
+            result = self._parse_dataset_detail(raw_dataset)
+        except KeyError as exc:
+            log(
+                f"Could not parse server response into a dataset: {str(exc)}",
+                debug=False,
+            )
+            result = None
+        else:
+            self._cache_dataset(raw_dataset, result)
+        return result
 
     def handle_dataset_style(
         self,
+        operation: ClientOperation,
         dataset: models.Dataset,
         task_result: bool,
         emit_dataset_detail_received: bool = False,
+        contents_index: int = 0,
     ) -> None:
-        response_contents = self._retrieve_response(
-            task_result, 0, self.style_detail_error_received, deserialize_as_json=False
-        )
-        if response_contents is not None:
-            sld_named_layer, error_message = geonode_styles.get_usable_sld(
-                response_contents
+        response_contents = operation.response_contents[contents_index]
+        if response_contents is None or response_contents.qt_error is not None:
+            if response_contents is not None:
+                error_message = response_contents.qt_error
+                response_contents.release_body()
+            else:
+                error_message = "Could not complete network request"
+            # the dataset is still usable without its style
+            self._emit_dataset_style(
+                operation, dataset, None, error_message, emit_dataset_detail_received
             )
-            if sld_named_layer is None:
-                self.style_detail_error_received[str].emit(
-                    f"Could not parse downloaded SLD: {error_message}"
+        else:
+            sld_url = dataset.default_style.sld_url
+            not_modified = response_contents.http_status_code == 304
+            if not_modified:
+                cached_style = self.style_cache.get(sld_url, self.auth_config)
+            else:
+                cached_style = None
+            revalidated = (
+                operation.task.requests_to_perform[contents_index].etag is not None
+            )
+            if cached_style is not None:
+                response_contents.release_body()
+                self.style_cache.record_revalidation(sld_url, self.auth_config)
+                self._emit_cached_style(
+                    operation, dataset, cached_style, emit_dataset_detail_received
+                )
+            elif not_modified and revalidated:
+                # the cached style went away while it was being revalidated, so ask
+                # for the whole style instead
+                response_contents.release_body()
+                self._fetch_dataset_style(
+                    operation, dataset, emit_dataset_detail_received, revalidate=False
+                )
+            else:
+                sld_named_layer, error_message = geonode_styles.get_usable_sld(
+                    response_contents
+                )
+                if sld_named_layer is not None and response_contents.etag is not None:
+                    self.style_cache.store(
+                        sld_url,
+                        self.auth_config,
+                        response_contents.etag,
+                        geonode_styles.serialize_sld_named_layer(sld_named_layer),
+                    )
+                self._emit_dataset_style(
+                    operation,
+                    dataset,
+                    sld_named_layer,
+                    error_message,
+                    emit_dataset_detail_received,
                 )
-            dataset.default_style.sld = sld_named_layer
-            if emit_dataset_detail_received:
-                self.dataset_detail_received.emit(dataset)
 
     def _retrieve_response(
         self,
+        operation: ClientOperation,
         task_result: bool,
         contents_index: int,
         error_signal,
@@ -309,9 +781,7 @@ class GeoNodeApiClient(BaseGeonodeClient):
         """Internal method that takes care of boilerplate-ish response parsing."""
         result = None
         if task_result:
-            response_content = self.network_fetcher_task.response_contents[
-                contents_index
-            ]
+            response_content = operation.response_contents[contents_index]
             if response_content.qt_error is None:
                 result = response_content
                 if deserialize_as_json:
@@ -321,59 +791,86 @@ class GeoNodeApiClient(BaseGeonodeClient):
                     if deserialized is not None:
                         result = deserialized
                     else:
-                        error_signal[str].emit(
-                            "Could not parse response from remote GeoNode"
+                        self._emit_error(
+                            operation,
+                            error_signal,
+                            "Could not parse response from remote GeoNode",
                         )
             else:
-                error_signal[str, int, str].emit(
+                self._emit_error(
+                    operation,
+                    error_signal,
                     response_content.qt_error,
                     response_content.http_status_code,
                     response_content.http_status_reason,
                 )
         else:
-            error_signal[str].emit("Could not complete network request")
+            self._emit_error(
+                operation, error_signal, "Could not complete network request"
+            )
         return result
 
-    def _get_sld_url(self, raw_style: typing.Dict) -> typing.Optional[str]:
-        auth_manager = qgis.core.QgsApplication.authManager()
-        auth_provider_name = auth_manager.configAuthMethodKey(self.auth_config).lower()
-        sld_url = raw_style.get("sld_url")
-        if auth_provider_name == "basic":
+    def _build_brief_dataset(self, raw_dataset: typing.Dict) -> models.BriefDataset:
+        """Build a brief dataset that parses its fields only when they are accessed
+
+        Fields whose parsing may fail are parsed right away, so that malformed
+        datasets are rejected here, with a `ValueError`, instead of failing when
+        they are shown.
+
+        """
+
+        for field_name in _REQUIRED_DATASET_FIELDS:
+            if field_name not in raw_dataset:
+                raise KeyError(field_name)
+        result = models.BriefDataset.from_raw(raw_dataset, self._get_field_parsers())
+        for field_name in _EAGER_DATASET_FIELDS:
             try:
-                sld_url = url_from_geoserver(self.base_url, sld_url)
-                log(f"sld_url: {sld_url}")
-            except AttributeError:
-                pass
-        return sld_url
+                getattr(result, field_name)
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid {field_name!r}: {exc!r}") from exc
+        return result
+
+    def _get_field_parsers(self) -> models.FieldParsers:
+        """Return the parsers of the fields of datasets coming from this client
+
+        Parsers are stored in every brief dataset, which in turn may be kept around
+        by the search cache, so they must not hold a reference to the client.
+
+        """
+
+        if self._field_parsers is None:
+            self._field_parsers = {
+                "pk": lambda raw: int(raw["pk"]),
+                "uuid": lambda raw: uuid.UUID(raw["uuid"]),
+                "name": lambda raw: raw.get("alternate", raw.get("name", "")),
+                "title": lambda raw: raw.get("title", ""),
+                "abstract": lambda raw: raw.get(
+                    "raw_abstract", raw.get("abstract", "")
+                ),
+                "thumbnail_url": lambda raw: raw["thumbnail_url"],
+                "link": lambda raw: raw["link"],
+                "detail_url": lambda raw: raw["detail_url"],
+                "dataset_sub_type": _get_resource_type,
+                "service_urls": partial(
+                    _get_service_urls, self.base_url, self.auth_config
+                ),
+                "spatial_extent": lambda raw: _get_spatial_extent(raw["bbox_polygon"]),
+                "srid": lambda raw: models.get_crs(raw["srid"]),
+                "published_date": _get_published_date,
+                "temporal_extent": _get_temporal_extent,
+                "keywords": lambda raw: [k["name"] for k in raw.get("keywords", [])],
+                "category": lambda raw: (raw.get("category") or {}).get("identifier"),
+                "default_style": partial(
+                    _get_default_style, self.base_url, self.auth_config
+                ),
+                "permissions": _get_permissions,
+            }
+        return self._field_parsers
 
     def _get_common_model_properties(self, raw_dataset: typing.Dict) -> typing.Dict:
-        type_ = _get_resource_type(raw_dataset)
-        raw_links = raw_dataset.get("links", [])
-        service_urls = self._get_service_urls(raw_links, type_)
-        raw_style = raw_dataset.get("default_style") or {}
         return {
-            "pk": int(raw_dataset["pk"]),
-            "uuid": uuid.UUID(raw_dataset["uuid"]),
-            "name": raw_dataset.get("alternate", raw_dataset.get("name", "")),
-            "title": raw_dataset.get("title", ""),
-            "abstract": raw_dataset.get(
-                "raw_abstract", raw_dataset.get("abstract", "")
-            ),
-            "thumbnail_url": raw_dataset["thumbnail_url"],
-            "link": raw_dataset["link"],
-            "detail_url": raw_dataset["detail_url"],
-            "dataset_sub_type": type_,
-            "service_urls": service_urls,
-            "spatial_extent": _get_spatial_extent(raw_dataset["bbox_polygon"]),
-            "srid": qgis.core.QgsCoordinateReferenceSystem(raw_dataset["srid"]),
-            "published_date": _get_published_date(raw_dataset),
-            "temporal_extent": _get_temporal_extent(raw_dataset),
-            "keywords": [k["name"] for k in raw_dataset.get("keywords", [])],
-            "category": (raw_dataset.get("category") or {}).get("identifier"),
-            "default_style": models.BriefGeonodeStyle(
-                name=raw_style.get("name", ""), sld_url=self._get_sld_url(raw_style)
-            ),
-            "permissions": self.parse_permissions(raw_dataset.get("perms", [])),
+            name: parse(raw_dataset)
+            for name, parse in self._get_field_parsers().items()
         }
 
     @staticmethod
@@ -403,6 +900,56 @@ class GeoNodeApiClient(BaseGeonodeClient):
         return models.Dataset(**properties)
 
 
+def _uses_basic_auth(auth_config: typing.Optional[str]) -> bool:
+    auth_manager = qgis.core.QgsApplication.authManager()
+    return auth_manager.configAuthMethodKey(auth_config).lower() == "basic"
+
+
+def _get_service_urls(
+    base_url: str,
+    auth_config: typing.Optional[str],
+    raw_dataset: typing.Dict,
+) -> typing.Dict[models.GeonodeService, str]:
+    raw_links = raw_dataset.get("links", [])
+    dataset_type = _get_resource_type(raw_dataset)
+    result = {models.GeonodeService.OGC_WMS: _get_link(raw_links, "OGC:WMS")}
+    if dataset_type == models.GeonodeResourceType.VECTOR_LAYER:
+        result[models.GeonodeService.OGC_WFS] = _get_link(raw_links, "OGC:WFS")
+    elif dataset_type == models.GeonodeResourceType.RASTER_LAYER:
+        result[models.GeonodeService.OGC_WCS] = _get_link(raw_links, "OGC:WCS")
+    else:
+        log(f"Invalid dataset type: {dataset_type}")
+        result = {}
+    if _uses_basic_auth(auth_config):
+        for service_type, retrieved_url in result.items():
+            try:
+                result[service_type] = url_from_geoserver(base_url, retrieved_url)
+                log(f"result[service_type]: {result[service_type]}")
+            except AttributeError:
+                pass
+    return result
+
+
+def _get_default_style(
+    base_url: str,
+    auth_config: typing.Optional[str],
+    raw_dataset: typing.Dict,
+) -> models.BriefGeonodeStyle:
+    raw_style = raw_dataset.get("default_style") or {}
+    sld_url = raw_style.get("sld_url")
+    if _uses_basic_auth(auth_config):
+        try:
+            sld_url = url_from_geoserver(base_url, sld_url)
+            log(f"sld_url: {sld_url}")
+        except AttributeError:
+            pass
+    return models.BriefGeonodeStyle(name=raw_style.get("name", ""), sld_url=sld_url)
+
+
+def _get_permissions(raw_dataset: typing.Dict) -> typing.List[models.GeonodePermission]:
+    return BaseGeonodeClient.parse_permissions(raw_dataset.get("perms", []))
+
+
 def _get_link(raw_links: typing.List, link_type: str) -> typing.Optional[str]:
     for link_info in raw_links:
         if link_info.get("link_type") == link_type:
@@ -471,3 +1018,12 @@ def _get_published_date(payload: typing.Dict) -> typing.Optional[dt.datetime]:
     else:
         result = None
     return result
+
+
+def _deserialize_response(
+    response_content: typing.Optional[network.ParsedNetworkReply],
+) -> typing.Optional[typing.Dict]:
+    result = None
+    if response_content is not None and response_content.qt_error is None:
+        result = network.deserialize_json_response(response_content.response_body)
+    return result
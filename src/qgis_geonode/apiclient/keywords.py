@@ -0,0 +1,135 @@
+"""In-memory cache of the keyword vocabularies of GeoNode connections"""
+
+import dataclasses
+import threading
+import time
+import typing
+
+# connection base URL and auth config
+KeywordCacheKey = typing.Tuple[str, str]
+
+# seconds during which a vocabulary is used before being fetched again
+KEYWORD_VOCABULARY_TTL = 6 * 60 * 60
+
+
+class KeywordTrie:
+    """Prefix tree of keywords, for completing partially typed keywords
+
+    Lookups are case insensitive, but keywords are returned as originally spelled,
+    so that they can be used for exact-match searches.
+
+    """
+
+    _root: typing.Dict
+    _size: int
+
+    # key of the keywords that end at a node, which can't clash with a character
+    _KEYWORDS = ""
+
+    def __init__(self, keywords: typing.Iterable[str] = ()):
+        self._root = {}
+        self._size = 0
+        for keyword in keywords:
+            self.add(keyword)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, keyword: str) -> None:
+        node = self._root
+        for character in keyword.casefold():
+            node = node.setdefault(character, {})
+        node_keywords = node.setdefault(self._KEYWORDS, [])
+        if keyword not in node_keywords:
+            node_keywords.append(keyword)
+            self._size += 1
+
+    def get(self, keyword: str) -> typing.Optional[str]:
+        """Return the keyword as spelled in the vocabulary, if it is part of it"""
+        node = self._find_node(keyword)
+        keywords = node.get(self._KEYWORDS) if node is not None else None
+        if keywords:
+            result = keyword if keyword in keywords else keywords[0]
+        else:
+            result = None
+        return result
+
+    def complete(
+        self, prefix: str, limit: typing.Optional[int] = None
+    ) -> typing.List[str]:
+        """Return the keywords that start with `prefix`, in alphabetical order"""
+        node = self._find_node(prefix)
+        result = []
+        if node is not None:
+            stack = [node]
+            while len(stack) > 0:
+                current = stack.pop()
+                result.extend(current.get(self._KEYWORDS, []))
+                stack.extend(
+                    child for key, child in current.items() if key != self._KEYWORDS
+                )
+            result.sort(key=str.casefold)
+        return result[:limit] if limit is not None else result
+
+    def _find_node(self, prefix: str) -> typing.Optional[typing.Dict]:
+        node = self._root
+        for character in prefix.casefold():
+            node = node.get(character)
+            if node is None:
+                break
+        return node
+
+
+@dataclasses.dataclass()
+class KeywordVocabulary:
+    keywords: KeywordTrie
+    fetched_at: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class KeywordVocabularyCache:
+    """Cache of the keyword vocabularies of GeoNode connections
+
+    Vocabularies are keyed by the connection they were retrieved from and expire
+    `ttl` seconds after having been fetched.
+
+    """
+
+    ttl: int
+    _lock: threading.Lock
+    _vocabularies: typing.Dict[KeywordCacheKey, KeywordVocabulary]
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._vocabularies = {}
+
+    def get(self, key: KeywordCacheKey) -> typing.Optional[KeywordVocabulary]:
+        with self._lock:
+            vocabulary = self._vocabularies.get(key)
+            if vocabulary is not None and vocabulary.age > self.ttl:
+                del self._vocabularies[key]
+                vocabulary = None
+        return vocabulary
+
+    def store(self, key: KeywordCacheKey, vocabulary: KeywordVocabulary) -> None:
+        with self._lock:
+            self._vocabularies[key] = vocabulary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vocabularies.clear()
+
+
+_keyword_vocabulary_cache: typing.Optional[KeywordVocabularyCache] = None
+
+
+def get_keyword_vocabulary_cache() -> KeywordVocabularyCache:
+    """Return the plugin-wide cache of keyword vocabularies"""
+    global _keyword_vocabulary_cache
+    if _keyword_vocabulary_cache is None:
+        _keyword_vocabulary_cache = KeywordVocabularyCache(ttl=KEYWORD_VOCABULARY_TTL)
+    return _keyword_vocabulary_cache
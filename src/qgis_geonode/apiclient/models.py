@@ -3,6 +3,7 @@ import datetime as dt
 import enum
 import json
 import math
+import threading
 import typing
 from uuid import UUID
 
@@ -23,6 +24,10 @@ from ..utils import log
 DATASET_CUSTOM_PROPERTY_KEY = "plugins/qgis_geonode/dataset"
 DATASET_CONNECTION_CUSTOM_PROPERTY_KEY = "plugins/qgis_geonode/dataset_connection"
 
+# parsed CRSs, keyed by their definition, shared by all threads
+_crs_cache: typing.Dict[str, QgsCoordinateReferenceSystem] = {}
+_crs_cache_lock = threading.Lock()
+
 
 class GeonodePermission(enum.Enum):
     VIEW_RESOURCEBASE = "view_resourcebase"
@@ -123,35 +128,143 @@ class BriefGeonodeStyle:
     sld: typing.Optional[QtXml.QDomElement] = None
 
 
-@dataclasses.dataclass()
-class BriefDataset:
-    pk: int
-    uuid: UUID
+# callables that build the value of a dataset field out of the raw API response
+FieldParsers = typing.Dict[str, typing.Callable[[typing.Dict], typing.Any]]
+
+
+class _LazyField:
+    """Dataset field whose value is only built when it is first accessed"""
+
     name: str
-    dataset_sub_type: GeonodeResourceType
-    title: str
-    abstract: str
-    published_date: typing.Optional[dt.datetime]
-    spatial_extent: QgsRectangle
-    temporal_extent: typing.Optional[typing.List[dt.datetime]]
-    srid: QgsCoordinateReferenceSystem
-    thumbnail_url: str
-    link: str
-    detail_url: str
-    keywords: typing.List[str]
-    category: typing.Optional[str]
-    service_urls: typing.Dict[GeonodeService, str]
-    default_style: BriefGeonodeStyle
-    permissions: typing.List[GeonodePermission]
+    slot: str
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            result = self
+        else:
+            try:
+                result = getattr(instance, self.slot)
+            except AttributeError:
+                result = instance._field_parsers[self.name](instance._raw)
+                setattr(instance, self.slot, result)
+        return result
+
+    def __set__(self, instance, value) -> None:
+        setattr(instance, self.slot, value)
+
+
+class BriefDataset:
+    """Dataset, as shown in the search results
+
+    Search results may hold many datasets, of which only a few fields are ever
+    looked at, so datasets built with `from_raw()` keep the raw API response and
+    build each field on first access. Fields whose parsing may fail are expected to
+    be accessed by whoever builds the dataset, so that malformed datasets are
+    rejected before being shown.
+
+    """
+
+    _FIELDS = (
+        "pk",
+        "uuid",
+        "name",
+        "dataset_sub_type",
+        "title",
+        "abstract",
+        "published_date",
+        "spatial_extent",
+        "temporal_extent",
+        "srid",
+        "thumbnail_url",
+        "link",
+        "detail_url",
+        "keywords",
+        "category",
+        "service_urls",
+        "default_style",
+        "permissions",
+    )
+    __slots__ = ("_raw", "_field_parsers") + tuple(f"_{f}" for f in _FIELDS)
+
+    pk: int = _LazyField()
+    uuid: UUID = _LazyField()
+    name: str = _LazyField()
+    dataset_sub_type: GeonodeResourceType = _LazyField()
+    title: str = _LazyField()
+    abstract: str = _LazyField()
+    published_date: typing.Optional[dt.datetime] = _LazyField()
+    spatial_extent: QgsRectangle = _LazyField()
+    temporal_extent: typing.Optional[typing.List[dt.datetime]] = _LazyField()
+    srid: QgsCoordinateReferenceSystem = _LazyField()
+    thumbnail_url: str = _LazyField()
+    link: str = _LazyField()
+    detail_url: str = _LazyField()
+    keywords: typing.List[str] = _LazyField()
+    category: typing.Optional[str] = _LazyField()
+    service_urls: typing.Dict[GeonodeService, str] = _LazyField()
+    default_style: BriefGeonodeStyle = _LazyField()
+    permissions: typing.List[GeonodePermission] = _LazyField()
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self._FIELDS, args))
+        values.update(kwargs)
+        missing = [name for name in self._FIELDS if name not in values]
+        unknown = [name for name in values if name not in self._FIELDS]
+        if len(args) > len(self._FIELDS) or len(missing) > 0 or len(unknown) > 0:
+            raise TypeError(
+                f"Invalid arguments for {type(self).__name__}: missing {missing}, "
+                f"unknown {unknown}"
+            )
+        self._raw = None
+        self._field_parsers = {}
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_raw(cls, raw_dataset: typing.Dict, field_parsers: FieldParsers):
+        """Build a dataset whose fields are parsed out of `raw_dataset` on demand"""
+        instance = cls.__new__(cls)
+        instance._raw = raw_dataset
+        instance._field_parsers = field_parsers
+        return instance
+
+    def _field_values(self) -> typing.Tuple:
+        return tuple(getattr(self, name) for name in self._FIELDS)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            result = NotImplemented
+        elif self._raw is not None and other._raw is not None:
+            result = self._raw == other._raw
+        else:
+            result = self._field_values() == other._field_values()
+        return result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(pk={self.pk!r}, title={self.title!r})"
 
 
-@dataclasses.dataclass()
 class Dataset(BriefDataset):
-    language: str
-    license: str
-    constraints: str
-    owner: typing.Dict[str, str]
-    metadata_author: typing.Dict[str, str]
+    _FIELDS = BriefDataset._FIELDS + (
+        "language",
+        "license",
+        "constraints",
+        "owner",
+        "metadata_author",
+    )
+    __slots__ = tuple(f"_{f}" for f in _FIELDS[len(BriefDataset._FIELDS) :])
+
+    language: str = _LazyField()
+    license: str = _LazyField()
+    constraints: str = _LazyField()
+    owner: typing.Dict[str, str] = _LazyField()
+    metadata_author: typing.Dict[str, str] = _LazyField()
 
     def to_json(self):
         if self.temporal_extent is not None:
@@ -241,7 +354,7 @@ class Dataset(BriefDataset):
             ),
             spatial_extent=qgis.core.QgsRectangle.fromWkt(parsed["spatial_extent"]),
             temporal_extent=temporal_extent,
-            srid=qgis.core.QgsCoordinateReferenceSystem.fromEpsgId(parsed["srid"]),
+            srid=get_crs(f"EPSG:{parsed['srid']}"),
             thumbnail_url=parsed["thumbnail_url"],
             link=parsed["link"],
             detail_url=parsed["detail_url"],
@@ -264,6 +377,14 @@ class Dataset(BriefDataset):
         )
 
 
+@dataclasses.dataclass
+class DatasetDetails:
+    """Datasets retrieved in bulk, along with why some of them could not be"""
+
+    datasets: typing.Dict[int, Dataset] = dataclasses.field(default_factory=dict)
+    errors: typing.Dict[int, str] = dataclasses.field(default_factory=dict)
+
+
 @dataclasses.dataclass
 class GeonodeApiSearchFilters:
     page: typing.Optional[int] = 1
@@ -283,6 +404,29 @@ class GeonodeApiSearchFilters:
     spatial_extent: typing.Optional[qgis.core.QgsRectangle] = None
 
 
+def get_crs(definition: str) -> QgsCoordinateReferenceSystem:
+    """Return the CRS with the input definition, e.g. `EPSG:4326`
+
+    Creating a CRS means querying the proj database, which is slow. Catalogs
+    usually use just a handful of CRSs, so each definition is parsed only once
+    and subsequent calls get a copy of the cached CRS. Copies are cheap, as the
+    CRS data is implicitly shared.
+
+    """
+
+    with _crs_cache_lock:
+        crs = _crs_cache.get(definition)
+        if crs is None:
+            crs = QgsCoordinateReferenceSystem(definition)
+            _crs_cache[definition] = crs
+    return QgsCoordinateReferenceSystem(crs)
+
+
+def clear_crs_cache() -> None:
+    with _crs_cache_lock:
+        _crs_cache.clear()
+
+
 def loading_style_supported(
     layer_type: qgis.core.QgsMapLayerType,
     capabilities: typing.List[ApiClientCapability],
@@ -0,0 +1,96 @@
+"""In-memory cache of search result pages, shared by all API clients"""
+
+import collections
+import dataclasses
+import threading
+import time
+import typing
+
+from ..conf import settings_manager
+from . import models
+
+# connection base URL, auth config and URL of the search results page
+SearchCacheKey = typing.Tuple[str, str, str]
+
+
+@dataclasses.dataclass()
+class SearchPage:
+    brief_datasets: typing.List[models.BriefDataset]
+    pagination_info: models.GeonodePaginationInfo
+    fetched_at: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class SearchPageCache:
+    """LRU cache of the results of searches made against GeoNode connections
+
+    Pages are keyed by the connection they were retrieved from and by the URL of the
+    search request, which already is a normalized representation of the search
+    filters, including the requested page.
+
+    Pages are fresh for `ttl` seconds. After that they become stale, meaning they can
+    still be shown while the search is performed again in the background, until
+    they are older than `ttl + max_stale` seconds, when they are not served anymore.
+
+    """
+
+    max_pages: int
+    ttl: int
+    max_stale: int
+    _lock: threading.Lock
+    _pages: typing.OrderedDict[SearchCacheKey, SearchPage]
+
+    def __init__(self, max_pages: int, ttl: int, max_stale: int = 0):
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._lock = threading.Lock()
+        self._pages = collections.OrderedDict()
+
+    def get(self, key: SearchCacheKey) -> typing.Optional[SearchPage]:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None and page.age > self.ttl + self.max_stale:
+                del self._pages[key]
+                page = None
+            elif page is not None:
+                self._pages.move_to_end(key)
+        return page
+
+    def is_stale(self, page: SearchPage) -> bool:
+        return page.age > self.ttl
+
+    def store(self, key: SearchCacheKey, page: SearchPage) -> None:
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > max(0, self.max_pages):
+                self._pages.popitem(last=False)
+
+    def clear(self, base_url: typing.Optional[str] = None) -> None:
+        """Remove cached pages, either all of them or just those of a connection"""
+        with self._lock:
+            if base_url is None:
+                self._pages.clear()
+            else:
+                for key in [k for k in self._pages if k[0] == base_url]:
+                    del self._pages[key]
+
+
+_search_page_cache: typing.Optional[SearchPageCache] = None
+
+
+def get_search_page_cache() -> SearchPageCache:
+    """Return the plugin-wide cache of search result pages"""
+    global _search_page_cache
+    if _search_page_cache is None:
+        cache_settings = settings_manager.get_search_cache_settings()
+        _search_page_cache = SearchPageCache(
+            max_pages=cache_settings.max_pages,
+            ttl=cache_settings.ttl,
+            max_stale=cache_settings.max_stale,
+        )
+    return _search_page_cache
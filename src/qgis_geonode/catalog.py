@@ -0,0 +1,408 @@
+"""Local full-text index of the datasets published by a GeoNode connection"""
+
+import contextlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import typing
+import uuid
+from pathlib import Path
+
+import qgis.core
+from qgis.PyQt import QtCore
+
+from .apiclient import models
+from .utils import log
+
+# columns of the full-text index, mapped to the search filter they answer
+_TEXT_FILTER_COLUMNS = {
+    "title": "title",
+    "abstract": "abstract",
+    "keyword": "keywords",
+}
+
+# seconds after which the whole catalog is harvested again, in order to find out
+# about datasets that have been deleted or are no longer visible
+RECONCILIATION_INTERVAL = 24 * 60 * 60
+
+
+class LocalCatalog:
+    """An SQLite database holding the raw datasets harvested from a remote GeoNode
+
+    Datasets are stored as returned by the remote API, together with the columns
+    needed for filtering and sorting them. Titles, abstracts and keywords are kept in
+    an FTS5 index, which answers text searches by word prefix. Geographic bounding
+    boxes are kept in an R*Tree index, which answers searches by spatial extent, as
+    GeoNode cannot filter by extent itself.
+
+    The `last_updated` value of the most recently modified dataset is stored as the
+    sync watermark, so that subsequent harvests only need to ask the remote for
+    datasets that have changed since then. Incremental harvests cannot find out
+    about datasets that have been deleted, or that the user is no longer allowed to
+    see, so every `reconciliation_interval` seconds the whole catalog is harvested
+    again and the datasets it no longer includes are dropped.
+
+    Datasets are only visible to some users, so the catalog is tied to the auth
+    config they were harvested with and emptied when used with another one.
+
+    Access to the database is serialized, as harvesting happens in background
+    threads while searches run on the main thread. The `harvesting` flag is only
+    touched on the main thread.
+
+    """
+
+    database_path: Path
+    harvesting: bool
+    reconciliation_interval: int
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        database_path: Path,
+        reconciliation_interval: int = RECONCILIATION_INTERVAL,
+    ):
+        self.database_path = database_path
+        self.harvesting = False
+        self.reconciliation_interval = reconciliation_interval
+        self._lock = threading.Lock()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS dataset ("
+                "pk INTEGER PRIMARY KEY, "
+                "raw TEXT NOT NULL, "
+                "title TEXT NOT NULL, "
+                "abstract TEXT NOT NULL, "
+                "keywords TEXT NOT NULL, "
+                "subtype TEXT, "
+                "category TEXT, "
+                "publication_date TEXT, "
+                "temporal_extent_start TEXT, "
+                "temporal_extent_end TEXT, "
+                "last_updated TEXT"
+                ")"
+            )
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS dataset_fts USING fts5("
+                "title, abstract, keywords, content='dataset', content_rowid='pk'"
+                ")"
+            )
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS dataset_extent USING rtree("
+                "pk, min_x, max_x, min_y, max_y"
+                ")"
+            )
+            connection.executescript(
+                "CREATE TRIGGER IF NOT EXISTS dataset_ai AFTER INSERT ON dataset BEGIN "
+                "INSERT INTO dataset_fts (rowid, title, abstract, keywords) "
+                "VALUES (new.pk, new.title, new.abstract, new.keywords); "
+                "END; "
+                "CREATE TRIGGER IF NOT EXISTS dataset_ad AFTER DELETE ON dataset BEGIN "
+                "INSERT INTO dataset_fts (dataset_fts, rowid, title, abstract, keywords) "
+                "VALUES ('delete', old.pk, old.title, old.abstract, old.keywords); "
+                "END; "
+                "CREATE TABLE IF NOT EXISTS sync_state ("
+                "key TEXT PRIMARY KEY, value TEXT"
+                ");"
+            )
+
+    @property
+    def sync_watermark(self) -> typing.Optional[str]:
+        """`last_updated` of the most recently modified dataset that was harvested"""
+        return self._get_sync_state("watermark")
+
+    @property
+    def is_synced(self) -> bool:
+        return self.sync_watermark is not None
+
+    @property
+    def needs_reconciliation(self) -> bool:
+        """Whether the next harvest must go through the whole remote catalog"""
+        reconciled_at = self._get_sync_state("reconciled_at")
+        return (
+            reconciled_at is None
+            or time.time() - float(reconciled_at) > self.reconciliation_interval
+        )
+
+    def use_auth_config(self, auth_config: typing.Optional[str]) -> None:
+        """Empty the catalog if it has been harvested with another auth config"""
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM sync_state WHERE key = 'auth_config'"
+            ).fetchone()
+            if row is None or row[0] != (auth_config or ""):
+                if row is not None:
+                    log("Credentials have changed, emptying the local catalog...")
+                connection.execute("DELETE FROM dataset")
+                connection.execute("DELETE FROM dataset_extent")
+                connection.execute("DELETE FROM sync_state")
+                connection.execute(
+                    "INSERT INTO sync_state (key, value) VALUES ('auth_config', ?)",
+                    (auth_config or "",),
+                )
+
+    def store(self, raw_datasets: typing.Iterable[typing.Dict]) -> typing.Optional[str]:
+        """Insert or replace datasets, returning the newest `last_updated` among them"""
+        rows = []
+        extents = []
+        newest = None
+        for raw_dataset in raw_datasets:
+            last_updated = raw_dataset.get("last_updated")
+            if last_updated is not None and (newest is None or last_updated > newest):
+                newest = last_updated
+            if raw_dataset.get("date_type") == "publication":
+                publication_date = raw_dataset.get("date")
+            else:
+                publication_date = None
+            rows.append(
+                (
+                    int(raw_dataset["pk"]),
+                    json.dumps(raw_dataset),
+                    raw_dataset.get("title") or "",
+                    raw_dataset.get("raw_abstract")
+                    or raw_dataset.get("abstract")
+                    or "",
+                    " ".join(k["name"] for k in raw_dataset.get("keywords") or []),
+                    raw_dataset.get("subtype"),
+                    (raw_dataset.get("category") or {}).get("identifier"),
+                    publication_date,
+                    raw_dataset.get("temporal_extent_start"),
+                    raw_dataset.get("temporal_extent_end"),
+                    last_updated,
+                )
+            )
+            extent = _get_geographic_extent(raw_dataset)
+            if extent is not None:
+                extents.append((int(raw_dataset["pk"]), *extent))
+        with self._lock, self._connect() as connection:
+            # deleting first keeps the full-text index in sync with replaced rows
+            connection.executemany(
+                "DELETE FROM dataset WHERE pk = ?", [(row[0],) for row in rows]
+            )
+            connection.executemany(
+                "DELETE FROM dataset_extent WHERE pk = ?", [(row[0],) for row in rows]
+            )
+            connection.executemany(
+                "INSERT INTO dataset_extent (pk, min_x, max_x, min_y, max_y) "
+                "VALUES (?, ?, ?, ?, ?)",
+                extents,
+            )
+            connection.executemany(
+                "INSERT INTO dataset (pk, raw, title, abstract, keywords, subtype, "
+                "category, publication_date, temporal_extent_start, "
+                "temporal_extent_end, last_updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return newest
+
+    def set_sync_watermark(self, watermark: str) -> None:
+        self._set_sync_state("watermark", watermark)
+
+    def reconcile(self, harvested_pks: typing.Iterable[int]) -> int:
+        """Drop the datasets missing from a harvest of the whole remote catalog
+
+        Returns the number of datasets that were dropped.
+
+        """
+
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS harvested (pk INTEGER PRIMARY KEY)"
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO harvested (pk) VALUES (?)",
+                [(pk,) for pk in harvested_pks],
+            )
+            result = connection.execute(
+                "DELETE FROM dataset WHERE pk NOT IN (SELECT pk FROM harvested)"
+            ).rowcount
+            connection.execute(
+                "DELETE FROM dataset_extent WHERE pk NOT IN (SELECT pk FROM harvested)"
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) "
+                "VALUES ('reconciled_at', ?)",
+                (str(time.time()),),
+            )
+        return result
+
+    def count(self) -> int:
+        with self._lock, self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM dataset").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM dataset")
+            connection.execute("DELETE FROM dataset_extent")
+            connection.execute(
+                "DELETE FROM sync_state WHERE key IN ('watermark', 'reconciled_at')"
+            )
+
+    def search(
+        self, search_filters: models.GeonodeApiSearchFilters, page_size: int
+    ) -> typing.Tuple[typing.List[typing.Dict], int]:
+        """Return a page of raw datasets that match the filters and the total matches"""
+        conditions, params = _build_conditions(search_filters)
+        where = f"WHERE {' AND '.join(conditions)}" if len(conditions) > 0 else ""
+        if search_filters.ordering_field is not None:
+            direction = "DESC" if search_filters.reverse_ordering else "ASC"
+            order_by = f"title COLLATE NOCASE {direction}, pk"
+        else:
+            order_by = "pk DESC"
+        offset = (max(search_filters.page or 1, 1) - 1) * page_size
+        with self._lock, self._connect() as connection:
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM dataset {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT raw FROM dataset {where} ORDER BY {order_by} "
+                f"LIMIT ? OFFSET ?",
+                params + [page_size, offset],
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows], total
+
+    def _get_sync_state(self, key: str) -> typing.Optional[str]:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM sync_state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _set_sync_state(self, key: str, value: str) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.database_path), timeout=10)
+        try:
+            with connection:  # commits the transaction on exit
+                yield connection
+        finally:
+            connection.close()
+
+
+def _build_conditions(
+    search_filters: models.GeonodeApiSearchFilters,
+) -> typing.Tuple[typing.List[str], typing.List]:
+    conditions = []
+    params = []
+    match_terms = []
+    for filter_name, column in _TEXT_FILTER_COLUMNS.items():
+        value = getattr(search_filters, filter_name)
+        for word in re.findall(r"\w+", value or ""):
+            match_terms.append(f'{column} : "{word}"*')
+    if len(match_terms) > 0:
+        conditions.append(
+            "pk IN (SELECT rowid FROM dataset_fts WHERE dataset_fts MATCH ?)"
+        )
+        params.append(" AND ".join(match_terms))
+    if search_filters.layer_types:
+        subtypes = [layer_type.value for layer_type in search_filters.layer_types]
+        conditions.append(f"subtype IN ({', '.join('?' for _ in subtypes)})")
+        params.extend(subtypes)
+    if search_filters.topic_category is not None:
+        conditions.append("category = ?")
+        params.append(search_filters.topic_category.name.lower())
+    extent = search_filters.spatial_extent
+    if extent is not None and not extent.isNull():
+        # bounding boxes intersect unless one lies entirely to a side of the other.
+        # Datasets whose geographic extent is unknown are not ruled out
+        conditions.append(
+            "(pk NOT IN (SELECT pk FROM dataset_extent) OR pk IN ("
+            "SELECT pk FROM dataset_extent "
+            "WHERE min_x <= ? AND max_x >= ? AND min_y <= ? AND max_y >= ?))"
+        )
+        params.extend(
+            (
+                extent.xMaximum(),
+                extent.xMinimum(),
+                extent.yMaximum(),
+                extent.yMinimum(),
+            )
+        )
+    for filter_name, column, operator in (
+        ("temporal_extent_start", "temporal_extent_start", ">="),
+        ("temporal_extent_end", "temporal_extent_end", "<="),
+        ("publication_date_start", "publication_date", ">="),
+        ("publication_date_end", "publication_date", "<="),
+    ):
+        value: typing.Optional[QtCore.QDateTime] = getattr(search_filters, filter_name)
+        if value is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value.toString(QtCore.Qt.ISODate))
+    return conditions, params
+
+
+def _get_geographic_extent(
+    raw_dataset: typing.Dict,
+) -> typing.Optional[typing.Tuple[float, float, float, float]]:
+    """Return the dataset's bounding box in EPSG:4326, as min_x, max_x, min_y, max_y
+
+    GeoNode reports the bounding box in the dataset's own CRS and, in recent
+    versions, also in EPSG:4326. Datasets lacking the latter are only indexed if
+    their own CRS is EPSG:4326.
+
+    """
+
+    polygon = raw_dataset.get("ll_bbox_polygon")
+    if polygon is None and raw_dataset.get("srid") == "EPSG:4326":
+        polygon = raw_dataset.get("bbox_polygon")
+    try:
+        xs, ys = zip(*(coord[:2] for coord in polygon["coordinates"][0]))
+    except (KeyError, IndexError, TypeError, ValueError):
+        result = None
+    else:
+        result = min(xs), max(xs), min(ys), max(ys)
+    return result
+
+
+def is_available() -> bool:
+    """Check whether the SQLite library in use has been built with FTS5 and R*Tree"""
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE fts5_check USING fts5(content)")
+        connection.execute("CREATE VIRTUAL TABLE rtree_check USING rtree(id, x, y)")
+    except sqlite3.OperationalError:
+        result = False
+    else:
+        result = True
+    finally:
+        connection.close()
+    return result
+
+
+_local_catalogs: typing.Dict[str, LocalCatalog] = {}
+
+
+def get_local_catalog(
+    connection_id: uuid.UUID, auth_config: typing.Optional[str] = None
+) -> typing.Optional[LocalCatalog]:
+    """Return the local catalog of a connection, if full-text search is available
+
+    Catalogs are stored inside the current QGIS profile directory. A catalog that
+    was harvested with another auth config than the connection's current one is
+    emptied.
+
+    """
+
+    key = str(connection_id)
+    if key not in _local_catalogs and is_available():
+        _local_catalogs[key] = LocalCatalog(
+            Path(qgis.core.QgsApplication.qgisSettingsDirPath())
+            / "qgis_geonode"
+            / "catalogs"
+            / f"{key}.sqlite"
+        )
+    elif key not in _local_catalogs:
+        log("SQLite lacks full-text or spatial indexes, not using a local catalog")
+    result = _local_catalogs.get(key)
+    if result is not None:
+        result.use_auth_config(auth_config)
+    return result
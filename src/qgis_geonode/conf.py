@@ -15,7 +15,10 @@ from qgis.core import QgsRectangle, QgsSettings
 
 from .apiclient import models
 from .apiclient.models import GeonodeResourceType, IsoTopicCategory
-from .network import UNSUPPORTED_REMOTE
+from .network import (
+    UNSUPPORTED_REMOTE,
+    RetryPolicy,
+)
 from .utils import log
 from packaging import version as packaging_version
 
@@ -59,6 +62,8 @@ class ConnectionSettings:
     geonode_version: typing.Optional[packaging_version.Version] = None
     wfs_version: typing.Optional[WfsVersion] = WfsVersion.AUTO
     auth_config: typing.Optional[str] = None
+    # whether searches are answered from a local copy of the remote catalog
+    local_catalog: bool = False
 
     @classmethod
     def from_qgs_settings(cls, connection_identifier: str, settings: QgsSettings):
@@ -79,6 +84,7 @@ class ConnectionSettings:
             auth_config=reported_auth_cfg,
             geonode_version=geonode_version,
             wfs_version=WfsVersion(settings.value("wfs_version", "1.1.0")),
+            local_catalog=settings.value("local_catalog", False, type=bool),
         )
 
     def to_json(self):
@@ -93,10 +99,48 @@ class ConnectionSettings:
                 if self.geonode_version is not None
                 else None,
                 "wfs_version": self.wfs_version.value,
+                "local_catalog": self.local_catalog,
             }
         )
 
 
+@dataclasses.dataclass
+class HttpCacheSettings:
+    """Settings for the persistent cache of HTTP responses"""
+
+    enabled: bool = True
+    max_size: int = 50 * 1024 * 1024  # in bytes
+
+
+@dataclasses.dataclass
+class DatasetCacheSettings:
+    """Settings for the persistent cache of dataset details"""
+
+    enabled: bool = True
+    # details are served without asking the remote for this long
+    ttl: int = 7 * 24 * 60 * 60  # in seconds
+
+
+@dataclasses.dataclass
+class RequestSchedulerSettings:
+    """Settings for the scheduler of network requests"""
+
+    max_concurrent_requests_per_host: int = 6
+
+
+@dataclasses.dataclass
+class SearchCacheSettings:
+    """Settings for the in-memory cache of search result pages"""
+
+    max_pages: int = 50
+    # pages are served without asking the remote for this long
+    ttl: int = 300  # in seconds
+    # after that, they are still served while being revalidated, for this long
+    max_stale: int = 3600  # in seconds
+    prefetch_next_page: bool = True
+    prefetch_previous_page: bool = False
+
+
 class PluginMetadata:
     def prepare(self, plugin_dir):
         self.plugin_dir = plugin_dir
@@ -122,6 +166,11 @@ class SettingsManager(QtCore.QObject):
     BASE_GROUP_NAME: str = "qgis_geonode"
     SELECTED_CONNECTION_KEY: str = "selected_connection"
     CURRENT_FILTERS_KEY: str = "current_search_filters"
+    HTTP_CACHE_KEY: str = "http_cache"
+    DATASET_CACHE_KEY: str = "dataset_cache"
+    REQUEST_SCHEDULER_KEY: str = "request_scheduler"
+    RETRY_POLICY_KEY: str = "retry_policy"
+    SEARCH_CACHE_KEY: str = "search_cache"
 
     current_connection_changed = QtCore.pyqtSignal(str)
 
@@ -187,6 +236,7 @@ class SettingsManager(QtCore.QObject):
             settings.setValue("page_size", connection_settings.page_size)
             settings.setValue("wfs_version", connection_settings.wfs_version.value)
             settings.setValue("auth_config", connection_settings.auth_config)
+            settings.setValue("local_catalog", connection_settings.local_catalog)
             settings.setValue(
                 "geonode_version",
                 (
@@ -274,6 +324,9 @@ class SettingsManager(QtCore.QObject):
                 settings.setValue(
                     "spatial_extent_west", filters.spatial_extent.xMinimum()
                 )
+            else:
+                for name in ("north", "south", "east", "west"):
+                    settings.setValue(f"spatial_extent_{name}", None)
             settings.setValue("sort_by_field", filters.ordering_field)
             settings.setValue("reverse_sort_order", filters.reverse_ordering)
 
@@ -323,6 +376,75 @@ class SettingsManager(QtCore.QObject):
             settings.setValue(self.CURRENT_FILTERS_KEY, None)
         self.current_connection_changed.emit("")
 
+    def get_http_cache_settings(self) -> HttpCacheSettings:
+        default = HttpCacheSettings()
+        with qgis_settings(f"{self.BASE_GROUP_NAME}/{self.HTTP_CACHE_KEY}") as settings:
+            result = HttpCacheSettings(
+                enabled=settings.value("enabled", default.enabled, type=bool),
+                max_size=settings.value("max_size", default.max_size, type=int),
+            )
+        return result
+
+    def get_dataset_cache_settings(self) -> DatasetCacheSettings:
+        default = DatasetCacheSettings()
+        with qgis_settings(
+            f"{self.BASE_GROUP_NAME}/{self.DATASET_CACHE_KEY}"
+        ) as settings:
+            result = DatasetCacheSettings(
+                enabled=settings.value("enabled", default.enabled, type=bool),
+                ttl=settings.value("ttl", default.ttl, type=int),
+            )
+        return result
+
+    def get_request_scheduler_settings(self) -> RequestSchedulerSettings:
+        default = RequestSchedulerSettings()
+        with qgis_settings(
+            f"{self.BASE_GROUP_NAME}/{self.REQUEST_SCHEDULER_KEY}"
+        ) as settings:
+            result = RequestSchedulerSettings(
+                max_concurrent_requests_per_host=settings.value(
+                    "max_concurrent_requests_per_host",
+                    default.max_concurrent_requests_per_host,
+                    type=int,
+                )
+            )
+        return result
+
+    def get_search_cache_settings(self) -> SearchCacheSettings:
+        default = SearchCacheSettings()
+        with qgis_settings(
+            f"{self.BASE_GROUP_NAME}/{self.SEARCH_CACHE_KEY}"
+        ) as settings:
+            result = SearchCacheSettings(
+                max_pages=settings.value("max_pages", default.max_pages, type=int),
+                ttl=settings.value("ttl", default.ttl, type=int),
+                max_stale=settings.value("max_stale", default.max_stale, type=int),
+                prefetch_next_page=settings.value(
+                    "prefetch_next_page", default.prefetch_next_page, type=bool
+                ),
+                prefetch_previous_page=settings.value(
+                    "prefetch_previous_page", default.prefetch_previous_page, type=bool
+                ),
+            )
+        return result
+
+    def get_retry_policy(self) -> RetryPolicy:
+        default = RetryPolicy()
+        with qgis_settings(
+            f"{self.BASE_GROUP_NAME}/{self.RETRY_POLICY_KEY}"
+        ) as settings:
+            result = RetryPolicy(
+                max_attempts=settings.value(
+                    "max_attempts", default.max_attempts, type=int
+                ),
+                base_delay=settings.value("base_delay", default.base_delay, type=int),
+                max_delay=settings.value("max_delay", default.max_delay, type=int),
+                time_budget=settings.value(
+                    "time_budget", default.time_budget, type=int
+                ),
+            )
+        return result
+
 
 settings_manager = SettingsManager()
 plugin_metadata = PluginMetadata()
@@ -0,0 +1,240 @@
+"""Persistent cache of the details of datasets retrieved from remote GeoNode servers"""
+
+import contextlib
+import datetime as dt
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+import qgis.core
+
+from .apiclient import models
+from .conf import settings_manager
+from .utils import log
+
+# number of datasets kept in the cache, the least recently retrieved ones being
+# dropped first
+MAX_CACHED_DATASETS = 5000
+
+
+class DatasetDetailCache:
+    """A disk-backed cache of dataset details
+
+    Datasets are stored in an SQLite database, serialized the same way as they are
+    stored in QGIS projects. They are keyed by the connection they were retrieved
+    from, meaning its base URL and auth config, and by their primary key. The
+    dataset's default style is not cached, as it is retrieved separately.
+
+    Cached details are served for `ttl` seconds. Before that, they are dropped as
+    soon as a search reports that the dataset has been modified on the remote,
+    which is found out by comparing its `last_updated` value with the one the
+    details were retrieved with. These are stored as POSIX timestamps, as GeoNode
+    formats them inconsistently, e.g. leaving out zero microseconds.
+
+    Expired datasets are purged whenever the cache is opened or written to, and no
+    more than `max_entries` datasets are kept.
+
+    Access to the database is serialized, as the cache is shared by all API
+    clients, whose responses are parsed in different threads.
+
+    """
+
+    enabled: bool
+    ttl: int
+    max_entries: int
+    database_path: Path
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        database_path: Path,
+        ttl: int,
+        enabled: bool = True,
+        max_entries: int = MAX_CACHED_DATASETS,
+    ):
+        self.database_path = database_path
+        self.ttl = ttl
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS dataset ("
+                "base_url TEXT NOT NULL, "
+                "auth_config TEXT NOT NULL, "
+                "pk INTEGER NOT NULL, "
+                "last_updated REAL, "
+                "fetched_at REAL NOT NULL, "
+                "contents TEXT NOT NULL, "
+                "PRIMARY KEY (base_url, auth_config, pk)"
+                ")"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS dataset_fetched_at_idx "
+                "ON dataset (fetched_at)"
+            )
+            self._purge(connection)
+
+    def get(
+        self, base_url: str, auth_config: typing.Optional[str], pk: int
+    ) -> typing.Optional[models.Dataset]:
+        if self.enabled:
+            key = (base_url, auth_config or "", pk)
+            with self._lock, self._connect() as connection:
+                row = connection.execute(
+                    "SELECT fetched_at, contents FROM dataset "
+                    "WHERE base_url = ? AND auth_config = ? AND pk = ?",
+                    key,
+                ).fetchone()
+                if row is not None and time.time() - row[0] > self.ttl:
+                    connection.execute(
+                        "DELETE FROM dataset "
+                        "WHERE base_url = ? AND auth_config = ? AND pk = ?",
+                        key,
+                    )
+                    row = None
+            try:
+                result = models.Dataset.from_json(row[1]) if row is not None else None
+            except (KeyError, TypeError, ValueError) as exc:
+                log(f"Could not deserialize cached dataset {pk!r}: {exc}")
+                result = None
+        else:
+            result = None
+        return result
+
+    def store(
+        self,
+        base_url: str,
+        auth_config: typing.Optional[str],
+        dataset: models.Dataset,
+        last_updated: typing.Optional[str],
+    ) -> None:
+        if self.enabled:
+            try:
+                contents = dataset.to_json()
+            except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                log(f"Could not cache dataset {dataset.pk!r}, skipping: {exc}")
+            else:
+                with self._lock, self._connect() as connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO dataset (base_url, auth_config, pk, "
+                        "last_updated, fetched_at, contents) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            base_url,
+                            auth_config or "",
+                            dataset.pk,
+                            _to_timestamp(last_updated),
+                            time.time(),
+                            contents,
+                        ),
+                    )
+                    self._purge(connection)
+
+    def invalidate_modified(
+        self,
+        base_url: str,
+        auth_config: typing.Optional[str],
+        last_updated: typing.Dict[int, str],
+    ) -> int:
+        """Drop the datasets that are older than the input `last_updated` values
+
+        Datasets cached without a `last_updated` value are dropped too, as there is
+        no telling how old they are. Datasets cached with a more recent value than
+        the input one are kept, since the input may come from an outdated response.
+
+        Returns the number of cached datasets that were dropped.
+
+        """
+
+        timestamps = {pk: _to_timestamp(value) for pk, value in last_updated.items()}
+        rows = [
+            (base_url, auth_config or "", pk, timestamp)
+            for pk, timestamp in timestamps.items()
+            if timestamp is not None
+        ]
+        if self.enabled and len(rows) > 0:
+            with self._lock, self._connect() as connection:
+                result = connection.executemany(
+                    "DELETE FROM dataset "
+                    "WHERE base_url = ? AND auth_config = ? AND pk = ? "
+                    "AND (last_updated IS NULL OR last_updated < ?)",
+                    rows,
+                ).rowcount
+        else:
+            result = 0
+        return result
+
+    def invalidate(
+        self, base_url: str, auth_config: typing.Optional[str], pk: int
+    ) -> None:
+        """Drop a dataset, e.g. because it is known to have been modified"""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "DELETE FROM dataset WHERE base_url = ? AND auth_config = ? AND pk = ?",
+                (base_url, auth_config or "", pk),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM dataset")
+
+    def _purge(self, connection: sqlite3.Connection) -> None:
+        """Remove expired datasets and then the oldest ones, until the cache fits"""
+        connection.execute(
+            "DELETE FROM dataset WHERE fetched_at < ?", (time.time() - self.ttl,)
+        )
+        connection.execute(
+            "DELETE FROM dataset WHERE rowid IN ("
+            "SELECT rowid FROM dataset ORDER BY fetched_at DESC LIMIT -1 OFFSET ?"
+            ")",
+            (self.max_entries,),
+        )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.database_path), timeout=10)
+        try:
+            with connection:  # commits the transaction on exit
+                yield connection
+        finally:
+            connection.close()
+
+
+def _to_timestamp(value: typing.Optional[str]) -> typing.Optional[float]:
+    """Convert an ISO 8601 datetime, as reported by GeoNode, to a POSIX timestamp"""
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        result = None
+    else:
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt.timezone.utc)
+        result = parsed.timestamp()
+    return result
+
+
+_dataset_cache: typing.Optional[DatasetDetailCache] = None
+
+
+def get_dataset_cache() -> DatasetDetailCache:
+    """Return the plugin-wide cache of dataset details
+
+    The cache is stored inside the current QGIS profile directory.
+
+    """
+
+    global _dataset_cache
+    if _dataset_cache is None:
+        cache_settings = settings_manager.get_dataset_cache_settings()
+        _dataset_cache = DatasetDetailCache(
+            Path(qgis.core.QgsApplication.qgisSettingsDirPath())
+            / "qgis_geonode"
+            / "dataset_cache.sqlite",
+            ttl=cache_settings.ttl,
+            enabled=cache_settings.enabled,
+        )
+    return _dataset_cache
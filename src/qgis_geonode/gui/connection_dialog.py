@@ -33,6 +33,7 @@ class ConnectionDialog(QtWidgets.QDialog, DialogUi):
     page_size_sb: QtWidgets.QSpinBox
     wfs_version_cb: QtWidgets.QComboBox
     detect_wfs_version_pb: QtWidgets.QPushButton
+    local_catalog_chb: QtWidgets.QCheckBox
     network_timeout_sb: QtWidgets.QSpinBox
     connection_pb: QtWidgets.QPushButton
     buttonBox: QtWidgets.QDialogButtonBox
@@ -78,6 +79,7 @@ class ConnectionDialog(QtWidgets.QDialog, DialogUi):
                 connection_settings.wfs_version
             )
             self.wfs_version_cb.setCurrentIndex(wfs_version_index)
+            self.local_catalog_chb.setChecked(connection_settings.local_catalog)
             if self.remote_geonode_version == network.UNSUPPORTED_REMOTE:
                 utils.show_message(
                     self.bar,
@@ -159,6 +161,7 @@ class ConnectionDialog(QtWidgets.QDialog, DialogUi):
             page_size=self.page_size_sb.value(),
             geonode_version=self.remote_geonode_version,
             wfs_version=self.wfs_version_cb.currentData(),
+            local_catalog=self.local_catalog_chb.isChecked(),
         )
 
     def test_connection(self):
@@ -22,6 +22,11 @@ from .. import (
     conf,
     utils,
 )
+from ..apiclient.federated import (
+    FederatedResult,
+    FederatedSearch,
+    ServerSearchOutcome,
+)
 from ..apiclient.models import ApiClientCapability, IsoTopicCategory
 from ..gui.connection_dialog import ConnectionDialog
 from ..gui.search_result_widget import SearchResultWidget
@@ -37,6 +42,9 @@ _INVALID_CONNECTION_MESSAGE = (
     "Current connection is invalid. Please review connection settings."
 )
 
+# maximum number of keywords suggested while typing in the keyword filter
+_MAX_KEYWORD_COMPLETIONS = 50
+
 
 class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
     advanced_search_gb: qgis.gui.QgsCollapsibleGroupBox
@@ -50,7 +58,10 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
     current_page: int = 0
     edit_connection_btn: QtWidgets.QPushButton
     delete_connection_btn: QtWidgets.QPushButton
+    federated_search: typing.Optional[FederatedSearch] = None
+    federated_search_chb: QtWidgets.QCheckBox
     keyword_la: QtWidgets.QLabel
+    keyword_completer: QtWidgets.QCompleter
     keyword_le: QtWidgets.QLineEdit
     message_bar: qgis.gui.QgsMessageBar
     next_btn: QtWidgets.QPushButton
@@ -61,6 +72,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
     publication_start_dte: qgis.gui.QgsDateTimeEdit
     publication_end_dte: qgis.gui.QgsDateTimeEdit
     raster_chb: QtWidgets.QCheckBox
+    refresh_btn: QtWidgets.QPushButton
     resource_types_la: QtWidgets.QLabel
     resource_types_btngrp: QtWidgets.QButtonGroup
     reverse_order_chb: QtWidgets.QCheckBox
@@ -82,6 +94,8 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
     load_layer_finished = QtCore.pyqtSignal()
 
     _connection_controls = typing.List[QtWidgets.QWidget]
+    # widgets of the federated search results being shown, by connection id and pk
+    _federated_result_widgets: typing.Dict[typing.Tuple[str, int], SearchResultWidget]
     _search_controls = typing.List[QtWidgets.QWidget]
     _search_filters = typing.List[QtWidgets.QWidget]
     _usable_search_filters = typing.List[QtWidgets.QWidget]
@@ -90,8 +104,12 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
     def __init__(self, parent, fl, widgetMode):
         super().__init__(parent, fl, widgetMode)
         self.setupUi(self)
+        self._federated_result_widgets = {}
         self.advanced_search_gb.setCollapsed(True)
         self.search_btn.setIcon(QtGui.QIcon(":/images/themes/default/search.svg"))
+        self.refresh_btn.setIcon(
+            QtGui.QIcon(":/images/themes/default/mActionRefresh.svg")
+        )
         self.next_btn.setIcon(
             QtGui.QIcon(":/images/themes/default/mActionAtlasNext.svg")
         )
@@ -119,6 +137,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
             self.new_connection_btn,
             self.edit_connection_btn,
             self.delete_connection_btn,
+            self.federated_search_chb,
         ]
         self._search_filters = [
             self.title_la,
@@ -138,6 +157,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         ]
         self._search_controls = [
             self.search_btn,
+            self.refresh_btn,
             self.next_btn,
             self.previous_btn,
             self.sort_field_cmb,
@@ -166,8 +186,12 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         self.search_btn.clicked.connect(
             partial(self.search_geonode, reset_pagination=True)
         )
+        self.refresh_btn.clicked.connect(
+            partial(self.search_geonode, force_refresh=True)
+        )
         self.next_btn.clicked.connect(self.request_next_page)
         self.previous_btn.clicked.connect(self.request_previous_page)
+        self.federated_search_chb.toggled.connect(self.toggle_federated_search)
 
         self.temporal_extent_start_dte.clear()
         self.temporal_extent_end_dte.clear()
@@ -176,6 +200,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
 
         self._load_categories()
         self._initialize_spatial_extent_box()
+        self._initialize_keyword_completer()
         self.title_le.textChanged.connect(self.store_search_filters)
         self.abstract_le.textChanged.connect(self.store_search_filters)
         self.keyword_le.textChanged.connect(self.store_search_filters)
@@ -186,6 +211,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         self.publication_start_dte.valueChanged.connect(self.store_search_filters)
         self.publication_end_dte.valueChanged.connect(self.store_search_filters)
         self.spatial_extent_box.extentChanged.connect(self.store_search_filters)
+        self.spatial_extent_box.toggled.connect(self.store_search_filters)
         self.sort_field_cmb.currentIndexChanged.connect(self.store_search_filters)
         self.reverse_order_chb.toggled.connect(self.store_search_filters)
         for button in self.findChildren(QtWidgets.QPushButton):
@@ -220,6 +246,28 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         self.spatial_extent_box.setOutputExtentFromCurrent()
         self.spatial_extent_box.setMapCanvas(map_canvas)
 
+    def _initialize_keyword_completer(self):
+        # completions are looked up in the connection's keyword vocabulary as the
+        # user types, rather than having the completer filter the whole vocabulary
+        self.keyword_completer = QtWidgets.QCompleter(self)
+        self.keyword_completer.setModel(QtCore.QStringListModel(self.keyword_completer))
+        self.keyword_completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.keyword_le.setCompleter(self.keyword_completer)
+        self.keyword_le.textEdited.connect(self.update_keyword_completions)
+
+    def update_keyword_completions(self, text: str):
+        vocabulary = (
+            self.api_client.keyword_vocabulary if self.api_client is not None else None
+        )
+        if vocabulary is not None and text != "":
+            completions = vocabulary.complete(text, limit=_MAX_KEYWORD_COMPLETIONS)
+        else:
+            completions = []
+        self.keyword_completer.model().setStringList(completions)
+
+    def handle_keyword_list(self, keywords: typing.List[str]):
+        self.update_keyword_completions(self.keyword_le.text())
+
     def toggle_connection_management_buttons(self):
         """Enable/disable connection edit and delete buttons."""
         current_name = self.connections_cmb.currentText()
@@ -297,9 +345,11 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         self.toggle_connection_management_buttons()
         # Clear error messages from other connections
         self.message_bar.clearWidgets()
+        self.cancel_pending_requests()
         self.clear_search_results()
         self.current_page = 1
         self.total_pages = 1
+        self.keyword_completer.model().setStringList([])
         current_text = self.connections_cmb.itemText(index)
         try:
             current_connection = conf.settings_manager.find_connection_by_name(
@@ -323,6 +373,12 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
                     self.api_client.search_error_received.connect(
                         self.handle_search_error
                     )
+                    self.api_client.keyword_list_received.connect(
+                        self.handle_keyword_list
+                    )
+                    self.api_client.get_keyword_list()
+                    # pick up the datasets that changed since the last sync
+                    self.api_client.sync_local_catalog()
                 else:
                     # don't know if current config is valid or not yet, need to detect it
                     pass
@@ -340,10 +396,13 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
                     for check_box in self.resource_types_btngrp.buttons():
                         if check_box.isChecked():
                             enable_search = True
-                            enable_previous = self.current_page > 1
-                            enable_next = self.current_page < self.total_pages
+                            # federated searches only show the first page
+                            if not self.federated_search_chb.isChecked():
+                                enable_previous = self.current_page > 1
+                                enable_next = self.current_page < self.total_pages
                             break
         self.search_btn.setEnabled(enable_search)
+        self.refresh_btn.setEnabled(enable_search)
         self.previous_btn.setEnabled(enable_previous)
         self.next_btn.setEnabled(enable_next)
 
@@ -470,7 +529,16 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         self.update_connections_combobox()
         next_(*next_args, **next_kwargs)
 
-    def search_geonode(self, reset_pagination: bool = False):
+    def search_geonode(
+        self, reset_pagination: bool = False, force_refresh: bool = False
+    ):
+        """Search the current connection for datasets
+
+        Results of recent searches are served from the search cache, unless
+        `force_refresh` is set.
+
+        """
+
         search_params = self.get_search_filters()
         if len(search_params.layer_types) > 0:
             self.search_started.emit()
@@ -480,12 +548,94 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
             current_connection = conf.settings_manager.get_current_connection_settings()
             if not current_connection.geonode_version:
                 self.discover_api_client(
-                    next_=self.search_geonode, reset_pagination=reset_pagination
+                    next_=self.search_geonode,
+                    reset_pagination=reset_pagination,
+                    force_refresh=force_refresh,
                 )
+            elif self.federated_search_chb.isChecked():
+                self.search_all_connections(search_params, force_refresh=force_refresh)
             elif self.api_client is None:
                 self.search_finished.emit(tr(_INVALID_CONNECTION_MESSAGE))
             else:
-                self.api_client.get_dataset_list(search_params)
+                self.api_client.get_dataset_list(
+                    search_params, force_refresh=force_refresh
+                )
+
+    def toggle_federated_search(self, enabled: bool):
+        self.cancel_pending_requests()
+        self.clear_search_results()
+        self.current_page = 1
+        self.total_pages = 1
+        self.toggle_search_buttons()
+
+    def search_all_connections(
+        self, search_params: models.GeonodeApiSearchFilters, force_refresh: bool
+    ):
+        """Search every connection at the same time, showing results as they arrive"""
+        self.current_page = 1
+        self.total_pages = 1
+        if self.federated_search is not None:
+            self.federated_search.cancel()
+        self.federated_search = FederatedSearch(
+            conf.settings_manager.list_connections()
+        )
+        self.federated_search.results_updated.connect(self.handle_federated_results)
+        self.federated_search.server_finished.connect(
+            self.handle_federated_server_outcome
+        )
+        self.federated_search.search_finished.connect(self.handle_federated_search_end)
+        self.federated_search.search(search_params, force_refresh=force_refresh)
+
+    def handle_federated_results(self, results: typing.List[FederatedResult]):
+        """Show the merged results of a federated search
+
+        This is called every time a server replies. Only the results of the replying
+        server get new widgets, while the widgets of results that are already being
+        shown are kept, thumbnails included, and moved to their new position.
+
+        """
+
+        if len(self._federated_result_widgets) == 0:
+            self._show_search_results([])
+        layout = self.scroll_area.widget().layout()
+        result_widgets = {}
+        for position, result in enumerate(results):
+            key = (str(result.connection_settings.id), result.brief_dataset.pk)
+            search_result_widget = self._federated_result_widgets.pop(key, None)
+            if search_result_widget is None:
+                search_result_widget = SearchResultWidget(
+                    result.brief_dataset,
+                    result.api_client,
+                    data_source_widget=self,
+                    connection_settings=result.connection_settings,
+                )
+            else:
+                layout.removeWidget(search_result_widget)
+            layout.insertWidget(position, search_result_widget)
+            layout.setAlignment(search_result_widget, QtCore.Qt.AlignTop)
+            result_widgets[key] = search_result_widget
+        for stale_widget in self._federated_result_widgets.values():
+            stale_widget.cancel_pending_requests()
+            layout.removeWidget(stale_widget)
+            stale_widget.deleteLater()
+        self._federated_result_widgets = result_widgets
+
+    def handle_federated_server_outcome(self, outcome: ServerSearchOutcome):
+        self.pagination_info_la.setText(
+            _describe_server_outcomes(self.federated_search.outcomes)
+        )
+
+    def handle_federated_search_end(self):
+        errors = [
+            f"{outcome.connection_settings.name}: {outcome.error_message}"
+            for outcome in self.federated_search.outcomes
+            if outcome.error_message is not None
+        ]
+        if len(errors) > 0:
+            message = tr("Search ended with errors") + " - " + "; ".join(errors)
+        else:
+            message = ""
+        self.search_finished.emit(message)
 
     def toggle_search_controls(self, enabled: bool):
         for widget in self._unusable_search_filters:
@@ -532,29 +682,45 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         signal. It expects to receive a list of brief dataset descriptions, as found
         on the remote GeoNode server.
 
+        This may be called again for the same search, if results that were served
+        from the search cache turn out to be outdated.
+
         """
 
         self.handle_pagination(pagination_info)
         if len(dataset_list) > 0:
-            scroll_container = QtWidgets.QWidget()
-            layout = QtWidgets.QVBoxLayout()
-            layout.setContentsMargins(1, 1, 1, 1)
-            layout.setSpacing(1)
-            for brief_dataset in dataset_list:
-                search_result_widget = SearchResultWidget(
-                    brief_dataset,
-                    self.api_client,
-                    data_source_widget=self,
-                )
-                layout.addWidget(search_result_widget)
-                layout.setAlignment(search_result_widget, QtCore.Qt.AlignTop)
-            scroll_container.setLayout(layout)
-            self.scroll_area.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
-            self.scroll_area.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
-            self.scroll_area.setWidgetResizable(True)
-            self.scroll_area.setWidget(scroll_container)
+            # the new results may share thumbnails with the current ones, so stop
+            # these downloads before the new ones are started
+            self._cancel_thumbnail_downloads()
+            self._show_search_results(
+                [
+                    SearchResultWidget(
+                        brief_dataset,
+                        self.api_client,
+                        data_source_widget=self,
+                    )
+                    for brief_dataset in dataset_list
+                ]
+            )
             self.message_bar.clearWidgets()
         self.search_finished.emit("")
+        self.api_client.prefetch_adjacent_pages(pagination_info)
+
+    def _show_search_results(
+        self, search_result_widgets: typing.List[SearchResultWidget]
+    ):
+        scroll_container = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout()
+        layout.setContentsMargins(1, 1, 1, 1)
+        layout.setSpacing(1)
+        for search_result_widget in search_result_widgets:
+            layout.addWidget(search_result_widget)
+            layout.setAlignment(search_result_widget, QtCore.Qt.AlignTop)
+        scroll_container.setLayout(layout)
+        self.scroll_area.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOn)
+        self.scroll_area.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setWidget(scroll_container)
 
     def handle_pagination(
         self,
@@ -573,7 +739,34 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         else:
             self.pagination_info_la.setText(tr("No results found"))
 
+    def cancel_pending_requests(self) -> None:
+        """Stop any search and thumbnail downloads that are still in flight"""
+        self._cancel_thumbnail_downloads()
+        if self.federated_search is not None and not self.federated_search.is_finished:
+            self.federated_search.cancel()
+            self.federated_search = None
+            self.search_finished.emit("")
+        if self.api_client is not None and self.api_client.cancel_pending_requests():
+            self.search_finished.emit("")
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        # switching to another tab of the data source manager also hides this widget,
+        # but only closing the dialog makes the ongoing requests useless
+        if not self.window().isVisible():
+            self.cancel_pending_requests()
+        super().hideEvent(event)
+
+    def _cancel_thumbnail_downloads(self) -> None:
+        results_container = self.scroll_area.widget()
+        if results_container is not None:
+            for search_result_widget in results_container.findChildren(
+                SearchResultWidget
+            ):
+                search_result_widget.cancel_pending_requests()
+
     def clear_search_results(self):
+        self._cancel_thumbnail_downloads()
+        self._federated_result_widgets = {}
         self.scroll_area.setWidget(QtWidgets.QWidget())
         self.pagination_info_la.clear()
 
@@ -623,6 +816,9 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
                 current_search_filters.spatial_extent,
                 qgis.core.QgsCoordinateReferenceSystem("EPSG:4326"),
             )
+        self.spatial_extent_box.setChecked(
+            current_search_filters.spatial_extent is not None
+        )
         self.vector_chb.setChecked(
             (
                 models.GeonodeResourceType.VECTOR_LAYER
@@ -661,6 +857,12 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
             category = IsoTopicCategory[current_raw_category]
         except KeyError:
             category = None
+        # the extent box always holds some extent, so only the box being checked
+        # tells that the user wants to filter by it
+        if self.spatial_extent_box.isChecked():
+            spatial_extent = self.spatial_extent_box.outputExtent()
+        else:
+            spatial_extent = None
         result = models.GeonodeApiSearchFilters(
             page=self.current_page,
             title=self.title_le.text() or None,
@@ -674,7 +876,7 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
             temporal_extent_end=temp_ex_end if not temp_ex_end.isNull() else None,
             publication_date_start=pub_start if not pub_start.isNull() else None,
             publication_date_end=pub_end if not pub_end.isNull() else None,
-            spatial_extent=self.spatial_extent_box.outputExtent(),
+            spatial_extent=spatial_extent,
         )
         return result
 
@@ -707,3 +909,19 @@ class GeonodeDataSourceWidget(qgis.gui.QgsAbstractDataSourceWidget, WidgetUi):
         geonode_browser_provider = browser_registry.provider("GeoNode")
         if geonode_browser_provider is not None:
             browser_registry.removeProvider(geonode_browser_provider)
+
+
+def _describe_server_outcomes(outcomes: typing.List[ServerSearchOutcome]) -> str:
+    descriptions = []
+    for outcome in outcomes:
+        if outcome.pagination_info is not None:
+            found = tr(
+                f"{outcome.pagination_info.total_records} results, showing up to "
+                f"{outcome.pagination_info.page_size}"
+            )
+        else:
+            found = tr("failed")
+        descriptions.append(
+            f"{outcome.connection_settings.name}: {found} ({outcome.latency:.0f} ms)"
+        )
+    return "; ".join(descriptions)
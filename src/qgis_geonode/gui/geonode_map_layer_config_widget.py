@@ -21,7 +21,6 @@ from ..tasks import network_task
 from .. import (
     conf,
     network,
-    styles,
     utils,
 )
 from ..apiclient import (
@@ -148,41 +147,37 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
         self.layer.setCustomProperty(models.DATASET_CUSTOM_PROPERTY_KEY, serialized)
 
     def download_style(self):
-        dataset = self.get_dataset()
-        self.network_task = network_task.NetworkRequestTask(
-            [network.RequestToPerform(QtCore.QUrl(dataset.default_style.sld_url))],
-            self._api_client.network_requests_timeout,
-            self.connection_settings.auth_config,
-            description="Get dataset style",
-        )
-        self.network_task.task_done.connect(self.handle_style_downloaded)
         self._toggle_style_controls(enabled=False)
         self._show_message(message="Retrieving style...", add_loading_widget=True)
-        qgis.core.QgsApplication.taskManager().addTask(self.network_task)
+        # the user explicitly asked for the style as it is on the remote, a cached
+        # copy is only reused if the remote confirms it is still current
+        operation = self._api_client.get_dataset_style(
+            self.get_dataset(), force_revalidation=True
+        )
+        operation.result_received.connect(self.handle_style_downloaded)
+        operation.error_received.connect(self.handle_style_download_error)
 
-    def handle_style_downloaded(self, task_result: bool):
+    def handle_style_download_error(
+        self, message: str, http_status_code: int, http_status_reason: str
+    ) -> None:
+        log(f"Could not download style: {message}")
         self._toggle_style_controls(enabled=True)
-        if task_result:
-            sld_named_layer, error_message = styles.get_usable_sld(
-                self.network_task.response_contents[0]
-            )
-            if sld_named_layer is not None:
-                dataset = self.get_dataset()
-                dataset.default_style.sld = sld_named_layer
-                self.update_dataset(dataset)
-                self._apply_geonode_style = True
-                self.apply()
-            else:
-                self._show_message(
-                    message=(
-                        f"Unable to download and parse SLD style from remote "
-                        f"GeoNode: {error_message}"
-                    ),
-                    level=qgis.core.Qgis.Warning,
-                )
+        self._show_message(
+            "Unable to retrieve GeoNode style", level=qgis.core.Qgis.Warning
+        )
+
+    def handle_style_downloaded(self, downloaded_dataset: models.Dataset) -> None:
+        self._toggle_style_controls(enabled=True)
+        if downloaded_dataset.default_style.sld is not None:
+            dataset = self.get_dataset()
+            dataset.default_style.sld = downloaded_dataset.default_style.sld
+            self.update_dataset(dataset)
+            self._apply_geonode_style = True
+            self.apply()
         else:
             self._show_message(
-                "Unable to retrieve GeoNode style", level=qgis.core.Qgis.Warning
+                message="Unable to download and parse SLD style from remote GeoNode",
+                level=qgis.core.Qgis.Warning,
             )
 
     def upload_style(self):
@@ -196,6 +191,7 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
                     network.RequestToPerform(
                         QtCore.QUrl(dataset.default_style.sld_url),
                         method=network.HttpMethod.PUT,
+                        operation=network.RequestOperation.STYLE,
                         payload=serialized_sld,
                         content_type=content_type,
                     )
@@ -274,6 +270,10 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
             parsed_reply = self.network_task.response_contents[0]
             if parsed_reply is not None:
                 if parsed_reply.http_status_code == 200:
+                    # the cached copy of the style is now outdated
+                    self._api_client.forget_style(
+                        self.get_dataset().default_style.sld_url
+                    )
                     self._show_message("Style uploaded successfully!")
                 else:
                     error_message_parts = [
@@ -293,19 +293,24 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
     def download_metadata(self) -> None:
         """Initiate download of metadata from the remote GeoNode"""
 
-        self._api_client.dataset_detail_received.connect(
-            self.handle_metadata_downloaded
-        )
-        self._api_client.dataset_detail_error_received.connect(
-            self.handle_metadata_downloaded
-        )
         self._toggle_metadata_controls(enabled=False)
         self._show_message("Retrieving metadata...", add_loading_widget=True)
         dataset = self.get_dataset()
-        self._api_client.get_dataset_detail(dataset, get_style_too=False)
+        # the user explicitly asked for the metadata as it is on the remote
+        operation = self._api_client.get_dataset_detail(
+            dataset, get_style_too=False, force_refresh=True
+        )
+        operation.result_received.connect(self.handle_metadata_downloaded)
+        operation.error_received.connect(self.handle_metadata_download_error)
 
-    def handle_metadata_download_error(self) -> None:
-        log("inside handle_metadata_download_error")
+    def handle_metadata_download_error(
+        self, message: str, http_status_code: int, http_status_reason: str
+    ) -> None:
+        log(f"Could not download metadata: {message}")
+        self._toggle_metadata_controls(enabled=True)
+        self._show_message(
+            f"Could not download metadata: {message}", level=qgis.core.Qgis.Warning
+        )
 
     def handle_metadata_downloaded(self, downloaded_dataset: models.Dataset) -> None:
         self._toggle_metadata_controls(enabled=True)
@@ -329,6 +334,7 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
                 network.RequestToPerform(
                     QtCore.QUrl(self.get_dataset().link),
                     method=network.HttpMethod.PATCH,
+                    operation=network.RequestOperation.UPLOAD,
                     payload=json.dumps(
                         {
                             "title": current_metadata.title(),
@@ -353,6 +359,7 @@ class GeonodeMapLayerConfigWidget(qgis.gui.QgsMapLayerConfigWidget, WidgetUi):
             parsed_reply = self.network_task.response_contents[0]
             if parsed_reply is not None:
                 if parsed_reply.http_status_code == 200:
+                    self._api_client.forget_dataset(self.get_dataset().pk)
                     self._show_message("Metadata uploaded successfully!")
                 else:
                     error_message_parts = [
@@ -0,0 +1,177 @@
+import os
+import typing
+from pathlib import Path
+
+from qgis.PyQt import (
+    QtCore,
+    QtWidgets,
+)
+from qgis.PyQt.uic import loadUiType
+
+from .. import (
+    metrics,
+    network,
+)
+from ..scheduler import get_request_scheduler
+from ..utils import log, tr
+
+DialogUi, _ = loadUiType(
+    os.path.join(os.path.dirname(__file__), "../ui/performance_dialog.ui")
+)
+
+_SUMMARY_COLUMNS = [
+    "Operation",
+    "Requests",
+    "Errors",
+    "Timeouts",
+    "Cache hits",
+    "Bytes",
+    "Total p50",
+    "Total p90",
+    "Total p99",
+    "Queue wait p50",
+    "Queue wait p90",
+    "First byte p50",
+    "First byte p90",
+]
+
+_REQUEST_COLUMNS = [
+    "Finished at",
+    "Operation",
+    "Method",
+    "URL",
+    "Outcome",
+    "HTTP status",
+    "Cache",
+    "Retries",
+    "Bytes",
+    "Queue wait",
+    "First byte",
+    "Transfer",
+    "Total",
+]
+
+
+class PerformanceDialog(QtWidgets.QDialog, DialogUi):
+    """Show the timings of the most recent network requests"""
+
+    summary_tw: QtWidgets.QTableWidget
+    requests_tw: QtWidgets.QTableWidget
+    network_stats_la: QtWidgets.QLabel
+    refresh_pb: QtWidgets.QPushButton
+    clear_pb: QtWidgets.QPushButton
+    export_json_pb: QtWidgets.QPushButton
+    export_csv_pb: QtWidgets.QPushButton
+    buttonBox: QtWidgets.QDialogButtonBox
+
+    def __init__(self, parent: typing.Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent)
+        self.setupUi(self)
+        self.summary_tw.setColumnCount(len(_SUMMARY_COLUMNS))
+        self.summary_tw.setHorizontalHeaderLabels([tr(c) for c in _SUMMARY_COLUMNS])
+        self.requests_tw.setColumnCount(len(_REQUEST_COLUMNS))
+        self.requests_tw.setHorizontalHeaderLabels([tr(c) for c in _REQUEST_COLUMNS])
+        self.refresh_pb.clicked.connect(self.refresh)
+        self.clear_pb.clicked.connect(self.clear_metrics)
+        self.export_json_pb.clicked.connect(
+            lambda: self.export_metrics(tr("JSON files (*.json)"), "json")
+        )
+        self.export_csv_pb.clicked.connect(
+            lambda: self.export_metrics(tr("CSV files (*.csv)"), "csv")
+        )
+        self.refresh()
+
+    def refresh(self) -> None:
+        self._populate_summary(metrics.request_metrics.summarize())
+        self._populate_requests(metrics.request_metrics.timings())
+        self._populate_network_stats()
+
+    def clear_metrics(self) -> None:
+        metrics.request_metrics.clear()
+        self.refresh()
+
+    def export_metrics(self, file_filter: str, suffix: str) -> None:
+        file_name, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, tr("Export network metrics"), f"geonode-metrics.{suffix}", file_filter
+        )
+        if file_name:
+            path = Path(file_name)
+            try:
+                if suffix == "json":
+                    metrics.request_metrics.export_json(path)
+                else:
+                    metrics.request_metrics.export_csv(path)
+            except OSError as exc:
+                log(f"Could not export network metrics: {exc}", debug=False)
+                QtWidgets.QMessageBox.warning(
+                    self, tr("Export network metrics"), str(exc)
+                )
+
+    def _populate_summary(self, summaries: typing.List[metrics.OperationSummary]):
+        self.summary_tw.setRowCount(len(summaries))
+        for row, summary in enumerate(summaries):
+            values = [
+                summary.operation.value,
+                summary.num_requests,
+                summary.num_errors,
+                summary.num_timeouts,
+                summary.num_cache_hits,
+                summary.bytes_received,
+                summary.total_time.get(50),
+                summary.total_time.get(90),
+                summary.total_time.get(99),
+                summary.queue_wait.get(50),
+                summary.queue_wait.get(90),
+                summary.time_to_first_byte.get(50),
+                summary.time_to_first_byte.get(90),
+            ]
+            _set_row(self.summary_tw, row, values)
+        self.summary_tw.resizeColumnsToContents()
+
+    def _populate_requests(self, timings: typing.List[metrics.RequestTiming]):
+        self.requests_tw.setSortingEnabled(False)
+        self.requests_tw.setRowCount(len(timings))
+        for row, timing in enumerate(reversed(timings)):
+            values = [
+                timing.finished_at.astimezone().strftime("%H:%M:%S.%f")[:-3],
+                timing.operation.value,
+                timing.method,
+                timing.url,
+                timing.outcome.value,
+                timing.http_status_code,
+                timing.cache_status.value,
+                timing.retries,
+                timing.bytes_received,
+                timing.queue_wait,
+                timing.time_to_first_byte,
+                timing.transfer_time,
+                timing.total_time,
+            ]
+            _set_row(self.requests_tw, row, values)
+        self.requests_tw.setSortingEnabled(True)
+        self.requests_tw.resizeColumnsToContents()
+
+    def _populate_network_stats(self) -> None:
+        retry_counters = network.retry_statistics.counters
+        lines = [
+            f"{tr('Retries')}: {retry_counters.retries} "
+            f"({tr('gave up after retrying')}: {retry_counters.exhausted})"
+        ]
+        for host, host_stats in get_request_scheduler().stats().items():
+            lines.append(
+                f"{host}: {host_stats.active} active, {host_stats.queued} queued, "
+                f"{host_stats.dispatched} dispatched, mean wait "
+                f"{host_stats.mean_wait_time * 1000:.0f}ms, max wait "
+                f"{host_stats.max_wait_time * 1000:.0f}ms"
+            )
+        self.network_stats_la.setText("\n".join(lines))
+
+
+def _set_row(table: QtWidgets.QTableWidget, row: int, values: typing.List) -> None:
+    for column, value in enumerate(values):
+        item = QtWidgets.QTableWidgetItem()
+        if isinstance(value, float):
+            item.setData(QtCore.Qt.DisplayRole, round(value, 1))
+        elif value is not None:
+            item.setData(QtCore.Qt.DisplayRole, value)
+        table.setItem(row, column, item)
@@ -23,6 +23,7 @@ from ..apiclient import (
 )
 from .. import network
 from ..apiclient.models import ApiClientCapability
+from .. import conf
 from ..conf import settings_manager
 from ..metadata import populate_metadata
 from ..resources import *
@@ -45,7 +46,7 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
     dataset_loader_task: typing.Optional[qgis.core.QgsTask]
     # thumbnail_fetcher_task fetches the thumbnail over the network
     # thumbnail_loader_task then loads the thumbnail
-    thumbnail_fetcher_task: typing.Optional[network_task.NetworkRequestTask]
+    thumbnail_fetcher_task: typing.Optional[network_task.AsyncNetworkRequestTask]
     thumbnail_loader_task: typing.Optional[qgis.core.QgsTask]
 
     load_layer_started = QtCore.pyqtSignal()
@@ -53,6 +54,7 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
 
     api_client: base.BaseGeonodeClient
     brief_dataset: models.BriefDataset
+    connection_settings: conf.ConnectionSettings
     layer: typing.Optional["QgsMapLayer"]
     data_source_widget: "GeonodeDataSourceWidget"
 
@@ -61,6 +63,7 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
         brief_dataset: models.BriefDataset,
         api_client: base.BaseGeonodeClient,
         data_source_widget: "GeonodeDataSourceWidget",
+        connection_settings: typing.Optional[conf.ConnectionSettings] = None,
         parent=None,
     ):
         super().__init__(parent)
@@ -73,6 +76,9 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
         self.layer = None
         self.brief_dataset = brief_dataset
         self.api_client = api_client
+        self.connection_settings = (
+            connection_settings or settings_manager.get_current_connection_settings()
+        )
         self._initialize_ui()
         self.toggle_service_url_buttons(True)
         self.load_thumbnail()
@@ -141,6 +147,7 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
 
     def _initialize_ui(self):
         self.title_la.setText(f"<h3>{self.brief_dataset.title}</h3>")
+        self.title_la.setToolTip(self.connection_settings.name)
         self.resource_type_la.setText(self.brief_dataset.dataset_sub_type.value)
         self.description_la.setText(self.brief_dataset.abstract)
         if self.brief_dataset.detail_url:
@@ -174,18 +181,28 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
 
     def load_thumbnail(self):
         """Fetch the thumbnail from its remote URL and load it"""
-        self.thumbnail_fetcher_task = network_task.NetworkRequestTask(
+        self.thumbnail_fetcher_task = network_task.AsyncNetworkRequestTask(
             [
                 network.RequestToPerform(
-                    url=QtCore.QUrl(self.brief_dataset.thumbnail_url)
+                    url=QtCore.QUrl(self.brief_dataset.thumbnail_url),
+                    priority=network.RequestPriority.THUMBNAIL,
+                    operation=network.RequestOperation.THUMBNAIL,
                 )
             ],
             self.api_client.network_requests_timeout,
             self.api_client.auth_config,
-            description=f"Get thumbnail for {self.brief_dataset.title!r}",
         )
         self.thumbnail_fetcher_task.task_done.connect(self.handle_thumbnail_response)
-        qgis.core.QgsApplication.taskManager().addTask(self.thumbnail_fetcher_task)
+        self.thumbnail_fetcher_task.start()
+
+    def cancel_pending_requests(self):
+        """Stop fetching the thumbnail, as it is not going to be shown anymore"""
+        if self.thumbnail_fetcher_task is not None:
+            self.thumbnail_fetcher_task.task_done.disconnect(
+                self.handle_thumbnail_response
+            )
+            self.thumbnail_fetcher_task.cancel()
+            self.thumbnail_fetcher_task = None
 
     def handle_thumbnail_response(self, fetch_result: bool):
         if fetch_result:
@@ -226,25 +243,22 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
         if self.dataset_loader_task._exception is not None:
             log(self.dataset_loader_task._exception)
         self.layer = self.dataset_loader_task.layer
-        self.api_client.dataset_detail_received.connect(self.handle_layer_detail)
-        self.api_client.dataset_detail_error_received.connect(self.handle_loading_error)
-        self.api_client.style_detail_error_received.connect(self.handle_style_error)
-        self.api_client.get_dataset_detail(
+        operation = self.api_client.get_dataset_detail(
             self.brief_dataset, get_style_too=self.layer.dataProvider().name() != "wms"
         )
+        operation.result_received.connect(self.handle_layer_detail)
+        operation.error_received.connect(self.handle_layer_detail_error)
 
     def handle_layer_detail(
         self, dataset: typing.Optional[models.Dataset], retrieved_style: bool = False
     ):
-        self.api_client.dataset_detail_received.disconnect(self.handle_layer_detail)
         self.layer.setCustomProperty(
             models.DATASET_CUSTOM_PROPERTY_KEY,
             dataset.to_json() if dataset is not None else None,
         )
-        current_connection_settings = settings_manager.get_current_connection_settings()
         self.layer.setCustomProperty(
             models.DATASET_CONNECTION_CUSTOM_PROPERTY_KEY,
-            str(current_connection_settings.id),
+            str(self.connection_settings.id),
         )
         if ApiClientCapability.LOAD_LAYER_METADATA in self.api_client.capabilities:
             metadata = populate_metadata(self.layer.metadata(), dataset)
@@ -268,19 +282,14 @@ class SearchResultWidget(QtWidgets.QWidget, WidgetUi):
         self.data_source_widget.show_message(message, level=qgis.core.Qgis.Critical)
         self.handle_layer_load_end(clear_message_bar=False)
 
-    def handle_style_error(self):
-        message = f"Unable to retrieve the style of {self.brief_dataset.title}"
+    def handle_layer_detail_error(
+        self, message: str, http_status_code: int, http_status_reason: str
+    ):
+        message = f"Unable to load layer {self.brief_dataset.title}: {message}"
         self.data_source_widget.show_message(message, level=qgis.core.Qgis.Critical)
-        # Terminate the signal if there is an error with the SLD request
-        self.api_client.style_detail_error_received.disconnect(self.handle_style_error)
         self.handle_layer_load_end(clear_message_bar=False)
 
     def add_layer_to_project(self):
-        self.api_client.dataset_detail_error_received.disconnect(
-            self.handle_loading_error
-        )
-        self.api_client.style_detail_error_received.disconnect(self.handle_style_error)
-
         # Set the final extent using the defined spatial_extent
         self.layer.setExtent(self.brief_dataset.spatial_extent)
         self.project.addMapLayer(self.layer)
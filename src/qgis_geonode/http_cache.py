@@ -0,0 +1,204 @@
+"""Persistent cache for HTTP responses retrieved from remote GeoNode servers"""
+
+import contextlib
+import dataclasses
+import hashlib
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+import qgis.core
+
+from .conf import settings_manager
+from .utils import log
+
+
+@dataclasses.dataclass()
+class CachedResponse:
+    url: str
+    etag: typing.Optional[str]
+    last_modified: typing.Optional[str]
+    http_status_code: int
+    http_status_reason: str
+    body: bytes
+
+
+@dataclasses.dataclass()
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class HttpResponseCache:
+    """A disk-backed LRU cache of HTTP responses
+
+    Responses are stored in an SQLite database, keyed by their URL and the auth config
+    that was used to retrieve them. Only responses that carry either an `ETag` or a
+    `Last-Modified` header are stored, since the cache relies on conditional requests
+    in order to find out whether a cached response is still valid.
+
+    Access to the database is serialized, as the cache is shared by all network
+    tasks, which may be running in different threads.
+
+    Lookups that find nothing count as misses. Cached responses count as hits once
+    the remote confirms they are still valid, or as misses if it sends a new
+    version instead.
+
+    """
+
+    enabled: bool
+    max_size: int
+    database_path: Path
+    _lock: threading.Lock
+    _stats: CacheStats
+
+    def __init__(self, database_path: Path, max_size: int, enabled: bool = True):
+        self.database_path = database_path
+        self.max_size = max_size
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response ("
+                "key TEXT PRIMARY KEY, "
+                "url TEXT NOT NULL, "
+                "etag TEXT, "
+                "last_modified TEXT, "
+                "http_status_code INTEGER NOT NULL, "
+                "http_status_reason TEXT, "
+                "body BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_access REAL NOT NULL"
+                ")"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS response_last_access_idx "
+                "ON response (last_access)"
+            )
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return dataclasses.replace(self._stats)
+
+    def get(
+        self, url: str, auth_config: typing.Optional[str] = None
+    ) -> typing.Optional[CachedResponse]:
+        key = _get_key(url, auth_config)
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT url, etag, last_modified, http_status_code, "
+                "http_status_reason, body FROM response WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE response SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            else:
+                self._stats.misses += 1
+        return CachedResponse(*row) if row is not None else None
+
+    def store(
+        self, response: CachedResponse, auth_config: typing.Optional[str] = None
+    ) -> None:
+        size = len(response.body)
+        if size > self.max_size:
+            log(f"Response for {response.url!r} is too large to be cached, skipping...")
+        else:
+            with self._lock, self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO response (key, url, etag, last_modified, "
+                    "http_status_code, http_status_reason, body, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        _get_key(response.url, auth_config),
+                        response.url,
+                        response.etag,
+                        response.last_modified,
+                        response.http_status_code,
+                        response.http_status_reason,
+                        response.body,
+                        size,
+                        time.time(),
+                    ),
+                )
+                self._evict(connection)
+
+    def record_hit(self, url: str, auth_config: typing.Optional[str] = None) -> None:
+        """Register that a cached response has been revalidated by the remote"""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE response SET last_access = ? WHERE key = ?",
+                (time.time(), _get_key(url, auth_config)),
+            )
+            self._stats.hits += 1
+
+    def record_miss(self) -> None:
+        """Register that the remote has sent a new version of a cached response"""
+        with self._lock:
+            self._stats.misses += 1
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM response")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Remove least recently used responses until the cache fits its budget"""
+        total_size = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM response"
+        ).fetchone()[0]
+        if total_size > self.max_size:
+            rows = connection.execute(
+                "SELECT key, size FROM response ORDER BY last_access"
+            ).fetchall()
+            keys_to_remove = []
+            for key, size in rows:
+                if total_size <= self.max_size:
+                    break
+                keys_to_remove.append((key,))
+                total_size -= size
+            connection.executemany("DELETE FROM response WHERE key = ?", keys_to_remove)
+            self._stats.evictions += len(keys_to_remove)
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.database_path), timeout=10)
+        try:
+            with connection:  # commits the transaction on exit
+                yield connection
+        finally:
+            connection.close()
+
+
+def _get_key(url: str, auth_config: typing.Optional[str]) -> str:
+    return hashlib.sha256(f"{auth_config or ''}|{url}".encode("utf-8")).hexdigest()
+
+
+_http_cache: typing.Optional[HttpResponseCache] = None
+
+
+def get_http_cache() -> HttpResponseCache:
+    """Return the plugin-wide HTTP response cache
+
+    The cache is stored inside the current QGIS profile directory.
+
+    """
+
+    global _http_cache
+    if _http_cache is None:
+        cache_settings = settings_manager.get_http_cache_settings()
+        _http_cache = HttpResponseCache(
+            Path(qgis.core.QgsApplication.qgisSettingsDirPath())
+            / "qgis_geonode"
+            / "http_cache.sqlite",
+            max_size=cache_settings.max_size,
+            enabled=cache_settings.enabled,
+        )
+    return _http_cache
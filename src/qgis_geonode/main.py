@@ -13,7 +13,7 @@ import os.path
 
 from qgis.core import QgsSettings
 from qgis.gui import QgsGui
-from qgis.PyQt.QtCore import QSettings, QTranslator, QCoreApplication
+from qgis.PyQt.QtCore import Qt, QSettings, QTranslator, QCoreApplication
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QAction
 
@@ -24,6 +24,7 @@ from .gui.geonode_source_select_provider import GeonodeSourceSelectProvider
 from .gui.geonode_maplayer_config_widget_factory import (
     GeonodeMapLayerConfigWidgetFactory,
 )
+from .gui.performance_dialog import PerformanceDialog
 from .conf import plugin_metadata
 
 
@@ -149,6 +150,18 @@ class QgisGeoNode:
         QgsGui.sourceSelectProviderRegistry().addProvider(
             self.geonodeSourceSelectProvider
         )
+        self.add_action(
+            ":/plugins/qgis_geonode/mIconGeonode.svg",
+            self.tr("GeoNode performance"),
+            self.show_performance_dialog,
+            status_tip=self.tr("Show timings of the requests made to GeoNode"),
+            parent=self.iface.mainWindow(),
+        )
+
+    def show_performance_dialog(self):
+        dialog = PerformanceDialog(self.iface.mainWindow())
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.show()
 
     def onClosePlugin(self):
         """Cleanup necessary items here when plugin dockwidget is closed"""
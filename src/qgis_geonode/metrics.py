@@ -0,0 +1,198 @@
+"""Timings of the network requests performed by the plugin"""
+
+import collections
+import csv
+import dataclasses
+import datetime as dt
+import enum
+import json
+import math
+import threading
+import typing
+from pathlib import Path
+
+from . import network
+from .scheduler import get_request_scheduler
+
+# number of requests whose timings are kept in memory
+DEFAULT_CAPACITY = 1000
+
+PERCENTILES = (50, 90, 99)
+
+
+class CacheStatus(enum.Enum):
+    # the request was not eligible for caching
+    BYPASS = "bypass"
+    # the response was not cached, or the cached one had changed
+    MISS = "miss"
+    # the remote confirmed the cached response was still valid
+    REVALIDATED = "revalidated"
+    # the response was shared by an identical request that was already in flight
+    COALESCED = "coalesced"
+
+
+class RequestOutcome(enum.Enum):
+    SUCCESS = "success"
+    ERROR = "error"
+    TIMED_OUT = "timed_out"
+    CANCELLED = "cancelled"
+
+
+@dataclasses.dataclass()
+class RequestTiming:
+    """How long the various phases of a request took, in milliseconds
+
+    Phases that did not happen, like the transfer of a request that never got a
+    reply, are `None`.
+
+    """
+
+    url: str
+    method: str
+    operation: network.RequestOperation
+    outcome: RequestOutcome
+    cache_status: CacheStatus
+    finished_at: dt.datetime
+    http_status_code: typing.Optional[int] = None
+    retries: int = 0
+    bytes_received: int = 0
+    queue_wait: typing.Optional[float] = None
+    time_to_first_byte: typing.Optional[float] = None
+    transfer_time: typing.Optional[float] = None
+    total_time: typing.Optional[float] = None
+
+    def to_dict(self) -> typing.Dict:
+        result = dataclasses.asdict(self)
+        result.update(
+            operation=self.operation.value,
+            outcome=self.outcome.value,
+            cache_status=self.cache_status.value,
+            finished_at=self.finished_at.isoformat(),
+        )
+        return result
+
+
+@dataclasses.dataclass()
+class OperationSummary:
+    operation: network.RequestOperation
+    num_requests: int = 0
+    num_errors: int = 0
+    num_timeouts: int = 0
+    num_cache_hits: int = 0
+    bytes_received: int = 0
+    # percentile -> value, in milliseconds
+    total_time: typing.Dict[int, float] = dataclasses.field(default_factory=dict)
+    queue_wait: typing.Dict[int, float] = dataclasses.field(default_factory=dict)
+    time_to_first_byte: typing.Dict[int, float] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+class RequestMetrics:
+    """Ring buffer with the timings of the most recent requests
+
+    Recording is cheap and thread safe, since requests finish in whatever thread
+    their task runs in.
+
+    """
+
+    _timings: typing.Deque[RequestTiming]
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._lock = threading.Lock()
+        self._timings = collections.deque(maxlen=capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._timings.maxlen
+
+    def record(self, timing: RequestTiming) -> None:
+        with self._lock:
+            self._timings.append(timing)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def timings(
+        self, operation: typing.Optional[network.RequestOperation] = None
+    ) -> typing.List[RequestTiming]:
+        with self._lock:
+            result = list(self._timings)
+        if operation is not None:
+            result = [timing for timing in result if timing.operation == operation]
+        return result
+
+    def summarize(self) -> typing.List[OperationSummary]:
+        """Aggregate the recorded timings of each operation"""
+        by_operation = collections.OrderedDict()
+        for timing in self.timings():
+            by_operation.setdefault(timing.operation, []).append(timing)
+        result = []
+        for operation, timings in by_operation.items():
+            summary = OperationSummary(operation=operation)
+            for timing in timings:
+                summary.num_requests += 1
+                if timing.outcome == RequestOutcome.ERROR:
+                    summary.num_errors += 1
+                elif timing.outcome == RequestOutcome.TIMED_OUT:
+                    summary.num_timeouts += 1
+                if timing.cache_status in (
+                    CacheStatus.REVALIDATED,
+                    CacheStatus.COALESCED,
+                ):
+                    summary.num_cache_hits += 1
+                summary.bytes_received += timing.bytes_received
+            for field_name in ("total_time", "queue_wait", "time_to_first_byte"):
+                values = [
+                    getattr(t, field_name)
+                    for t in timings
+                    if getattr(t, field_name) is not None
+                ]
+                setattr(
+                    summary,
+                    field_name,
+                    {p: percentile(values, p) for p in PERCENTILES if values},
+                )
+            result.append(summary)
+        return result
+
+    def export_json(self, path: Path) -> None:
+        """Write the recorded timings and the current network statistics to a file"""
+        retry_counters = network.retry_statistics.counters
+        contents = {
+            "exported_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "requests": [timing.to_dict() for timing in self.timings()],
+            "summary": [
+                dict(dataclasses.asdict(summary), operation=summary.operation.value)
+                for summary in self.summarize()
+            ],
+            "retries": dataclasses.asdict(retry_counters),
+            "scheduler": {
+                host: dict(
+                    dataclasses.asdict(host_stats),
+                    mean_wait_time=host_stats.mean_wait_time,
+                )
+                for host, host_stats in get_request_scheduler().stats().items()
+            },
+        }
+        path.write_text(json.dumps(contents, indent=2), encoding="utf-8")
+
+    def export_csv(self, path: Path) -> None:
+        """Write the recorded timings to a file, one request per row"""
+        field_names = [field.name for field in dataclasses.fields(RequestTiming)]
+        with path.open("w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=field_names)
+            writer.writeheader()
+            for timing in self.timings():
+                writer.writerow(timing.to_dict())
+
+
+def percentile(values: typing.Sequence[float], rank: float) -> float:
+    """Return the nearest-rank percentile of the input values"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+request_metrics = RequestMetrics()
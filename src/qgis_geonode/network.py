@@ -1,9 +1,17 @@
 import dataclasses
+import datetime as dt
+import email.utils
 import enum
 import json
+import mmap
+import random
+import tempfile
+import threading
+import time
 import typing
 from contextlib import contextmanager
 from functools import partial
+from pathlib import Path
 
 import qgis.core
 from PyQt5 import QtNetwork
@@ -17,6 +25,9 @@ from packaging import version as packaging_version
 
 UNSUPPORTED_REMOTE = "unsupported"
 
+# maximum amount of data kept in memory while streaming a response body
+STREAMING_BUFFER_SIZE = 1024 * 1024  # in bytes
+
 
 class HttpMethod(enum.Enum):
     GET = "GET"
@@ -25,6 +36,31 @@ class HttpMethod(enum.Enum):
     PATCH = "PATCH"
 
 
+class RequestPriority(enum.IntEnum):
+    """Priority of a request when waiting for its turn to be sent to the remote
+
+    Lower values are served first.
+
+    """
+
+    INTERACTIVE = 0
+    DETAIL = 1
+    THUMBNAIL = 2
+    PREFETCH = 3
+
+
+class RequestOperation(enum.Enum):
+    """The plugin operation a request is performed for, used when reporting metrics"""
+
+    SEARCH = "search"
+    DETAIL = "detail"
+    STYLE = "style"
+    THUMBNAIL = "thumbnail"
+    PREFETCH = "prefetch"
+    UPLOAD = "upload"
+    OTHER = "other"
+
+
 @dataclasses.dataclass()
 class PendingReply:
     index: int
@@ -38,6 +74,39 @@ class ParsedNetworkReply:
     http_status_reason: str
     qt_error: typing.Optional[str]
     response_body: QtCore.QByteArray
+    from_cache: bool = False
+    # set when the body of a streamed response has been written to a temporary file
+    body_path: typing.Optional[Path] = None
+    etag: typing.Optional[str] = None
+
+    @contextmanager
+    def body_view(self) -> typing.Iterator[typing.Union[bytes, mmap.mmap]]:
+        """Provide read-only access to the response body
+
+        Bodies of streamed responses are memory-mapped from their file, which means
+        they are not loaded into memory all at once.
+
+        """
+
+        if self.body_path is None:
+            yield self.response_body.data()
+        else:
+            with self.body_path.open("rb") as fh:
+                if self.body_path.stat().st_size == 0:
+                    yield b""  # empty files cannot be memory-mapped
+                else:
+                    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                        yield view
+
+    def release_body(self) -> None:
+        """Free the memory or disk space used by the response body"""
+        if self.body_path is not None:
+            try:
+                self.body_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.body_path = None
+        self.response_body = QtCore.QByteArray()
 
 
 @dataclasses.dataclass()
@@ -46,6 +115,98 @@ class RequestToPerform:
     method: typing.Optional[HttpMethod] = HttpMethod.GET
     payload: typing.Optional[str] = None
     content_type: typing.Optional[str] = None
+    use_cache: bool = True
+    priority: RequestPriority = RequestPriority.INTERACTIVE
+    timeout: typing.Optional[int] = None  # in milliseconds
+    # write the response body to a temporary file (or to `output_device`, if it is
+    # provided) as it arrives, rather than keeping it in memory
+    streamed: bool = False
+    output_device: typing.Optional[QtCore.QIODevice] = None
+    operation: RequestOperation = RequestOperation.OTHER
+    # validator of a copy of the response kept by the requester, which turns the
+    # request into a conditional one, answered with `304 Not Modified` if unchanged
+    etag: typing.Optional[str] = None
+
+    @property
+    def is_streamed(self) -> bool:
+        return self.streamed or self.output_device is not None
+
+
+@dataclasses.dataclass()
+class RetryPolicy:
+    """How to retry requests that fail because the remote is temporarily overloaded
+
+    Only idempotent requests are retried. Delays between attempts grow exponentially
+    and are randomized (full jitter) in order to avoid having many clients retry
+    in lockstep. A `Retry-After` header sent by the remote takes precedence over the
+    computed delay. No retry is attempted if it would happen after `time_budget` has
+    elapsed since the request was first submitted.
+
+    """
+
+    max_attempts: int = 3
+    base_delay: int = 500  # in milliseconds
+    max_delay: int = 8000  # in milliseconds
+    time_budget: int = 20000  # in milliseconds
+    retryable_methods: typing.Tuple[HttpMethod, ...] = (HttpMethod.GET, HttpMethod.PUT)
+    retryable_status_codes: typing.Tuple[int, ...] = (429, 502, 503, 504)
+
+    def should_retry(
+        self, method: HttpMethod, http_status_code: typing.Optional[int], attempt: int
+    ) -> bool:
+        return (
+            attempt < self.max_attempts
+            and method in self.retryable_methods
+            and http_status_code in self.retryable_status_codes
+        )
+
+    def get_delay(self, attempt: int, retry_after: typing.Optional[int] = None) -> int:
+        """Return how long to wait before performing the next attempt, in milliseconds"""
+        if retry_after is not None:
+            result = retry_after
+        else:
+            ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+            result = int(random.uniform(0, ceiling))
+        return result
+
+
+@dataclasses.dataclass()
+class RetryCounters:
+    retries: int = 0
+    exhausted: int = 0
+    retries_by_status_code: typing.Dict[int, int] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+class RetryStatistics:
+    """Keep track of how often requests are being retried"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = RetryCounters()
+
+    @property
+    def counters(self) -> RetryCounters:
+        with self._lock:
+            return dataclasses.replace(
+                self._counters,
+                retries_by_status_code=dict(self._counters.retries_by_status_code),
+            )
+
+    def record_retry(self, http_status_code: int) -> None:
+        with self._lock:
+            self._counters.retries += 1
+            by_status = self._counters.retries_by_status_code
+            by_status[http_status_code] = by_status.get(http_status_code, 0) + 1
+
+    def record_exhausted(self) -> None:
+        """Register a request that kept failing after it was retried"""
+        with self._lock:
+            self._counters.exhausted += 1
+
+
+retry_statistics = RetryStatistics()
 
 
 @dataclasses.dataclass()
@@ -53,6 +214,205 @@ class EventLoopResult:
     result: typing.Optional[bool]
 
 
+# authentication config, URL and `ETag` sent along of a request that can be coalesced
+CoalescingKey = typing.Tuple[str, str, str]
+
+
+@dataclasses.dataclass()
+class CoalescedFollower:
+    """A caller that is waiting for the outcome of an identical in-flight request"""
+
+    handle_reply: typing.Callable[[typing.Optional[ParsedNetworkReply]], None]
+    # asks the caller to perform the request itself, returning whether it accepted
+    take_over: typing.Optional[typing.Callable[[], bool]] = None
+
+
+class RequestCoalescer:
+    """Share the outcome of in-flight GET requests among identical requests
+
+    When a request is about to be made and an identical one is already in flight, the
+    later caller is attached to the pending request instead of sending a new one.
+    Once the pending request finishes, its parsed reply is handed out to all of the
+    attached callers.
+
+    If the caller performing the request gives up on it, the request is handed over
+    to one of the attached callers, which sends it again on behalf of the others.
+
+    """
+
+    _in_flight: typing.Dict[CoalescingKey, typing.List[CoalescedFollower]]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def attach(
+        self,
+        key: CoalescingKey,
+        callback: typing.Callable[[typing.Optional[ParsedNetworkReply]], None],
+        take_over: typing.Optional[typing.Callable[[], bool]] = None,
+    ) -> bool:
+        """Attach to an in-flight request, if there is one
+
+        Returns `True` when the caller has been attached to an in-flight request, in
+        which case `callback` is going to be called with its parsed reply. Returns
+        `False` when there is no such request, in which case the caller is expected to
+        perform the request and later call either `resolve()` or `abandon()`.
+
+        Attached callers that provide `take_over` may be asked to perform the request
+        themselves, should the original caller abandon it.
+
+        """
+
+        with self._lock:
+            followers = self._in_flight.get(key)
+            if followers is None:
+                self._in_flight[key] = []
+                result = False
+            else:
+                followers.append(CoalescedFollower(callback, take_over))
+                result = True
+        return result
+
+    def resolve(
+        self,
+        key: CoalescingKey,
+        parsed_reply: typing.Optional[ParsedNetworkReply],
+    ) -> None:
+        with self._lock:
+            followers = self._in_flight.pop(key, [])
+        for follower in followers:
+            follower.handle_reply(
+                dataclasses.replace(parsed_reply) if parsed_reply is not None else None
+            )
+
+    def abandon(self, key: CoalescingKey) -> bool:
+        """Give up on performing an in-flight request
+
+        The request is handed over to the first attached caller that accepts to
+        perform it, with the remaining callers staying attached to it. Returns `True`
+        if the request has been taken over, or `False` if nobody was waiting for it,
+        in which case its reply is of no use anymore.
+
+        Callers that cannot take the request over are told that it has failed.
+
+        """
+
+        result = False
+        declined = []
+        while not result:
+            with self._lock:
+                followers = self._in_flight.get(key)
+                if followers:
+                    follower = followers.pop(0)
+                else:
+                    self._in_flight.pop(key, None)
+                    break
+            if follower.take_over is not None and follower.take_over():
+                result = True
+            else:
+                declined.append(follower)
+        for follower in declined:
+            follower.handle_reply(None)
+        return result
+
+
+def get_coalescing_key(
+    request_params: RequestToPerform, auth_config: typing.Optional[str]
+) -> typing.Optional[CoalescingKey]:
+    """Return the key used for coalescing a request, if it can be coalesced
+
+    Conditional requests are only coalesced with requests sending the same `ETag`,
+    as their reply may be a `304 Not Modified` that is of no use to anyone else.
+
+    """
+
+    # streamed responses are written to a destination that belongs to the requester,
+    # so they cannot be shared
+    if request_params.method == HttpMethod.GET and not request_params.is_streamed:
+        result = (
+            auth_config or "",
+            request_params.url.toString(),
+            request_params.etag or "",
+        )
+    else:
+        result = None
+    return result
+
+
+request_coalescer = RequestCoalescer()
+
+
+class ReplyRouter(QtCore.QObject):
+    """Route the signals of the network access manager to the owner of each request
+
+    The network access manager notifies about every request it performs. Instead of
+    having each owner listen to all of these notifications, owners register the
+    requests they are interested in and the router looks up who to notify by the
+    request's id. Routes are removed as soon as their request finishes.
+
+    """
+
+    _routes: typing.Dict[
+        int,
+        typing.Tuple[
+            typing.Callable[[qgis.core.QgsNetworkReplyContent], None],
+            typing.Callable[[qgis.core.QgsNetworkRequestParameters], None],
+        ],
+    ]
+    _connected_managers: typing.Set[int]
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._connected_managers = set()
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def register(
+        self,
+        network_access_manager: qgis.core.QgsNetworkAccessManager,
+        request_id: int,
+        finished_handler: typing.Callable[[qgis.core.QgsNetworkReplyContent], None],
+        timed_out_handler: typing.Callable[
+            [qgis.core.QgsNetworkRequestParameters], None
+        ],
+    ) -> None:
+        with self._lock:
+            self._routes[request_id] = (finished_handler, timed_out_handler)
+            manager_id = id(network_access_manager)
+            must_connect = manager_id not in self._connected_managers
+            self._connected_managers.add(manager_id)
+        if must_connect:
+            network_access_manager.finished.connect(self._route_finished)
+            network_access_manager.requestTimedOut.connect(self._route_timed_out)
+
+    def unregister(self, request_id: int) -> None:
+        with self._lock:
+            self._routes.pop(request_id, None)
+
+    def _route_finished(self, reply_content: qgis.core.QgsNetworkReplyContent):
+        with self._lock:
+            route = self._routes.pop(reply_content.requestId(), None)
+        if route is not None:
+            finished_handler, _ = route
+            finished_handler(reply_content)
+
+    def _route_timed_out(self, request_params: qgis.core.QgsNetworkRequestParameters):
+        # the route is kept, as the network access manager is still going to emit
+        # `finished` for the aborted request
+        with self._lock:
+            route = self._routes.get(request_params.requestId())
+        if route is not None:
+            _, timed_out_handler = route
+            timed_out_handler(request_params)
+
+
+reply_router = ReplyRouter()
+
+
 def _get_qt_network_reply_error_mapping() -> typing.Dict:
     """Workaround for accessing unsubscriptable enum types of QNetworkReply.NetworkError
 
@@ -75,7 +435,9 @@ _Q_NETWORK_REPLY_ERROR_MAP: typing.Dict[
 
 @contextmanager
 def wait_for_signal(
-    signal, timeout: int = 10000
+    signal,
+    timeout: int = 10000,
+    get_remaining_time: typing.Optional[typing.Callable[[], int]] = None,
 ) -> typing.ContextManager[EventLoopResult]:
     """Fire up a custom event loop and wait for the input signal to be emitted
 
@@ -89,16 +451,35 @@ def wait_for_signal(
     the handling of network requests and responses in order to make the code easier to
     grasp.
 
+    The optional `get_remaining_time` callable allows extending the wait: once
+    `timeout` is reached, the loop keeps running for as many more milliseconds as it
+    returns.
+
     """
 
     loop = QtCore.QEventLoop()
     signal.connect(loop.quit)
     loop_result = EventLoopResult(result=None)
     yield loop_result
-    QtCore.QTimer.singleShot(timeout, partial(_forcibly_terminate_loop, loop))
+    QtCore.QTimer.singleShot(
+        timeout, partial(_handle_loop_timeout, loop, get_remaining_time)
+    )
     loop_result.result = not bool(loop.exec_())
 
 
+def _handle_loop_timeout(
+    loop: QtCore.QEventLoop,
+    get_remaining_time: typing.Optional[typing.Callable[[], int]],
+) -> None:
+    remaining_time = get_remaining_time() if get_remaining_time is not None else 0
+    if remaining_time > 0:
+        QtCore.QTimer.singleShot(
+            remaining_time, partial(_handle_loop_timeout, loop, get_remaining_time)
+        )
+    else:
+        _forcibly_terminate_loop(loop)
+
+
 def _forcibly_terminate_loop(loop: QtCore.QEventLoop):
     log("Forcibly ending event loop...")
     loop.exit(1)
@@ -130,11 +511,13 @@ def parse_qt_network_reply(reply: QtNetwork.QNetworkReply) -> ParsedNetworkReply
     else:
         qt_error = _Q_NETWORK_REPLY_ERROR_MAP[error]
     body = reply.readAll()
+    etag, _ = get_cache_validators(reply)
     return ParsedNetworkReply(
         http_status_code=http_status_code,
         http_status_reason=http_status_reason,
         qt_error=qt_error,
         response_body=body,
+        etag=etag,
     )
 
 
@@ -168,6 +551,144 @@ def create_request(
     return request
 
 
+def prepare_cacheable_request(
+    request: QtNetwork.QNetworkRequest,
+    etag: typing.Optional[str] = None,
+    last_modified: typing.Optional[str] = None,
+) -> None:
+    """Prepare a request whose response is going to be managed by our HTTP cache
+
+    When validators of a previously cached response are provided, the request is
+    turned into a conditional request and the remote server is expected to reply with
+    `304 Not Modified` if the resource has not changed in the meantime.
+
+    """
+
+    if etag:
+        request.setRawHeader(b"If-None-Match", etag.encode("utf-8"))
+    if last_modified:
+        request.setRawHeader(b"If-Modified-Since", last_modified.encode("utf-8"))
+    # prevent the network access manager from answering the request with its own
+    # cache, otherwise we would not get to see the `304 Not Modified` replies
+    request.setAttribute(
+        QtNetwork.QNetworkRequest.CacheLoadControlAttribute,
+        QtNetwork.QNetworkRequest.AlwaysNetwork,
+    )
+    request.setAttribute(QtNetwork.QNetworkRequest.CacheSaveControlAttribute, False)
+
+
+def get_cache_validators(
+    reply: QtNetwork.QNetworkReply,
+) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    """Return the `ETag` and `Last-Modified` headers of the input reply"""
+    result = []
+    for header_name in (b"ETag", b"Last-Modified"):
+        if reply.hasRawHeader(header_name):
+            result.append(reply.rawHeader(header_name).data().decode("utf-8"))
+        else:
+            result.append(None)
+    return tuple(result)
+
+
+class ResponseStreamer:
+    """Write the body of a network reply to a device, as it arrives
+
+    Data is moved out of the reply whenever it emits `readyRead` and the reply's own
+    read buffer is capped, which makes Qt throttle the download if the device is
+    slower than the network. Only the bodies of successful responses are streamed,
+    error responses are left in the reply to be parsed as usual.
+
+    When no device is provided, the body is written to a temporary file, whose path
+    is returned by `finish()`.
+
+    """
+
+    reply: QtNetwork.QNetworkReply
+    device: QtCore.QIODevice
+    path: typing.Optional[Path]
+    bytes_written: int
+
+    def __init__(
+        self,
+        reply: QtNetwork.QNetworkReply,
+        device: typing.Optional[QtCore.QIODevice] = None,
+        buffer_size: int = STREAMING_BUFFER_SIZE,
+    ):
+        self.reply = reply
+        self.buffer_size = buffer_size
+        self.bytes_written = 0
+        if device is None:
+            handle, raw_path = tempfile.mkstemp(prefix="qgis_geonode_")
+            self.path = Path(raw_path)
+            self.device = QtCore.QFile(raw_path)
+            self.device.open(
+                handle, QtCore.QIODevice.WriteOnly, QtCore.QFile.AutoCloseHandle
+            )
+        else:
+            self.path = None
+            self.device = device
+        self.reply.setReadBufferSize(buffer_size)
+        # read data in the thread where the reply lives, as soon as it arrives
+        self.reply.readyRead.connect(self._drain, QtCore.Qt.DirectConnection)
+
+    def finish(self) -> typing.Optional[Path]:
+        """Write any remaining data and stop streaming"""
+        self._drain()
+        try:
+            self.reply.readyRead.disconnect(self._drain)
+        except TypeError:
+            pass  # already disconnected
+        result = None
+        if self.path is not None:
+            self.device.close()
+            if self.bytes_written > 0:
+                result = self.path
+            else:
+                self.path.unlink()
+        return result
+
+    def discard(self) -> None:
+        """Stop streaming and remove the temporary file, if there is one"""
+        path = self.finish()
+        if path is not None:
+            path.unlink()
+
+    def _drain(self) -> None:
+        status_code = self.reply.attribute(
+            QtNetwork.QNetworkRequest.HttpStatusCodeAttribute
+        )
+        if status_code is not None and 200 <= status_code < 300:
+            while self.reply.bytesAvailable() > 0:
+                chunk = self.reply.read(self.buffer_size)
+                self.device.write(chunk)
+                self.bytes_written += len(chunk)
+
+
+def get_retry_after(reply: QtNetwork.QNetworkReply) -> typing.Optional[int]:
+    """Return the delay requested by the `Retry-After` header, in milliseconds
+
+    The header may contain either a number of seconds or an HTTP date.
+
+    """
+
+    result = None
+    if reply.hasRawHeader(b"Retry-After"):
+        raw_value = reply.rawHeader(b"Retry-After").data().decode("utf-8").strip()
+        try:
+            result = max(0, int(raw_value) * 1000)
+        except ValueError:
+            try:
+                retry_date = email.utils.parsedate_to_datetime(raw_value)
+            except (TypeError, ValueError):
+                log(f"Could not parse Retry-After header: {raw_value!r}")
+            else:
+                if retry_date.tzinfo is None:
+                    retry_date = retry_date.replace(tzinfo=dt.timezone.utc)
+                seconds = retry_date.timestamp() - time.time()
+                result = max(0, int(seconds * 1000))
+    return result
+
+
 def handle_discovery_test(
     finished_task_result: bool, finished_task: qgis.core.QgsTask
 ) -> typing.Optional[packaging_version.Version]:
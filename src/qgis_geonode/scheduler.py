@@ -0,0 +1,167 @@
+"""Plugin-wide scheduling of network requests"""
+
+import dataclasses
+import heapq
+import itertools
+import threading
+import time
+import typing
+
+from .conf import settings_manager
+from .network import RequestPriority
+
+
+@dataclasses.dataclass()
+class HostStats:
+    active: int = 0
+    queued: int = 0
+    dispatched: int = 0
+    total_wait_time: float = 0  # in seconds
+    max_wait_time: float = 0  # in seconds
+
+    @property
+    def mean_wait_time(self) -> float:
+        try:
+            result = self.total_wait_time / self.dispatched
+        except ZeroDivisionError:
+            result = 0
+        return result
+
+
+@dataclasses.dataclass(order=True)
+class SchedulerTicket:
+    priority: int
+    sequence: int
+    host: str = dataclasses.field(compare=False)
+    enqueued_at: float = dataclasses.field(compare=False)
+    dispatch: typing.Callable[[], None] = dataclasses.field(compare=False)
+
+
+class RequestScheduler:
+    """Limit the number of concurrent requests sent to each remote host
+
+    Requests are submitted together with a callable that performs them. The callable
+    is invoked straight away if the remote host has spare capacity, otherwise the
+    request is queued and later dispatched in order of priority, once a previous
+    request to the same host is released.
+
+    Callers must call `release()` exactly once for each dispatched request, when it
+    is done. Requests that are no longer needed while still waiting in the queue can
+    be removed with `discard()`.
+
+    """
+
+    max_concurrent_requests_per_host: int
+    _queues: typing.Dict[str, typing.List[SchedulerTicket]]
+    _stats: typing.Dict[str, HostStats]
+
+    def __init__(self, max_concurrent_requests_per_host: int):
+        self.max_concurrent_requests_per_host = max(1, max_concurrent_requests_per_host)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._queues = {}
+        self._stats = {}
+
+    def submit(
+        self,
+        host: str,
+        priority: RequestPriority,
+        dispatch: typing.Callable[[], None],
+    ) -> SchedulerTicket:
+        queued = SchedulerTicket(
+            priority=int(priority),
+            sequence=next(self._sequence),
+            host=host,
+            enqueued_at=time.monotonic(),
+            dispatch=dispatch,
+        )
+        with self._lock:
+            host_stats = self._stats.setdefault(host, HostStats())
+            if host_stats.active < self.max_concurrent_requests_per_host:
+                self._mark_dispatched(host_stats, queued)
+                to_dispatch = queued
+            else:
+                heapq.heappush(self._queues.setdefault(host, []), queued)
+                host_stats.queued += 1
+                to_dispatch = None
+        if to_dispatch is not None:
+            to_dispatch.dispatch()
+        return queued
+
+    def release(self, host: str) -> None:
+        to_dispatch = None
+        with self._lock:
+            host_stats = self._stats.setdefault(host, HostStats())
+            host_stats.active = max(0, host_stats.active - 1)
+            queue = self._queues.get(host, [])
+            if len(queue) > 0:
+                to_dispatch = heapq.heappop(queue)
+                host_stats.queued -= 1
+                self._mark_dispatched(host_stats, to_dispatch)
+        if to_dispatch is not None:
+            to_dispatch.dispatch()
+
+    def discard(self, ticket: SchedulerTicket) -> bool:
+        """Remove a request from the queue, if it has not been dispatched yet
+
+        Returns `False` when the request has already been dispatched, in which case
+        the caller is still expected to `release()` it.
+
+        """
+
+        with self._lock:
+            queue = self._queues.get(ticket.host, [])
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._stats[ticket.host].queued -= 1
+                result = True
+            else:
+                result = False
+        return result
+
+    def queue_depth(self, host: typing.Optional[str] = None) -> int:
+        with self._lock:
+            if host is not None:
+                result = len(self._queues.get(host, []))
+            else:
+                result = sum(len(queue) for queue in self._queues.values())
+        return result
+
+    def is_busy(self, host: str) -> bool:
+        """Check whether a new request to the host would have to wait in the queue"""
+        with self._lock:
+            host_stats = self._stats.get(host, HostStats())
+            return (
+                host_stats.active >= self.max_concurrent_requests_per_host
+                or host_stats.queued > 0
+            )
+
+    def stats(self) -> typing.Dict[str, HostStats]:
+        with self._lock:
+            return {
+                host: dataclasses.replace(host_stats)
+                for host, host_stats in self._stats.items()
+            }
+
+    @staticmethod
+    def _mark_dispatched(host_stats: HostStats, queued: SchedulerTicket) -> None:
+        wait_time = time.monotonic() - queued.enqueued_at
+        host_stats.active += 1
+        host_stats.dispatched += 1
+        host_stats.total_wait_time += wait_time
+        host_stats.max_wait_time = max(host_stats.max_wait_time, wait_time)
+
+
+_request_scheduler: typing.Optional[RequestScheduler] = None
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Return the plugin-wide request scheduler"""
+    global _request_scheduler
+    if _request_scheduler is None:
+        scheduler_settings = settings_manager.get_request_scheduler_settings()
+        _request_scheduler = RequestScheduler(
+            scheduler_settings.max_concurrent_requests_per_host
+        )
+    return _request_scheduler
@@ -0,0 +1,207 @@
+"""Persistent cache of the SLD styles of datasets, ready to be applied to layers"""
+
+import contextlib
+import dataclasses
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+import qgis.core
+
+from .conf import settings_manager
+from .utils import log
+
+# seconds during which a cached style is used without asking the remote about it
+STYLE_FRESHNESS = 10 * 60
+
+# bytes of cached styles, beyond which the least recently used ones are dropped
+STYLE_CACHE_MAX_SIZE = 20 * 1024 * 1024
+
+
+@dataclasses.dataclass()
+class CachedStyle:
+    url: str
+    etag: str
+    # the SLD's NamedLayer element, with comments already removed
+    named_layer: str
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class StyleCache:
+    """A disk-backed cache of SLD styles
+
+    Downloaded SLD documents are stored in their usable form, i.e. the `NamedLayer`
+    element stripped of comments, so that cached styles don't need to go through
+    the whole cleanup again. Styles are keyed by their URL and the auth config that
+    was used to retrieve them, and only styles whose response carried an `ETag` are
+    stored.
+
+    Styles are used as they are for `freshness` seconds. After that, they are
+    revalidated by asking the remote for the style with the stored `ETag`. Once
+    the stored styles take up more than `max_size` bytes, the least recently used
+    ones are dropped.
+
+    Access to the database is serialized, just like with the HTTP response cache.
+
+    """
+
+    enabled: bool
+    freshness: int
+    max_size: int
+    database_path: Path
+    _lock: threading.Lock
+
+    def __init__(
+        self,
+        database_path: Path,
+        freshness: int = STYLE_FRESHNESS,
+        enabled: bool = True,
+        max_size: int = STYLE_CACHE_MAX_SIZE,
+    ):
+        self.database_path = database_path
+        self.freshness = freshness
+        self.enabled = enabled
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS style ("
+                "url TEXT NOT NULL, "
+                "auth_config TEXT NOT NULL, "
+                "etag TEXT NOT NULL, "
+                "named_layer TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_access REAL NOT NULL, "
+                "PRIMARY KEY (url, auth_config)"
+                ")"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS style_last_access_idx "
+                "ON style (last_access)"
+            )
+
+    def get(
+        self, url: str, auth_config: typing.Optional[str] = None
+    ) -> typing.Optional[CachedStyle]:
+        if self.enabled:
+            key = (url, auth_config or "")
+            with self._lock, self._connect() as connection:
+                row = connection.execute(
+                    "SELECT url, etag, named_layer, fetched_at FROM style "
+                    "WHERE url = ? AND auth_config = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE style SET last_access = ? "
+                        "WHERE url = ? AND auth_config = ?",
+                        (time.time(), *key),
+                    )
+            result = CachedStyle(*row) if row is not None else None
+        else:
+            result = None
+        return result
+
+    def is_fresh(self, style: CachedStyle) -> bool:
+        return style.age < self.freshness
+
+    def store(
+        self,
+        url: str,
+        auth_config: typing.Optional[str],
+        etag: str,
+        named_layer: str,
+    ) -> None:
+        size = len(named_layer.encode("utf-8"))
+        if self.enabled and size <= self.max_size:
+            now = time.time()
+            with self._lock, self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO style (url, auth_config, etag, "
+                    "named_layer, fetched_at, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, auth_config or "", etag, named_layer, now, size, now),
+                )
+                self._evict(connection)
+        elif self.enabled:
+            log(f"Style {url!r} is too large to be cached, skipping...")
+
+    def record_revalidation(
+        self, url: str, auth_config: typing.Optional[str] = None
+    ) -> None:
+        """Register that the remote has confirmed a cached style to be current"""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE style SET fetched_at = ? WHERE url = ? AND auth_config = ?",
+                (time.time(), url, auth_config or ""),
+            )
+
+    def invalidate(self, url: str, auth_config: typing.Optional[str] = None) -> None:
+        """Drop a style, e.g. because it has just been replaced on the remote"""
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "DELETE FROM style WHERE url = ? AND auth_config = ?",
+                (url, auth_config or ""),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute("DELETE FROM style")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Remove least recently used styles until the cache fits its budget"""
+        total_size = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM style"
+        ).fetchone()[0]
+        if total_size > self.max_size:
+            rows = connection.execute(
+                "SELECT url, auth_config, size FROM style ORDER BY last_access"
+            ).fetchall()
+            keys_to_remove = []
+            for url, auth_config, size in rows:
+                if total_size <= self.max_size:
+                    break
+                keys_to_remove.append((url, auth_config))
+                total_size -= size
+            connection.executemany(
+                "DELETE FROM style WHERE url = ? AND auth_config = ?", keys_to_remove
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(str(self.database_path), timeout=10)
+        try:
+            with connection:  # commits the transaction on exit
+                yield connection
+        finally:
+            connection.close()
+
+
+_style_cache: typing.Optional[StyleCache] = None
+
+
+def get_style_cache() -> StyleCache:
+    """Return the plugin-wide cache of SLD styles
+
+    The cache is stored inside the current QGIS profile directory and follows the
+    settings of the HTTP response cache.
+
+    """
+
+    global _style_cache
+    if _style_cache is None:
+        _style_cache = StyleCache(
+            Path(qgis.core.QgsApplication.qgisSettingsDirPath())
+            / "qgis_geonode"
+            / "style_cache.sqlite",
+            enabled=settings_manager.get_http_cache_settings().enabled,
+        )
+    return _style_cache
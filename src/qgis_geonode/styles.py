@@ -8,7 +8,7 @@ from .utils import remove_comments_from_sld
 
 
 def deserialize_sld_doc(
-    raw_sld_doc: QtCore.QByteArray,
+    raw_sld_doc: typing.Union[QtCore.QByteArray, QtCore.QIODevice],
 ) -> typing.Tuple[typing.Optional[QtXml.QDomElement], str]:
     """Deserialize SLD document gotten from GeoNode into a usable named layer element"""
     sld_doc = QtXml.QDomDocument()
@@ -64,5 +64,15 @@ def serialize_sld_named_layer(sld_named_layer: QtXml.QDomElement) -> str:
 def get_usable_sld(
     http_response: network.ParsedNetworkReply,
 ) -> typing.Tuple[typing.Optional[QtXml.QDomElement], str]:
-    raw_sld = http_response.response_body
-    return deserialize_sld_doc(raw_sld)
+    if http_response.body_path is not None:
+        # let the XML parser read streamed SLD documents straight from their file
+        sld_file = QtCore.QFile(str(http_response.body_path))
+        if sld_file.open(QtCore.QIODevice.ReadOnly):
+            result = deserialize_sld_doc(sld_file)
+            sld_file.close()
+        else:
+            result = None, "Could not read downloaded SLD document"
+        http_response.release_body()
+    else:
+        result = deserialize_sld_doc(http_response.response_body)
+    return result
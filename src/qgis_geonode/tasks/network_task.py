@@ -1,105 +1,197 @@
+import dataclasses
+import datetime as dt
+import threading
+import time
 import typing
+from functools import partial
 
 from qgis.PyQt import (
     QtCore,
     QtNetwork,
 )
 import qgis.core
-from .. import network
+from .. import (
+    conf,
+    http_cache,
+    metrics,
+    network,
+    scheduler,
+)
 from ..utils import log
 
+# extra time given to a task for wrapping up after its requests' deadlines
+_TIMEOUT_GRACE_PERIOD = 1000  # milliseconds
+
+
+@dataclasses.dataclass()
+class _RequestTimer:
+    """Moments in the life of a request, as given by `time.monotonic()`"""
+
+    created_at: float = dataclasses.field(default_factory=time.monotonic)
+    enqueued_at: typing.Optional[float] = None
+    dispatched_at: typing.Optional[float] = None
+    first_byte_at: typing.Optional[float] = None
+    queue_wait: float = 0  # accumulated over all attempts, in seconds
+    bytes_received: int = 0
+    cache_status: metrics.CacheStatus = metrics.CacheStatus.BYPASS
+
+
+class _RequestDispatcher(QtCore.QObject):
+    """Run request dispatching callables in the thread where this object lives
+
+    The request scheduler may decide to dispatch a queued request from whatever thread
+    released its previous slot. Emitting this signal ensures the request is always
+    sent from the thread of the task that owns it.
+
+    """
+
+    dispatch_requested = QtCore.pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.dispatch_requested.connect(self._dispatch)
+
+    @QtCore.pyqtSlot(object)
+    def _dispatch(self, callback: typing.Callable[[], None]) -> None:
+        callback()
+
+
+class _NetworkRequestsMixin:
+    """Machinery for performing a batch of network requests in parallel
+
+    Requests are coalesced with identical in-flight requests, handed over to the
+    plugin-wide scheduler and served from the HTTP cache whenever possible. Classes
+    using this mixin must be QObjects that provide an `_all_requests_finished` signal,
+    which is emitted once there are no more requests to wait for.
+
+    Each request has its own deadline, which starts running when the scheduler
+    dispatches the request, so that time spent waiting in its queue does not count
+    against it, and which is re-armed for every retry attempt. Requests that miss
+    their deadline are aborted and their index is recorded in `timed_out_requests`.
+    All requests that have not finished yet are aborted when the batch is cancelled
+    or runs out of time. Requests that fail because the remote is temporarily
+    unavailable are retried according to `retry_policy`, which pushes back the
+    deadline of the whole batch.
+
+    The timings of every request are recorded in the plugin-wide request metrics,
+    tagged with the operation the request was made for.
+
+    """
 
-class NetworkRequestTask(qgis.core.QgsTask):
     authcfg: typing.Optional[str]
+    cache: http_cache.HttpResponseCache
+    scheduler: scheduler.RequestScheduler
     network_task_timeout: int
     network_access_manager: qgis.core.QgsNetworkAccessManager
     requests_to_perform: typing.List[network.RequestToPerform]
+    retry_policy: network.RetryPolicy
     response_contents: typing.List[typing.Optional[network.ParsedNetworkReply]]
+    timed_out_requests: typing.Set[int]
+    _cached_responses: typing.Dict[int, http_cache.CachedResponse]
+    _cancelled: bool
+    _coalescing_keys: typing.Dict[int, network.CoalescingKey]
+    _completed_requests: typing.Set[int]
+    _completion_lock: threading.Lock
+    _dispatcher: typing.Optional[_RequestDispatcher]
     _num_finished: int
     _pending_replies: typing.Dict[int, typing.Tuple[int, QtNetwork.QNetworkReply]]
+    _scheduler_tickets: typing.Dict[int, scheduler.SchedulerTicket]
+    _streamers: typing.Dict[int, network.ResponseStreamer]
+    _attempts: typing.Dict[int, int]
+    _batch_deadline: float
+    _deadlines: typing.Dict[int, int]
+    _submitted_at: typing.Dict[int, float]
+    _timers: typing.Dict[int, _RequestTimer]
 
-    _all_requests_finished = QtCore.pyqtSignal()
-    task_done = QtCore.pyqtSignal(bool)
-
-    def __init__(
+    def _initialize_requests(
         self,
         requests_to_perform: typing.List[network.RequestToPerform],
         network_task_timeout: int,
-        authcfg: typing.Optional[str] = None,
-        description: typing.Optional[str] = "AnotherNetworkRequestTask",
-    ):
-        """A QGIS task to run multiple network requests in parallel."""
-        super().__init__(description)
+        authcfg: typing.Optional[str],
+        retry_policy: typing.Optional[network.RetryPolicy],
+    ) -> None:
         self.authcfg = authcfg
         self.network_task_timeout = network_task_timeout
         self.requests_to_perform = requests_to_perform[:]
+        self.retry_policy = retry_policy or conf.settings_manager.get_retry_policy()
         self.response_contents = [None] * len(requests_to_perform)
+        self.timed_out_requests = set()
+        self._cached_responses = {}
+        self._cancelled = False
+        self._coalescing_keys = {}
+        self._completed_requests = set()
+        self._completion_lock = threading.Lock()
+        self._dispatcher = None
         self._num_finished = 0
         self._pending_replies = {}
+        self._scheduler_tickets = {}
+        self._streamers = {}
+        self._attempts = {}
+        self._batch_deadline = 0
+        self._deadlines = {}
+        self._submitted_at = {}
+        self._timers = {}
+        self.cache = http_cache.get_http_cache()
+        self.scheduler = scheduler.get_request_scheduler()
         self.network_access_manager = qgis.core.QgsNetworkAccessManager.instance()
-        self.network_access_manager.setTimeout(self.network_task_timeout)
-        self.network_access_manager.requestTimedOut.connect(
-            self._handle_request_timed_out
-        )
-        self.network_access_manager.finished.connect(self._handle_request_finished)
 
-    def run(self) -> bool:
-        """Run the QGIS task
+    def _start_requests(self) -> None:
+        """Send out all requests, without waiting for their replies"""
+        self._dispatcher = _RequestDispatcher()
+        self._extend_batch_deadline(self._get_batch_timeout())
+        for index, request_params in enumerate(self.requests_to_perform):
+            coalescing_key = network.get_coalescing_key(request_params, self.authcfg)
+            if coalescing_key is not None:
+                attached = network.request_coalescer.attach(
+                    coalescing_key,
+                    partial(self._handle_coalesced_reply, index),
+                    take_over=partial(
+                        self._take_over_coalesced_request, index, coalescing_key
+                    ),
+                )
+                if attached:
+                    continue  # an identical request is already in flight
+                self._coalescing_keys[index] = coalescing_key
+            self._schedule_request(index, request_params)
 
-        This method is called by the QGIS task manager.
+    def _get_request_timeout(self, request_params: network.RequestToPerform) -> int:
+        if request_params.timeout is not None:
+            result = request_params.timeout
+        else:
+            result = self.network_task_timeout
+        return result
 
-        Implementation uses a custom Qt event loop that waits until
-        all of the HTTP requests have been performed. This is done by waiting on the
-        `self._all_requests_finished` signal to be emitted.
+    def _get_batch_timeout(self) -> int:
+        """Return how long to wait for the whole batch of requests to finish
+
+        Since all requests are submitted at once and each one has its own deadline,
+        the batch is done once the slowest request's deadline has been reached. Retries
+        are accounted for as they are scheduled, see `_get_remaining_batch_time()`.
 
         """
 
-        if len(self.requests_to_perform) == 0:  # there is nothing to do
-            result = False
-        else:
-            with network.wait_for_signal(
-                self._all_requests_finished,
-                timeout=self.network_task_timeout * len(self.requests_to_perform),
-            ) as event_loop_result:
-                for index, request_params in enumerate(self.requests_to_perform):
-                    request = network.create_request(
-                        request_params.url, request_params.content_type
-                    )
-                    if self.authcfg:
-                        auth_manager = qgis.core.QgsApplication.authManager()
-                        auth_added, _ = auth_manager.updateNetworkRequest(
-                            request, self.authcfg
-                        )
-                    else:
-                        auth_added = True
-                    if auth_added:
-                        qt_reply = self._dispatch_request(
-                            request, request_params.method, request_params.payload
-                        )
-                        # QGIS adds a custom `requestId` property to all requests made by
-                        # its network access manager - this can be used to keep track of
-                        # replies
-                        request_id = qt_reply.property("requestId")
-                        # self._pending_replies[request_id] = [index, qt_reply, False]
-                        self._pending_replies[request_id] = network.PendingReply(
-                            index, qt_reply, False
-                        )
-                    else:
-                        self._all_requests_finished.emit()
-            loop_forcibly_ended = not bool(event_loop_result.result)
-            if loop_forcibly_ended:
-                result = False
-            else:
-                result = self._num_finished >= len(self.requests_to_perform)
-        return result
+        timeouts = [self._get_request_timeout(r) for r in self.requests_to_perform]
+        return max(timeouts, default=self.network_task_timeout) + _TIMEOUT_GRACE_PERIOD
 
-    def finished(self, result: bool) -> None:
-        """This method is called by the QGIS task manager when this task is finished"""
-        # This class emits the `task_done` signal in order to have a unified way to
-        # deal with the various types of errors that can arise. The alternative would
-        # have been to rely on the base class' `taskCompleted` and `taskTerminated`
-        # signals
-        if result:
+    def _extend_batch_deadline(self, duration: int) -> None:
+        """Make sure the batch is waited for at least `duration` more milliseconds"""
+        self._batch_deadline = max(
+            self._batch_deadline, time.monotonic() + duration / 1000
+        )
+
+    def _get_remaining_batch_time(self) -> int:
+        """Return how many milliseconds are left until the batch runs out of time"""
+        return max(0, round((self._batch_deadline - time.monotonic()) * 1000))
+
+    def _time_out_unfinished_requests(self) -> None:
+        """Abort the requests that are still running once the batch is out of time"""
+        for index in range(len(self.requests_to_perform)):
+            if self._complete_request(index, None, timed_out=True):
+                self._abort_reply(index)
+
+    def _get_final_result(self, result: bool) -> bool:
+        """Check whether all requests have been performed successfully"""
+        if result and not self._cancelled:
             for index, response in enumerate(self.response_contents):
                 if response is None:
                     final_result = False
@@ -110,10 +202,140 @@ class NetworkRequestTask(qgis.core.QgsTask):
             else:
                 final_result = result
         else:
-            final_result = result
-        # for _, qt_reply in self._pending_replies.values():
-        #     qt_reply.deleteLater()
-        self.task_done.emit(final_result)
+            final_result = False
+        return final_result
+
+    def _cancel_requests(self) -> None:
+        """Abort all requests that have not finished yet and drop their contents
+
+        Requests that other tasks are waiting for are sent again by one of them.
+
+        """
+
+        self._cancelled = True
+        for index in range(len(self.requests_to_perform)):
+            if self._complete_request(index, None):
+                self._abort_reply(index)
+        for response in self.response_contents:
+            if response is not None:
+                response.release_body()
+        self.response_contents = [None] * len(self.requests_to_perform)
+        self._cached_responses.clear()
+
+    def _schedule_request(
+        self, index: int, request_params: network.RequestToPerform
+    ) -> None:
+        """Hand the request over to the scheduler, which will decide when to send it"""
+        self._submitted_at[index] = time.monotonic()
+        self._timers[index] = _RequestTimer(created_at=self._submitted_at[index])
+        self._submit_to_scheduler(index, request_params)
+
+    def _submit_to_scheduler(
+        self, index: int, request_params: network.RequestToPerform
+    ) -> None:
+        self._attempts[index] = self._attempts.get(index, 0) + 1
+        self._get_timer(index).enqueued_at = time.monotonic()
+        ticket = self.scheduler.submit(
+            request_params.url.host(),
+            request_params.priority,
+            partial(
+                self._dispatcher.dispatch_requested.emit,
+                partial(self._perform_request, index, request_params),
+            ),
+        )
+        with self._completion_lock:
+            already_completed = index in self._completed_requests
+            if not already_completed:
+                self._scheduler_tickets[index] = ticket
+        if already_completed and not self.scheduler.discard(ticket):
+            # the request was completed while being dispatched
+            self.scheduler.release(ticket.host)
+
+    def _release_scheduler_slot(self, index: int) -> None:
+        with self._completion_lock:
+            ticket = self._scheduler_tickets.pop(index, None)
+        if ticket is not None and not self.scheduler.discard(ticket):
+            self.scheduler.release(ticket.host)
+
+    def _release_scheduler_slots(self) -> None:
+        """Give back any slots still held once the task is done waiting for replies"""
+        for index in list(self._scheduler_tickets.keys()):
+            self._release_scheduler_slot(index)
+
+    def _perform_request(
+        self, index: int, request_params: network.RequestToPerform
+    ) -> None:
+        if index in self._completed_requests:
+            return  # the batch was cancelled while the request was still queued
+        self._arm_deadline(index, request_params)
+        timer = self._get_timer(index)
+        timer.dispatched_at = time.monotonic()
+        timer.first_byte_at = None
+        if timer.enqueued_at is not None:
+            timer.queue_wait += timer.dispatched_at - timer.enqueued_at
+        request = network.create_request(
+            request_params.url, request_params.content_type
+        )
+        if self._is_cacheable(request_params):
+            self._prepare_cacheable_request(index, request)
+        elif request_params.etag is not None:
+            network.prepare_cacheable_request(request, request_params.etag)
+        if self.authcfg:
+            auth_manager = qgis.core.QgsApplication.authManager()
+            auth_added, _ = auth_manager.updateNetworkRequest(request, self.authcfg)
+        else:
+            auth_added = True
+        if auth_added:
+            qt_reply = self._dispatch_request(
+                request, request_params.method, request_params.payload
+            )
+            self._track_reply(index, qt_reply)
+        else:
+            self._complete_request(index, None)
+            self._all_requests_finished.emit()
+
+    def _arm_deadline(
+        self, index: int, request_params: network.RequestToPerform
+    ) -> None:
+        attempt = self._attempts.get(index, 1)
+        self._deadlines[index] = attempt
+        QtCore.QTimer.singleShot(
+            self._get_request_timeout(request_params),
+            partial(self._handle_deadline_reached, index, attempt),
+        )
+
+    def _track_reply(self, index: int, qt_reply: QtNetwork.QNetworkReply) -> None:
+        # QGIS adds a custom `requestId` property to all requests made by
+        # its network access manager - this can be used to keep track of
+        # replies
+        request_id = qt_reply.property("requestId")
+        self._pending_replies[request_id] = network.PendingReply(index, qt_reply, False)
+        qt_reply.metaDataChanged.connect(partial(self._handle_first_byte, index))
+        request_params = self.requests_to_perform[index]
+        if request_params.is_streamed:
+            self._streamers[index] = network.ResponseStreamer(
+                qt_reply, request_params.output_device
+            )
+        network.reply_router.register(
+            self.network_access_manager,
+            request_id,
+            self._handle_request_finished,
+            self._handle_request_timed_out,
+        )
+
+    def _get_timer(self, index: int) -> _RequestTimer:
+        return self._timers.setdefault(index, _RequestTimer())
+
+    def _handle_first_byte(self, index: int) -> None:
+        timer = self._get_timer(index)
+        if timer.first_byte_at is None:
+            timer.first_byte_at = time.monotonic()
+
+    def _untrack_replies(self) -> None:
+        """Stop listening for replies that are still pending when giving up on them"""
+        for request_id, pending_reply in self._pending_replies.items():
+            if not pending_reply.fullfilled:
+                network.reply_router.unregister(request_id)
 
     def _dispatch_request(
         self,
@@ -140,6 +362,64 @@ class NetworkRequestTask(qgis.core.QgsTask):
             raise NotImplementedError
         return reply
 
+    def _is_cacheable(self, request_params: network.RequestToPerform) -> bool:
+        return (
+            self.cache.enabled
+            and request_params.use_cache
+            and request_params.method == network.HttpMethod.GET
+            and not request_params.is_streamed
+        )
+
+    def _prepare_cacheable_request(
+        self, index: int, request: QtNetwork.QNetworkRequest
+    ) -> None:
+        cached = self.cache.get(request.url().toString(), self.authcfg)
+        if cached is not None:
+            self._cached_responses[index] = cached
+            network.prepare_cacheable_request(
+                request, cached.etag, cached.last_modified
+            )
+        else:
+            network.prepare_cacheable_request(request)
+
+    def _update_cache(
+        self,
+        index: int,
+        qt_reply: QtNetwork.QNetworkReply,
+        parsed: network.ParsedNetworkReply,
+    ) -> network.ParsedNetworkReply:
+        """Serve `304 Not Modified` replies from the cache and store new responses"""
+        cached = self._cached_responses.pop(index, None)
+        url = self.requests_to_perform[index].url.toString()
+        result = parsed
+        if parsed.http_status_code == 304 and cached is not None:
+            self.cache.record_hit(url, self.authcfg)
+            result = network.ParsedNetworkReply(
+                http_status_code=cached.http_status_code,
+                http_status_reason=cached.http_status_reason,
+                qt_error=None,
+                response_body=QtCore.QByteArray(cached.body),
+                from_cache=True,
+            )
+        elif parsed.qt_error is None and parsed.http_status_code == 200:
+            if cached is not None:
+                # lookups that found nothing have already been counted as misses
+                self.cache.record_miss()
+            etag, last_modified = network.get_cache_validators(qt_reply)
+            if etag is not None or last_modified is not None:
+                self.cache.store(
+                    http_cache.CachedResponse(
+                        url=url,
+                        etag=etag,
+                        last_modified=last_modified,
+                        http_status_code=parsed.http_status_code,
+                        http_status_reason=parsed.http_status_reason,
+                        body=parsed.response_body.data(),
+                    ),
+                    self.authcfg,
+                )
+        return result
+
     def _handle_request_finished(self, qgis_reply: qgis.core.QgsNetworkReplyContent):
         """Handle the finishing of a network request
 
@@ -152,35 +432,400 @@ class NetworkRequestTask(qgis.core.QgsTask):
         then uses that to gain access to the response body.
 
         """
-        qt_reply = None
         try:
             pending_reply = self._pending_replies[qgis_reply.requestId()]
+        except KeyError:
+            pass  # we are not managing this request, ignore
+        else:
             # See https://github.com/GeoNode/QGISGeoNodePlugin/issues/275
             if not pending_reply.fullfilled:
                 index = pending_reply.index
                 qt_reply = pending_reply.reply
                 pending_reply.fullfilled = True
-
-        except KeyError:
-            pass  # we are not managing this request, ignore
-        else:
-            if qt_reply:
+                streamer = self._streamers.pop(index, None)
+                body_path = streamer.finish() if streamer is not None else None
                 parsed = network.parse_qt_network_reply(qt_reply)
-                self.response_contents[index] = parsed
-            self._num_finished += 1
-            if self._num_finished >= len(self.requests_to_perform):
-                self._all_requests_finished.emit()
+                parsed.body_path = body_path
+                if self._must_retry(index, qt_reply, parsed):
+                    parsed.release_body()
+                    return
+                timer = self._get_timer(index)
+                timer.bytes_received = _get_body_size(parsed)
+                if self._is_cacheable(self.requests_to_perform[index]):
+                    parsed = self._update_cache(index, qt_reply, parsed)
+                    timer.cache_status = (
+                        metrics.CacheStatus.REVALIDATED
+                        if parsed.from_cache
+                        else metrics.CacheStatus.MISS
+                    )
+                if not self._complete_request(index, parsed):
+                    parsed.release_body()  # the request had already timed out
+            else:
+                # the reply has been aborted, discard whatever it had streamed
+                streamer = self._streamers.pop(pending_reply.index, None)
+                if streamer is not None:
+                    streamer.discard()
+
+    def _must_retry(
+        self,
+        index: int,
+        qt_reply: QtNetwork.QNetworkReply,
+        parsed: network.ParsedNetworkReply,
+    ) -> bool:
+        """Schedule another attempt at performing the request, if it makes sense"""
+        request_params = self.requests_to_perform[index]
+        attempt = self._attempts.get(index, 1)
+        result = False
+        if self.retry_policy.should_retry(
+            request_params.method, parsed.http_status_code, attempt
+        ):
+            delay = self.retry_policy.get_delay(
+                attempt, network.get_retry_after(qt_reply)
+            )
+            elapsed = (time.monotonic() - self._submitted_at[index]) * 1000
+            if elapsed + delay <= self.retry_policy.time_budget:
+                log(
+                    f"Request to {request_params.url} failed with HTTP "
+                    f"{parsed.http_status_code}, retrying in {delay}ms "
+                    f"(attempt {attempt + 1} of {self.retry_policy.max_attempts})..."
+                )
+                network.retry_statistics.record_retry(parsed.http_status_code)
+                # the next attempt gets a deadline of its own once it is dispatched
+                self._deadlines.pop(index, None)
+                self._extend_batch_deadline(
+                    delay
+                    + self._get_request_timeout(request_params)
+                    + _TIMEOUT_GRACE_PERIOD
+                )
+                # give back the slot while waiting, so that other requests can use it
+                self._release_scheduler_slot(index)
+                QtCore.QTimer.singleShot(
+                    delay, partial(self._submit_to_scheduler, index, request_params)
+                )
+                result = True
+        if not result and attempt > 1:
+            network.retry_statistics.record_exhausted()
+        return result
 
     def _handle_request_timed_out(
         self, request_params: qgis.core.QgsNetworkRequestParameters
     ) -> None:
         log(f"Request with id: {request_params.requestId()} has timed out")
         try:
-            index, qt_reply = self._pending_replies[request_params.requestId()]
+            index = self._pending_replies[request_params.requestId()].index
         except KeyError:
             pass  # we are not managing this request, ignore
         else:
-            self.response_contents[index] = None
+            self._complete_request(index, None, timed_out=True)
+
+    def _handle_deadline_reached(self, index: int, attempt: int) -> None:
+        if self._deadlines.get(index) == attempt and self._complete_request(
+            index, None, timed_out=True
+        ):
+            log(f"Request to {self.requests_to_perform[index].url} has timed out")
+            self._abort_reply(index)
+
+    def _abort_reply(self, index: int) -> None:
+        for pending_reply in list(self._pending_replies.values()):
+            if pending_reply.index == index and not pending_reply.fullfilled:
+                pending_reply.fullfilled = True
+                # the reply belongs to the network access manager's thread, so
+                # ask for it to be aborted there, which happens right away if this
+                # is that thread, as its event loop may no longer be running
+                QtCore.QMetaObject.invokeMethod(
+                    pending_reply.reply, "abort", QtCore.Qt.AutoConnection
+                )
+
+    def _handle_coalesced_reply(
+        self, index: int, parsed: typing.Optional[network.ParsedNetworkReply]
+    ) -> None:
+        """Handle the reply of an identical request that was performed by someone else"""
+        self._get_timer(index).cache_status = metrics.CacheStatus.COALESCED
+        self._complete_request(index, parsed)
+
+    def _take_over_coalesced_request(
+        self, index: int, coalescing_key: network.CoalescingKey
+    ) -> bool:
+        """Perform a request whose identical in-flight request has been abandoned"""
+        with self._completion_lock:
+            available = not self._cancelled and index not in self._completed_requests
+        if available:
+            log(f"Taking over request to {self.requests_to_perform[index].url}...")
+            self._coalescing_keys[index] = coalescing_key
+            self._schedule_request(index, self.requests_to_perform[index])
+        return available
+
+    def _complete_request(
+        self,
+        index: int,
+        parsed: typing.Optional[network.ParsedNetworkReply],
+        timed_out: bool = False,
+    ) -> bool:
+        """Record the outcome of a request
+
+        Returns `False` if the request had already been completed before, in which
+        case the new outcome is ignored.
+
+        """
+
+        with self._completion_lock:
+            if index in self._completed_requests:
+                return False
+            self._completed_requests.add(index)
+            if timed_out:
+                self.timed_out_requests.add(index)
+            self.response_contents[index] = parsed
             self._num_finished += 1
-            if self._num_finished >= len(self.requests_to_perform):
-                self._all_requests_finished.emit()
+            all_finished = self._num_finished >= len(self.requests_to_perform)
+        self._release_scheduler_slot(index)
+        self._record_timing(index, parsed, timed_out)
+        self._resolve_coalesced_requests(index, parsed)
+        if all_finished:
+            self._all_requests_finished.emit()
+        return True
+
+    def _record_timing(
+        self,
+        index: int,
+        parsed: typing.Optional[network.ParsedNetworkReply],
+        timed_out: bool,
+    ) -> None:
+        now = time.monotonic()
+        request_params = self.requests_to_perform[index]
+        timer = self._get_timer(index)
+        if self._cancelled:
+            outcome = metrics.RequestOutcome.CANCELLED
+        elif timed_out:
+            outcome = metrics.RequestOutcome.TIMED_OUT
+        elif parsed is None or parsed.qt_error is not None:
+            outcome = metrics.RequestOutcome.ERROR
+        else:
+            outcome = metrics.RequestOutcome.SUCCESS
+        timing = metrics.RequestTiming(
+            url=request_params.url.toString(),
+            method=request_params.method.value,
+            operation=request_params.operation,
+            outcome=outcome,
+            cache_status=timer.cache_status,
+            finished_at=dt.datetime.now(dt.timezone.utc),
+            http_status_code=parsed.http_status_code if parsed is not None else None,
+            retries=max(0, self._attempts.get(index, 1) - 1),
+            bytes_received=timer.bytes_received,
+            total_time=_to_milliseconds(now - timer.created_at),
+        )
+        if timer.enqueued_at is not None:
+            timing.queue_wait = _to_milliseconds(timer.queue_wait)
+        if timer.dispatched_at is not None and timer.first_byte_at is not None:
+            timing.time_to_first_byte = _to_milliseconds(
+                timer.first_byte_at - timer.dispatched_at
+            )
+            timing.transfer_time = _to_milliseconds(now - timer.first_byte_at)
+        metrics.request_metrics.record(timing)
+        log(
+            f"{timing.method} {timing.url} ({timing.operation.value}): "
+            f"{timing.outcome.value}, HTTP {timing.http_status_code}, "
+            f"{timing.total_time:.0f}ms total, {timing.queue_wait or 0:.0f}ms queued, "
+            f"{timing.bytes_received} bytes, cache {timing.cache_status.value}, "
+            f"{timing.retries} retries"
+        )
+
+    def _resolve_coalesced_requests(
+        self, index: int, parsed: typing.Optional[network.ParsedNetworkReply]
+    ) -> None:
+        coalescing_key = self._coalescing_keys.pop(index, None)
+        if coalescing_key is not None and self._cancelled:
+            # others may still be waiting for the request, let one of them send it
+            network.request_coalescer.abandon(coalescing_key)
+        elif coalescing_key is not None:
+            network.request_coalescer.resolve(coalescing_key, parsed)
+
+
+class NetworkRequestTask(_NetworkRequestsMixin, qgis.core.QgsTask):
+    processed_response: typing.Optional[typing.Any]
+    response_handler: typing.Optional[
+        typing.Callable[
+            [typing.List[typing.Optional[network.ParsedNetworkReply]]], typing.Any
+        ]
+    ]
+
+    _all_requests_finished = QtCore.pyqtSignal()
+    task_done = QtCore.pyqtSignal(bool)
+
+    def __init__(
+        self,
+        requests_to_perform: typing.List[network.RequestToPerform],
+        network_task_timeout: int,
+        authcfg: typing.Optional[str] = None,
+        description: typing.Optional[str] = "AnotherNetworkRequestTask",
+        retry_policy: typing.Optional[network.RetryPolicy] = None,
+        response_handler: typing.Optional[
+            typing.Callable[
+                [typing.List[typing.Optional[network.ParsedNetworkReply]]], typing.Any
+            ]
+        ] = None,
+    ):
+        """A QGIS task to run multiple network requests in parallel.
+
+        The optional `response_handler` is called with the task's response contents
+        once all requests have been performed successfully. It runs on the worker
+        thread, which makes it a good place for expensive post-processing, like
+        deserializing responses and building models out of them. Its return value
+        is made available in the `processed_response` attribute.
+
+        """
+        super().__init__(description)
+        self._initialize_requests(
+            requests_to_perform, network_task_timeout, authcfg, retry_policy
+        )
+        self.response_handler = response_handler
+        self.processed_response = None
+
+    def run(self) -> bool:
+        """Run the QGIS task
+
+        This method is called by the QGIS task manager.
+
+        Implementation uses a custom Qt event loop that waits until
+        all of the HTTP requests have been performed. This is done by waiting on the
+        `self._all_requests_finished` signal to be emitted.
+
+        """
+
+        if len(self.requests_to_perform) == 0:  # there is nothing to do
+            result = False
+        elif self.isCanceled():
+            result = False
+        else:
+            with network.wait_for_signal(
+                self._all_requests_finished,
+                timeout=self._get_batch_timeout(),
+                get_remaining_time=self._get_remaining_batch_time,
+            ) as event_loop_result:
+                self._start_requests()
+            loop_forcibly_ended = not bool(event_loop_result.result)
+            if loop_forcibly_ended:
+                self._time_out_unfinished_requests()
+            self._untrack_replies()
+            self._release_scheduler_slots()
+            if loop_forcibly_ended or self.isCanceled():
+                result = False
+            else:
+                result = self._num_finished >= len(self.requests_to_perform)
+            if result and self.response_handler is not None:
+                self._process_responses()
+        return result
+
+    def _process_responses(self) -> None:
+        try:
+            self.processed_response = self.response_handler(self.response_contents)
+        except Exception as exc:
+            log(f"Could not post-process network responses: {exc}", debug=False)
+            self.processed_response = None
+
+    def cancel(self) -> None:
+        """Cancel the task, aborting any requests that are still in flight"""
+        super().cancel()
+        self._cancel_requests()
+
+    def finished(self, result: bool) -> None:
+        """This method is called by the QGIS task manager when this task is finished"""
+        # This class emits the `task_done` signal in order to have a unified way to
+        # deal with the various types of errors that can arise. The alternative would
+        # have been to rely on the base class' `taskCompleted` and `taskTerminated`
+        # signals
+        self.task_done.emit(self._get_final_result(result))
+
+
+class AsyncNetworkRequestTask(_NetworkRequestsMixin, QtCore.QObject):
+    """Run multiple network requests in parallel, without using a worker thread
+
+    This offers the same interface as `NetworkRequestTask`, but requests are sent by
+    the network access manager of the main thread and completion is driven by its
+    signals, instead of parking a task manager thread in a nested event loop while
+    waiting for replies. Use it for requests whose replies need no further processing
+    in the background.
+
+    Instances must be created in the main thread and are started by calling
+    `start()`. They emit `task_done` once all requests have finished, or once the
+    timeout has been reached. Running instances are kept alive until then, so that
+    their slots in the request scheduler are always given back, even if the object
+    that started them goes away in the meantime.
+
+    """
+
+    _timeout_timer: typing.Optional[QtCore.QTimer]
+    _done: bool
+
+    _all_requests_finished = QtCore.pyqtSignal()
+    task_done = QtCore.pyqtSignal(bool)
+
+    def __init__(
+        self,
+        requests_to_perform: typing.List[network.RequestToPerform],
+        network_task_timeout: int,
+        authcfg: typing.Optional[str] = None,
+        retry_policy: typing.Optional[network.RetryPolicy] = None,
+        parent: typing.Optional[QtCore.QObject] = None,
+    ):
+        super().__init__(parent)
+        self._initialize_requests(
+            requests_to_perform, network_task_timeout, authcfg, retry_policy
+        )
+        self._timeout_timer = None
+        self._done = False
+
+    def start(self) -> None:
+        if len(self.requests_to_perform) == 0:  # there is nothing to do
+            # keep notifying asynchronously, just like when there are requests
+            QtCore.QTimer.singleShot(0, partial(self._finish, False))
+        else:
+            self._all_requests_finished.connect(self._handle_all_requests_finished)
+            self._timeout_timer = QtCore.QTimer(self)
+            self._timeout_timer.setSingleShot(True)
+            self._timeout_timer.timeout.connect(self._handle_timeout)
+            self._timeout_timer.start(self._get_batch_timeout())
+            _running_async_tasks.add(self)
+            self._start_requests()
+
+    def cancel(self) -> None:
+        """Abort any requests that are still in flight"""
+        if not self._done:
+            self._cancel_requests()
+            self._finish(False)
+
+    def _handle_all_requests_finished(self) -> None:
+        self._finish(self._num_finished >= len(self.requests_to_perform))
+
+    def _handle_timeout(self) -> None:
+        remaining_time = self._get_remaining_batch_time()
+        if remaining_time > 0:  # some request is being retried
+            self._timeout_timer.start(remaining_time)
+        else:
+            log("Network requests have not finished in time, giving up...")
+            self._finish(False)
+            self._time_out_unfinished_requests()
+
+    def _finish(self, result: bool) -> None:
+        if not self._done:
+            self._done = True
+            if self._timeout_timer is not None:
+                self._timeout_timer.stop()
+            self._untrack_replies()
+            self._release_scheduler_slots()
+            _running_async_tasks.discard(self)
+            self.task_done.emit(self._get_final_result(result))
+
+
+_running_async_tasks: typing.Set[AsyncNetworkRequestTask] = set()
+
+
+def _get_body_size(parsed: network.ParsedNetworkReply) -> int:
+    if parsed.body_path is not None:
+        result = parsed.body_path.stat().st_size
+    else:
+        result = parsed.response_body.size()
+    return result
+
+
+def _to_milliseconds(seconds: float) -> float:
+    return seconds * 1000
@@ -23,6 +23,10 @@ from ..utils import log, sanitize_layer_name
 from .. import network
 
 
+# the GeoNode GUI also uses a 10 minute timeout for uploads
+UPLOAD_TIMEOUT = 10 * 60 * 1000  # in milliseconds
+
+
 @dataclasses.dataclass()
 class ExportFormat:
     driver_name: str
@@ -197,15 +201,28 @@ class LayerUploaderTask(network_task.NetworkRequestTask):
         authcfg: str,
         network_task_timeout: int,
         description: str = "LayerUploaderTask",
+        upload_timeout: int = UPLOAD_TIMEOUT,
     ):
-        """Task to perform upload of QGIS layers to remote GeoNode servers."""
+        """Task to perform upload of QGIS layers to remote GeoNode servers.
+
+        Uploads can take much longer than other requests, so the upload request gets
+        its own `upload_timeout`, in milliseconds.
+
+        """
         super().__init__(
-            requests_to_perform=[],
+            requests_to_perform=[
+                network.RequestToPerform(
+                    upload_url,
+                    method=network.HttpMethod.POST,
+                    use_cache=False,
+                    operation=network.RequestOperation.UPLOAD,
+                    timeout=upload_timeout,
+                )
+            ],
             authcfg=authcfg,
             description=description,
             network_task_timeout=network_task_timeout,
         )
-        self.response_contents = [None]
         self.layer = layer
         self.allow_public_access = allow_public_access
         self._upload_url = upload_url
@@ -224,7 +241,9 @@ class LayerUploaderTask(network_task.NetworkRequestTask):
             )
             source_path, export_error = self._export_layer_to_temp_dir()
         log(f"source_path: {source_path}")
-        if export_error is None:
+        if self.isCanceled():
+            result = False
+        elif export_error is None:
             sld_path, sld_error = self._export_layer_style()
             log(f"sld_path: {sld_path}")
             if sld_path is None:
@@ -234,7 +253,7 @@ class LayerUploaderTask(network_task.NetworkRequestTask):
                 )
             multipart = self._prepare_multipart(source_path, sld_path=sld_path)
             with network.wait_for_signal(
-                self._all_requests_finished, timeout=self.network_task_timeout
+                self._all_requests_finished, timeout=self._get_batch_timeout()
             ) as event_loop_result:
                 request = QtNetwork.QNetworkRequest(self._upload_url)
                 request.setHeader(
@@ -249,18 +268,19 @@ class LayerUploaderTask(network_task.NetworkRequestTask):
                 else:
                     auth_added = True
                 if auth_added:
+                    self._arm_deadline(0, self.requests_to_perform[0])
                     qt_reply = self._dispatch_request(
                         request, network.HttpMethod.POST, multipart
                     )
                     multipart.setParent(qt_reply)
-                    request_id = qt_reply.property("requestId")
-                    self._pending_replies[request_id] = network.PendingReply(
-                        0, qt_reply, False
-                    )
+                    self._track_reply(0, qt_reply)
                 else:
                     self._all_requests_finished.emit()
             loop_forcibly_ended = not bool(event_loop_result.result)
             if loop_forcibly_ended:
+                self._time_out_unfinished_requests()
+            self._untrack_replies()
+            if loop_forcibly_ended or self.isCanceled():
                 result = False
             else:
                 result = self._num_finished >= len(self.requests_to_perform)
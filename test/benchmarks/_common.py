@@ -0,0 +1,66 @@
+"""Utilities shared by the benchmark scripts
+
+Benchmarks are not collected by pytest. They are meant to be run manually, from the
+repository root, with the same environment used for running the test suite, e.g.:
+
+    python test/benchmarks/benchmark_network_tasks.py --help
+
+"""
+
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+import typing
+from pathlib import Path
+from wsgiref.simple_server import make_server
+
+import qgis.core
+
+TEST_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(TEST_DIR))
+sys.path.insert(0, str(TEST_DIR.parent / "src"))
+
+import _mock_geonode  # noqa: E402
+
+QGIS_PREFIX_PATH = Path(os.getenv("QGIS_PREFIX_PATH", "/usr"))
+MOCK_GEONODE_PORT = 9000
+MOCK_GEONODE_URL = f"http://localhost:{MOCK_GEONODE_PORT}"
+
+
+def _spawn_geonode_server(port: int):
+    with make_server("", port, _mock_geonode.geonode_flask_app) as http_server:
+        http_server.serve_forever()
+
+
+@contextlib.contextmanager
+def mock_geonode_server(port: int = MOCK_GEONODE_PORT) -> typing.Iterator[str]:
+    """Serve the mock GeoNode used by the test suite in a separate process"""
+    process = multiprocessing.Process(target=_spawn_geonode_server, args=(port,))
+    process.start()
+    time.sleep(1)  # give the server a chance to start listening
+    try:
+        yield f"http://localhost:{port}"
+    finally:
+        process.terminate()
+
+
+@contextlib.contextmanager
+def qgis_application() -> typing.Iterator[qgis.core.QgsApplication]:
+    qgis.core.QgsApplication.setPrefixPath(str(QGIS_PREFIX_PATH), True)
+    app = qgis.core.QgsApplication([], False)
+    app.initQgis()
+    try:
+        yield app
+    finally:
+        app.exitQgis()
+
+
+def report(name: str, num_operations: int, elapsed_seconds: float, **extra) -> None:
+    throughput = num_operations / elapsed_seconds if elapsed_seconds else 0
+    details = "".join(f" {key}={value}" for key, value in extra.items())
+    print(
+        f"{name}: {num_operations} operations in {elapsed_seconds:.3f}s "
+        f"({throughput:.1f} ops/s){details}"
+    )
@@ -0,0 +1,89 @@
+"""Measure the time it takes to parse a page of search results, with and without
+interning of CRSs
+
+The page is synthesized out of the datasets served by the mock GeoNode, spreading
+them over a handful of CRSs, as is typical of real catalogs.
+
+"""
+
+import copy
+import json
+import time
+import typing
+import uuid
+
+import qgis.core
+import typer
+
+import _common
+
+from qgis_geonode.apiclient import (
+    geonode_api_v2,
+    models,
+)
+from qgis_geonode.conf import WfsVersion
+
+_SRIDS = ["EPSG:4326", "EPSG:3857", "EPSG:32633", "EPSG:25832", "EPSG:2056"]
+
+
+def _build_page(num_datasets: int) -> typing.Dict:
+    template_path = _common.TEST_DIR / "_mock_geonode_data/layer_list_response1.json"
+    raw_templates = json.loads(template_path.read_text())["datasets"]
+    raw_datasets = []
+    for index in range(num_datasets):
+        raw_dataset = copy.deepcopy(raw_templates[index % len(raw_templates)])
+        raw_dataset.update(
+            pk=index,
+            uuid=str(uuid.uuid4()),
+            link=f"http://localhost/api/v2/resources/{index}",
+            srid=_SRIDS[index % len(_SRIDS)],
+        )
+        raw_datasets.append(raw_dataset)
+    return {
+        "total": num_datasets,
+        "page": 1,
+        "page_size": num_datasets,
+        "datasets": raw_datasets,
+    }
+
+
+def _parse_pages(
+    client: geonode_api_v2.GeoNodeApiClient, page: typing.Dict, repetitions: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        client._build_dataset_list(page)
+    return time.perf_counter() - start
+
+
+def main(num_datasets: int = 100, repetitions: int = 20):
+    with _common.qgis_application():
+        client = geonode_api_v2.GeoNodeApiClient(
+            "http://localhost", num_datasets, WfsVersion.V_1_1_0, 10000
+        )
+        page = _build_page(num_datasets)
+        interned_get_crs = models.get_crs
+        try:
+            models.get_crs = qgis.core.QgsCoordinateReferenceSystem
+            elapsed = _parse_pages(client, page, repetitions)
+        finally:
+            models.get_crs = interned_get_crs
+        _common.report(
+            "parse page without CRS interning",
+            repetitions,
+            elapsed,
+            ms_per_page=round(elapsed * 1000 / repetitions, 2),
+        )
+        models.clear_crs_cache()
+        elapsed = _parse_pages(client, page, repetitions)
+        _common.report(
+            "parse page with CRS interning",
+            repetitions,
+            elapsed,
+            ms_per_page=round(elapsed * 1000 / repetitions, 2),
+            cached_crss=len(models._crs_cache),
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
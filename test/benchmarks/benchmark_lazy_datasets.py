@@ -0,0 +1,100 @@
+"""Compare parse time and memory use of eager and lazy brief datasets
+
+A large number of synthetic datasets is built out of those served by the mock
+GeoNode. Eager datasets have every field parsed upfront, as used to be done for
+search results. Lazy datasets only parse a field when it is accessed, which is
+measured both right after parsing and after reading the fields shown in the search
+results.
+
+"""
+
+import copy
+import gc
+import json
+import time
+import tracemalloc
+import typing
+import uuid
+
+import typer
+
+import _common
+
+from qgis_geonode.apiclient import (
+    geonode_api_v2,
+    models,
+)
+from qgis_geonode.conf import WfsVersion
+
+
+def _build_raw_datasets(num_datasets: int) -> typing.List[typing.Dict]:
+    template_path = _common.TEST_DIR / "_mock_geonode_data/layer_list_response1.json"
+    raw_templates = json.loads(template_path.read_text())["datasets"]
+    raw_datasets = []
+    for index in range(num_datasets):
+        raw_dataset = copy.deepcopy(raw_templates[index % len(raw_templates)])
+        raw_dataset.update(
+            pk=index,
+            uuid=str(uuid.uuid4()),
+            link=f"http://localhost/api/v2/resources/{index}",
+            perms=["view_resourcebase", "download_resourcebase"],
+        )
+        raw_datasets.append(
+            {
+                key: value
+                for key, value in raw_dataset.items()
+                if key in geonode_api_v2.SPARSE_DATASET_FIELDS
+            }
+        )
+    return raw_datasets
+
+
+def _parse(
+    build: typing.Callable[[typing.Dict], models.BriefDataset],
+    raw_datasets: typing.List[typing.Dict],
+    read_fields: typing.Sequence[str],
+) -> typing.Tuple[float, int]:
+    """Parse the datasets, returning elapsed time and memory held by them"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    brief_datasets = [build(raw_dataset) for raw_dataset in raw_datasets]
+    for brief_dataset in brief_datasets:
+        for field_name in read_fields:
+            getattr(brief_dataset, field_name)
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, allocated
+
+
+def main(num_datasets: int = 10000):
+    with _common.qgis_application():
+        client = geonode_api_v2.GeoNodeApiClient(
+            "http://localhost", num_datasets, WfsVersion.V_1_1_0, 10000
+        )
+        raw_datasets = _build_raw_datasets(num_datasets)
+        shown_fields = ("title", "abstract", "dataset_sub_type", "thumbnail_url")
+        scenarios = [
+            (
+                "eager",
+                lambda raw: models.BriefDataset(
+                    **client._get_common_model_properties(raw)
+                ),
+                (),
+            ),
+            ("lazy", client._build_brief_dataset, ()),
+            ("lazy, shown fields read", client._build_brief_dataset, shown_fields),
+        ]
+        for name, build, read_fields in scenarios:
+            elapsed, allocated = _parse(build, raw_datasets, read_fields)
+            _common.report(
+                f"{name} brief datasets",
+                num_datasets,
+                elapsed,
+                allocated_kib=allocated // 1024,
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
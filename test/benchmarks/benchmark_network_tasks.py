@@ -0,0 +1,89 @@
+"""Compare throughput of the threaded and the callback-driven network tasks
+
+Each request is performed by its own task, which mimics the way thumbnails are
+fetched when showing a page of search results.
+
+"""
+
+import time
+import typing
+
+import qgis.core
+import typer
+from qgis.PyQt import QtCore
+
+import _common
+
+from qgis_geonode import network
+from qgis_geonode.tasks import network_task
+
+
+def _get_requests(
+    base_url: str, num_requests: int
+) -> typing.List[network.RequestToPerform]:
+    return [
+        network.RequestToPerform(
+            QtCore.QUrl(f"{base_url}/api/v2/datasets/{index}/"), use_cache=False
+        )
+        for index in range(num_requests)
+    ]
+
+
+def _run_tasks(
+    requests: typing.List[network.RequestToPerform], timeout: int, use_async: bool
+) -> typing.Tuple[float, int, int]:
+    task_manager = qgis.core.QgsApplication.taskManager()
+    loop = QtCore.QEventLoop()
+    outcomes = []
+    max_active_tasks = 0
+
+    def handle_task_done(result: bool):
+        outcomes.append(result)
+        if len(outcomes) == len(requests):
+            loop.quit()
+
+    def sample_active_tasks():
+        nonlocal max_active_tasks
+        max_active_tasks = max(max_active_tasks, task_manager.countActiveTasks())
+
+    sampler = QtCore.QTimer()
+    sampler.timeout.connect(sample_active_tasks)
+    sampler.start(5)
+    tasks = []
+    start = time.perf_counter()
+    for request in requests:
+        if use_async:
+            task = network_task.AsyncNetworkRequestTask([request], timeout)
+            task.task_done.connect(handle_task_done)
+            task.start()
+        else:
+            task = network_task.NetworkRequestTask([request], timeout)
+            task.task_done.connect(handle_task_done)
+            task_manager.addTask(task)
+        tasks.append(task)
+    loop.exec_()
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+    return elapsed, sum(outcomes), max_active_tasks
+
+
+def main(num_requests: int = 200, timeout: int = 10000):
+    with _common.qgis_application(), _common.mock_geonode_server() as base_url:
+        for name, use_async in (
+            ("NetworkRequestTask", False),
+            ("AsyncNetworkRequestTask", True),
+        ):
+            elapsed, num_successful, max_active_tasks = _run_tasks(
+                _get_requests(base_url, num_requests), timeout, use_async
+            )
+            _common.report(
+                name,
+                num_requests,
+                elapsed,
+                successful=num_successful,
+                max_busy_worker_threads=max_active_tasks,
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
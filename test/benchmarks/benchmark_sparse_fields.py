@@ -0,0 +1,96 @@
+"""Compare payload size and parse time of full and sparse dataset list responses
+
+A large page of search results is synthesized out of the datasets served by the mock
+GeoNode. The sparse page holds only the fields that are requested when searching
+with `include[]`/`exclude[]`, as done by the GeoNode API client.
+
+"""
+
+import copy
+import json
+import time
+import typing
+import uuid
+
+import typer
+
+import _common
+
+from qgis_geonode.apiclient import geonode_api_v2
+from qgis_geonode.conf import WfsVersion
+
+
+def _build_page(num_datasets: int, sparse: bool) -> bytes:
+    template_path = _common.TEST_DIR / "_mock_geonode_data/layer_list_response1.json"
+    raw_templates = json.loads(template_path.read_text())["datasets"]
+    raw_datasets = []
+    for index in range(num_datasets):
+        raw_dataset = copy.deepcopy(raw_templates[index % len(raw_templates)])
+        raw_dataset.update(
+            pk=index,
+            uuid=str(uuid.uuid4()),
+            link=f"http://localhost/api/v2/resources/{index}",
+            links=_build_links(index),
+            perms=["view_resourcebase", "download_resourcebase"],
+        )
+        if sparse:
+            raw_dataset = {
+                key: value
+                for key, value in raw_dataset.items()
+                if key in geonode_api_v2.SPARSE_DATASET_FIELDS
+            }
+        raw_datasets.append(raw_dataset)
+    page = {
+        "total": num_datasets,
+        "page": 1,
+        "page_size": num_datasets,
+        "datasets": raw_datasets,
+    }
+    return json.dumps(page).encode()
+
+
+def _build_links(index: int) -> typing.List[typing.Dict]:
+    """Mimic the links that GeoNode returns for each dataset"""
+    link_types = ["OGC:WMS", "OGC:WFS", "image", "data", "metadata", "html"]
+    extensions = ["png", "pdf", "zip", "xml", "csv", "kml", "json", "sld", "gml"]
+    return [
+        {
+            "extension": extension,
+            "link_type": link_type,
+            "name": f"{link_type} {extension} link of dataset {index}",
+            "mime": f"application/{extension}",
+            "url": f"http://localhost/geoserver/ows?layers=geonode:{index}&f={extension}",
+        }
+        for link_type in link_types
+        for extension in extensions
+    ]
+
+
+def _parse_page(
+    client: geonode_api_v2.GeoNodeApiClient, payload: bytes, repetitions: int
+) -> typing.Tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        brief_datasets, _ = client._build_dataset_list(json.loads(payload))
+    return time.perf_counter() - start, len(brief_datasets)
+
+
+def main(num_datasets: int = 500, repetitions: int = 10):
+    with _common.qgis_application():
+        client = geonode_api_v2.GeoNodeApiClient(
+            "http://localhost", num_datasets, WfsVersion.V_1_1_0, 10000
+        )
+        for name, sparse in (("full", False), ("sparse", True)):
+            payload = _build_page(num_datasets, sparse)
+            elapsed, num_parsed = _parse_page(client, payload, repetitions)
+            _common.report(
+                f"{name} dataset list",
+                repetitions,
+                elapsed,
+                payload_bytes=len(payload),
+                datasets_per_page=num_parsed,
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
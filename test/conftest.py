@@ -1,5 +1,7 @@
 import multiprocessing
 import os
+import socket
+import time
 from pathlib import Path
 from wsgiref.simple_server import make_server
 
@@ -44,6 +46,26 @@ def mock_geonode_server():
     process = multiprocessing.Process(target=_spawn_geonode_server)
     print("starting mock GeoNode server...")
     process.start()
+    _wait_for_port(9000)
     yield
     print("terminating mock GeoNode server...")
     process.terminate()
+
+
+@pytest.fixture()
+def unresponsive_server():
+    """Provide the URL of a server that accepts connections but never replies"""
+    with socket.socket() as server_socket:
+        server_socket.bind(("127.0.0.1", 0))
+        server_socket.listen()
+        yield f"http://127.0.0.1:{server_socket.getsockname()[1]}"
+
+
+def _wait_for_port(port: int, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("localhost", port), timeout=1):
+                break
+        except OSError:
+            time.sleep(0.1)
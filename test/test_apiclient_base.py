@@ -0,0 +1,62 @@
+from qgis.PyQt import QtCore
+
+from qgis_geonode import network
+from qgis_geonode.apiclient import base
+from qgis_geonode.tasks import network_task
+
+
+def _record_outcomes(operation: base.ClientOperation):
+    results = []
+    errors = []
+    operation.result_received.connect(results.append)
+    operation.error_received.connect(lambda *args: errors.append(args))
+    return results, errors
+
+
+def test_client_operation_resolves_once():
+    operation = base.ClientOperation("fake operation")
+    results, errors = _record_outcomes(operation)
+    operation.resolve("first")
+    operation.resolve("second")
+    operation.reject("too late")
+    assert operation.done
+    assert operation.result == "first"
+    assert results == ["first"]
+    assert errors == []
+
+
+def test_client_operation_rejects_once():
+    operation = base.ClientOperation("fake operation")
+    results, errors = _record_outcomes(operation)
+    operation.reject("fake error", 404, "Not Found")
+    operation.resolve("too late")
+    assert operation.done
+    assert operation.error_message == "fake error"
+    assert results == []
+    assert errors == [("fake error", 404, "Not Found")]
+
+
+def test_cancelled_client_operation_no_longer_emits(qgis_application):
+    operation = base.ClientOperation("fake operation")
+    results, errors = _record_outcomes(operation)
+    operation.task = network_task.NetworkRequestTask(
+        [network.RequestToPerform(QtCore.QUrl("http://fake.com"))], 1000
+    )
+    handled = []
+    operation.task.task_done.connect(handled.append)
+    assert operation.cancel()
+    # the task is cut off from the handlers of the operation
+    operation.task.task_done.emit(True)
+    operation.resolve("too late")
+    operation.reject("too late")
+    assert operation.done
+    assert handled == []
+    assert results == []
+    assert errors == []
+
+
+def test_client_operation_without_task_cancels_nothing():
+    operation = base.ClientOperation("fake operation")
+    assert not operation.cancel()
+    assert operation.response_contents == []
+    assert operation.processed_response is None
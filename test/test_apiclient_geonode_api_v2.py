@@ -1,20 +1,49 @@
 import datetime as dt
+import gc
+import json
 import typing
 import uuid
+import weakref
 
 import pytest
 
 import qgis.core
 from qgis.PyQt import QtCore
 
+from qgis_geonode import network
 from qgis_geonode.conf import WfsVersion
+from qgis_geonode.dataset_cache import DatasetDetailCache
+from qgis_geonode.style_cache import StyleCache
 from qgis_geonode.apiclient import (
+    base,
     geonode_api_v2,
+    keywords,
     models,
 )
+from qgis_geonode.tasks import network_task
 from qgis_geonode.utils import url_from_geoserver
 
 
+def _get_raw_dataset(**overrides) -> typing.Dict:
+    """Return a dataset, as sent by the remote, with the fields required to build it"""
+    result = {
+        "pk": "1",
+        "uuid": "c22e838f-9503-484e-8769-b5b09a2b6104",
+        "title": "fake title",
+        "thumbnail_url": "fake thumbnail url",
+        "link": "fake link",
+        "detail_url": "fake detail url",
+        "bbox_polygon": {
+            "type": "Polygon",
+            "coordinates": [[[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]]],
+        },
+        "srid": "EPSG:4326",
+        "date_type": "creation",
+    }
+    result.update(overrides)
+    return result
+
+
 @pytest.mark.parametrize(
     "raw_links, link_type, expected",
     [
@@ -261,6 +290,54 @@ def test_apiclient_build_search_filters(
     assert result.toString() == expected
 
 
+def test_apiclient_build_search_filters_uses_exact_known_keywords():
+    client = geonode_api_v2.GeoNodeApiClient(
+        "phony-base-url", 10, wfs_version=WfsVersion.V_1_1_0, network_requests_timeout=0
+    )
+    client.keyword_cache = keywords.KeywordVocabularyCache(ttl=60)
+    client.keyword_cache.store(
+        (client.base_url, client.auth_config),
+        keywords.KeywordVocabulary(keywords.KeywordTrie(["Water", "Waterways"])),
+    )
+    query = client.build_search_query(models.GeonodeApiSearchFilters(keyword="water"))
+    assert query.allQueryItemValues("filter{keywords.name}") == ["Water"]
+    query = client.build_search_query(models.GeonodeApiSearchFilters(keyword="wat"))
+    assert query.allQueryItemValues("filter{keywords.name.icontains}") == ["wat"]
+
+
+def test_apiclient_get_dataset_list_url_requests_sparse_fields():
+    client = geonode_api_v2.GeoNodeApiClient(
+        "http://fake.com",
+        10,
+        wfs_version=WfsVersion.V_1_1_0,
+        network_requests_timeout=0,
+    )
+    query = QtCore.QUrlQuery(
+        client.get_dataset_list_url(models.GeonodeApiSearchFilters())
+    )
+    assert query.allQueryItemValues("exclude[]") == ["*"]
+    assert query.allQueryItemValues("include[]") == list(
+        geonode_api_v2.SPARSE_DATASET_FIELDS
+    )
+
+
+def test_apiclient_get_dataset_list_url_without_sparse_fields(monkeypatch):
+    monkeypatch.setattr(
+        geonode_api_v2, "_sparse_fields_unsupported", {"http://fake.com"}
+    )
+    client = geonode_api_v2.GeoNodeApiClient(
+        "http://fake.com",
+        10,
+        wfs_version=WfsVersion.V_1_1_0,
+        network_requests_timeout=0,
+    )
+    query = QtCore.QUrlQuery(
+        client.get_dataset_list_url(models.GeonodeApiSearchFilters())
+    )
+    assert not query.hasQueryItem("exclude[]")
+    assert not query.hasQueryItem("include[]")
+
+
 @pytest.mark.parametrize(
     "base_url, geoserver_url, expected",
     [
@@ -306,21 +383,17 @@ def test_url_from_geoserver(base_url, geoserver_url, expected):
 
 def test_get_common_model_properties_client():
     dataset_uuid = "c22e838f-9503-484e-8769-b5b09a2b6104"
-    raw_dataset = {
-        "pk": 1,
-        "uuid": dataset_uuid,
-        "alternate": "fake name",
-        "title": "fake title",
-        "raw_abstract": "fake abstract",
-        "thumbnail_url": "fake thumbnail url",
-        "link": "fake link",
-        "detail_url": "fake detail url",
-        "subtype": "vector",
-        "links": [
+    raw_dataset = _get_raw_dataset(
+        pk=1,
+        uuid=dataset_uuid,
+        alternate="fake name",
+        raw_abstract="fake abstract",
+        subtype="vector",
+        links=[
             {"link_type": "OGC:WMS", "url": "fake-wms-url"},
             {"link_type": "OGC:WFS", "url": "fake-wfs-url"},
         ],
-        "bbox_polygon": {
+        bbox_polygon={
             "type": "Polygon",
             "coordinates": [
                 [
@@ -332,15 +405,14 @@ def test_get_common_model_properties_client():
                 ]
             ],
         },
-        "srid": "EPSG:4326",
-        "date_type": "publication",
-        "date": "2021-02-12T23:00:00Z",
-        "temporal_extent_start": "2021-03-02T10:45:22Z",
-        "temporal_extent_end": "2021-03-02T19:45:22Z",
-        "keywords": [{"name": "fake-keyword1"}, {"name": "fake-keyword2"}],
-        "category": {"identifier": "fake-category"},
-        "default_style": {"name": "fake-style-name", "sld_url": "fake-sld-url"},
-    }
+        date_type="publication",
+        date="2021-02-12T23:00:00Z",
+        temporal_extent_start="2021-03-02T10:45:22Z",
+        temporal_extent_end="2021-03-02T19:45:22Z",
+        keywords=[{"name": "fake-keyword1"}, {"name": "fake-keyword2"}],
+        category={"identifier": "fake-category"},
+        default_style={"name": "fake-style-name", "sld_url": "fake-sld-url"},
+    )
     expected = {
         "pk": 1,
         "uuid": uuid.UUID(dataset_uuid),
@@ -372,3 +444,214 @@ def test_get_common_model_properties_client():
     result = client._get_common_model_properties(raw_dataset)
     for k, v in expected.items():
         assert result[k] == v
+
+
+def test_apiclient_get_dataset_details_url():
+    client = geonode_api_v2.GeoNodeApiClient(
+        "http://fake.com",
+        10,
+        wfs_version=WfsVersion.V_1_1_0,
+        network_requests_timeout=0,
+    )
+    query = QtCore.QUrlQuery(client.get_dataset_details_url([3, 1, 2], page=2))
+    assert query.allQueryItemValues("filter{pk.in}") == ["3", "1", "2"]
+    assert query.queryItemValue("page") == "2"
+    assert query.queryItemValue("page_size") == "3"
+
+
+@pytest.mark.parametrize(
+    "page, total, expected_more_pages",
+    [
+        pytest.param(1, 2, False, id="single-page"),
+        pytest.param(1, 5, True, id="first-of-many-pages"),
+        pytest.param(3, 5, False, id="last-page"),
+    ],
+)
+def test_apiclient_parse_dataset_details(page, total, expected_more_pages):
+    raw_dataset = _get_raw_dataset(
+        pk=1, alternate="fake name", subtype="raster", date="2021-02-12T23:00:00Z"
+    )
+    payload = {
+        "page": page,
+        "page_size": 2,
+        "total": total,
+        "datasets": [raw_dataset, {"pk": 2, "title": "incomplete dataset"}],
+    }
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    details, has_more_pages = client.parse_dataset_details(
+        [
+            network.ParsedNetworkReply(
+                http_status_code=200,
+                http_status_reason="OK",
+                qt_error=None,
+                response_body=QtCore.QByteArray(json.dumps(payload).encode()),
+            )
+        ]
+    )[0]
+    assert list(details.datasets) == [1]
+    assert details.datasets[1].title == "fake title"
+    assert list(details.errors) == [2]
+    assert has_more_pages == expected_more_pages
+
+
+@pytest.mark.parametrize(
+    "missing_field",
+    [
+        pytest.param(None, id="complete"),
+        pytest.param("bbox_polygon", id="missing-bbox"),
+        pytest.param("date_type", id="missing-date-type"),
+    ],
+)
+def test_apiclient_build_dataset_list_checks_required_fields(missing_field):
+    raw_dataset = _get_raw_dataset()
+    raw_dataset.pop(missing_field, None)
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    if missing_field is None:
+        brief_datasets, _ = client._build_dataset_list({"datasets": [raw_dataset]})
+        assert brief_datasets[0].pk == 1
+        assert brief_datasets[0].spatial_extent == qgis.core.QgsRectangle(0, 0, 1, 1)
+    else:
+        with pytest.raises(KeyError):
+            client._build_dataset_list({"datasets": [raw_dataset]})
+
+
+def test_apiclient_build_dataset_list_skips_incomplete_datasets():
+    raw_dataset = _get_raw_dataset()
+    incomplete_dataset = {
+        k: v for k, v in raw_dataset.items() if k not in ("pk", "bbox_polygon")
+    }
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    brief_datasets, _ = client._build_dataset_list(
+        {"datasets": [incomplete_dataset, raw_dataset]}
+    )
+    assert [brief_dataset.pk for brief_dataset in brief_datasets] == [1]
+
+
+def test_apiclient_field_parsers_do_not_reference_the_client():
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    client_reference = weakref.ref(client)
+    parsers = client._get_field_parsers()
+    del client
+    gc.collect()
+    assert client_reference() is None
+    assert parsers["permissions"]({"perms": ["download_resourcebase"]}) == [
+        models.GeonodePermission.DOWNLOAD_RESOURCEBASE
+    ]
+
+
+@pytest.mark.parametrize(
+    "malformed_values",
+    [
+        pytest.param({"uuid": "not-a-uuid"}, id="invalid-uuid"),
+        pytest.param({"bbox_polygon": {"coordinates": []}}, id="invalid-bbox"),
+        pytest.param(
+            {"date_type": "publication", "date": "yesterday"}, id="invalid-date"
+        ),
+        pytest.param({"temporal_extent_start": "2021-13-45"}, id="invalid-temporal"),
+        pytest.param({"keywords": ["no-name"]}, id="invalid-keywords"),
+    ],
+)
+def test_apiclient_build_dataset_list_skips_malformed_items(malformed_values):
+    raw_dataset = _get_raw_dataset()
+    malformed_dataset = {**raw_dataset, "pk": "2", **malformed_values}
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    brief_datasets, _ = client._build_dataset_list(
+        {"datasets": [raw_dataset, malformed_dataset]}
+    )
+    assert [brief_dataset.pk for brief_dataset in brief_datasets] == [1]
+    assert brief_datasets[0].published_date is None
+
+
+@pytest.mark.parametrize(
+    "revalidate, expected_etag",
+    [
+        pytest.param(True, '"abc"', id="revalidate"),
+        pytest.param(False, None, id="fetch-whole-style"),
+    ],
+)
+def test_apiclient_create_style_request(tmp_path, revalidate, expected_etag):
+    sld_url = "http://fake.com/styles/fake.sld"
+    client = geonode_api_v2.GeoNodeApiClient("fake-base-url", 10, WfsVersion.V_1_1_0, 0)
+    client.style_cache = StyleCache(tmp_path / "style_cache.sqlite")
+    client.style_cache.store(sld_url, None, '"abc"', "<NamedLayer/>")
+    request = client._create_style_request(sld_url, revalidate=revalidate)
+    assert request.etag == expected_etag
+
+
+_VECTOR_DATASET = _get_raw_dataset(
+    subtype="vector",
+    default_style={
+        "name": "fake-style-name",
+        "sld_url": "http://fake.com/styles/fake.sld",
+    },
+)
+
+
+def _get_client_with_temporary_caches(tmp_path) -> geonode_api_v2.GeoNodeApiClient:
+    client = geonode_api_v2.GeoNodeApiClient(
+        "http://fake.com", 10, WfsVersion.V_1_1_0, 1000
+    )
+    client.dataset_cache = DatasetDetailCache(tmp_path / "dataset_cache.sqlite", 60)
+    client.style_cache = StyleCache(tmp_path / "style_cache.sqlite")
+    return client
+
+
+def test_apiclient_requests_dataset_detail_and_style_together(
+    qgis_application, tmp_path
+):
+    client = _get_client_with_temporary_caches(tmp_path)
+    brief_dataset = client._build_brief_dataset(_VECTOR_DATASET)
+    operation = client.get_dataset_detail(
+        brief_dataset, get_style_too=True, authenticated=True
+    )
+    operation.cancel()
+    requests_to_perform = operation.task.requests_to_perform
+    assert [request.operation for request in requests_to_perform] == [
+        network.RequestOperation.DETAIL,
+        network.RequestOperation.STYLE,
+    ]
+    assert requests_to_perform[1].url == QtCore.QUrl(
+        _VECTOR_DATASET["default_style"]["sld_url"]
+    )
+
+
+def test_apiclient_yields_dataset_detail_when_its_style_fails(
+    qgis_application, tmp_path
+):
+    client = _get_client_with_temporary_caches(tmp_path)
+    task = network_task.NetworkRequestTask(
+        [
+            network.RequestToPerform(client.get_dataset_detail_url(1)),
+            client._create_style_request(_VECTOR_DATASET["default_style"]["sld_url"]),
+        ],
+        1000,
+    )
+    task.response_contents = [
+        network.ParsedNetworkReply(
+            http_status_code=200,
+            http_status_reason="OK",
+            qt_error=None,
+            response_body=QtCore.QByteArray(
+                json.dumps({"dataset": _VECTOR_DATASET}).encode()
+            ),
+        ),
+        network.ParsedNetworkReply(
+            http_status_code=404,
+            http_status_reason="Not Found",
+            qt_error="ContentNotFoundError",
+            response_body=QtCore.QByteArray(),
+        ),
+    ]
+    operation = base.ClientOperation("Get dataset detail")
+    operation.task = task
+    results = []
+    errors = []
+    operation.result_received.connect(results.append)
+    operation.error_received.connect(lambda *args: errors.append(args))
+    client.handle_dataset_detail(
+        operation, False, get_style_too=True, authenticated=True
+    )
+    assert errors == []
+    assert len(results) == 1
+    assert results[0].pk == 1
+    assert results[0].default_style.sld is None
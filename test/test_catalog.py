@@ -0,0 +1,205 @@
+import pytest
+from qgis.core import QgsRectangle
+
+from qgis_geonode import catalog
+from qgis_geonode.apiclient import models
+
+
+def _get_bbox_polygon(min_x: float, min_y: float, max_x: float, max_y: float):
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [min_x, min_y],
+                [min_x, max_y],
+                [max_x, max_y],
+                [max_x, min_y],
+                [min_x, min_y],
+            ]
+        ],
+    }
+
+
+def _get_raw_dataset(pk: int, title: str, **kwargs):
+    raw_dataset = {
+        "pk": pk,
+        "title": title,
+        "abstract": "",
+        "keywords": [],
+        "subtype": "vector",
+        "srid": "EPSG:4326",
+        "bbox_polygon": _get_bbox_polygon(pk * 10, 0, pk * 10 + 5, 5),
+        "last_updated": f"2022-01-{pk:02d}T00:00:00Z",
+    }
+    raw_dataset.update(kwargs)
+    return raw_dataset
+
+
+@pytest.fixture
+def local_catalog(tmp_path):
+    result = catalog.LocalCatalog(tmp_path / "catalog.sqlite")
+    result.store(
+        [
+            _get_raw_dataset(1, "Rivers of Portugal"),
+            _get_raw_dataset(2, "Roads", keywords=[{"name": "transport"}]),
+            _get_raw_dataset(3, "Elevation", subtype="raster", abstract="river basins"),
+        ]
+    )
+    return result
+
+
+@pytest.mark.parametrize(
+    "search_filters, expected",
+    [
+        pytest.param(models.GeonodeApiSearchFilters(), [3, 2, 1], id="no-filters"),
+        pytest.param(
+            models.GeonodeApiSearchFilters(title="river"), [1], id="title-prefix"
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(abstract="river"), [3], id="abstract"
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(keyword="transp"), [2], id="keyword"
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(title="rivers portugal"),
+            [1],
+            id="all-words",
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(
+                layer_types=[models.GeonodeResourceType.RASTER_LAYER]
+            ),
+            [3],
+            id="layer-type",
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(ordering_field="title"),
+            [3, 1, 2],
+            id="ordered-by-title",
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(spatial_extent=QgsRectangle(12, 1, 22, 2)),
+            [2, 1],
+            id="intersecting-extent",
+        ),
+        pytest.param(
+            models.GeonodeApiSearchFilters(spatial_extent=QgsRectangle(16, 1, 19, 2)),
+            [],
+            id="disjoint-extent",
+        ),
+    ],
+)
+def test_local_catalog_search(local_catalog, search_filters, expected):
+    raw_datasets, total = local_catalog.search(search_filters, page_size=10)
+    assert [raw["pk"] for raw in raw_datasets] == expected
+    assert total == len(expected)
+
+
+def test_local_catalog_search_is_paginated(local_catalog):
+    raw_datasets, total = local_catalog.search(
+        models.GeonodeApiSearchFilters(page=2), page_size=2
+    )
+    assert [raw["pk"] for raw in raw_datasets] == [1]
+    assert total == 3
+
+
+def test_local_catalog_replaces_updated_datasets(local_catalog):
+    newest = local_catalog.store(
+        [
+            _get_raw_dataset(20, "Lakes"),
+            {
+                **_get_raw_dataset(1, "Lakes and lagoons"),
+                "last_updated": "2022-02-01T00:00:00Z",
+            },
+        ]
+    )
+    assert newest == "2022-02-01T00:00:00Z"
+    raw_datasets, total = local_catalog.search(
+        models.GeonodeApiSearchFilters(title="lakes"), page_size=10
+    )
+    assert sorted(raw["pk"] for raw in raw_datasets) == [1, 20]
+    assert local_catalog.search(
+        models.GeonodeApiSearchFilters(title="rivers"), page_size=10
+    ) == ([], 0)
+    assert local_catalog.count() == 4
+
+
+def test_local_catalog_sync_watermark(local_catalog):
+    assert not local_catalog.is_synced
+    local_catalog.set_sync_watermark("2022-01-03T00:00:00Z")
+    assert local_catalog.sync_watermark == "2022-01-03T00:00:00Z"
+    local_catalog.clear()
+    assert local_catalog.sync_watermark is None
+    assert local_catalog.count() == 0
+
+
+def test_local_catalog_reconcile_drops_missing_datasets(local_catalog):
+    assert local_catalog.needs_reconciliation
+    # dataset 2 has been deleted, or is no longer visible, since the last harvest
+    assert local_catalog.reconcile([1, 3]) == 1
+    assert not local_catalog.needs_reconciliation
+    assert local_catalog.count() == 2
+    assert local_catalog.search(
+        models.GeonodeApiSearchFilters(keyword="transport"), page_size=10
+    ) == ([], 0)
+    raw_datasets, _ = local_catalog.search(
+        models.GeonodeApiSearchFilters(spatial_extent=QgsRectangle(20, 0, 25, 5)),
+        page_size=10,
+    )
+    assert [raw["pk"] for raw in raw_datasets] == []
+
+
+def test_local_catalog_needs_reconciliation_after_interval(tmp_path):
+    local_catalog = catalog.LocalCatalog(
+        tmp_path / "catalog.sqlite", reconciliation_interval=-1
+    )
+    local_catalog.reconcile([])
+    assert local_catalog.needs_reconciliation
+
+
+def test_local_catalog_is_emptied_when_credentials_change(local_catalog):
+    local_catalog.use_auth_config("first")
+    local_catalog.store([_get_raw_dataset(1, "Rivers")])
+    local_catalog.set_sync_watermark("2022-01-01T00:00:00Z")
+    local_catalog.use_auth_config("first")
+    assert local_catalog.count() == 1
+    assert local_catalog.is_synced
+    local_catalog.use_auth_config("second")
+    assert local_catalog.count() == 0
+    assert not local_catalog.is_synced
+    local_catalog.store([_get_raw_dataset(2, "Roads")])
+    local_catalog.use_auth_config("second")
+    assert local_catalog.count() == 1
+
+
+def test_local_catalog_indexes_geographic_extents(tmp_path):
+    local_catalog = catalog.LocalCatalog(tmp_path / "catalog.sqlite")
+    local_catalog.store(
+        [
+            _get_raw_dataset(
+                1,
+                "Projected",
+                srid="EPSG:3857",
+                bbox_polygon=_get_bbox_polygon(1e6, 1e6, 2e6, 2e6),
+                ll_bbox_polygon=_get_bbox_polygon(9, 9, 18, 18),
+            ),
+            _get_raw_dataset(
+                2,
+                "Projected without geographic extent",
+                srid="EPSG:3857",
+                bbox_polygon=_get_bbox_polygon(1e6, 1e6, 2e6, 2e6),
+            ),
+        ]
+    )
+    raw_datasets, total = local_catalog.search(
+        models.GeonodeApiSearchFilters(spatial_extent=QgsRectangle(10, 10, 11, 11)),
+        page_size=10,
+    )
+    # the extent of the second dataset is unknown, so it cannot be ruled out
+    assert [raw["pk"] for raw in raw_datasets] == [2, 1]
+    raw_datasets, total = local_catalog.search(
+        models.GeonodeApiSearchFilters(spatial_extent=QgsRectangle(50, 50, 51, 51)),
+        page_size=10,
+    )
+    assert [raw["pk"] for raw in raw_datasets] == [2]
@@ -0,0 +1,125 @@
+import time
+import uuid
+
+import pytest
+from qgis.core import QgsRectangle
+
+from qgis_geonode import dataset_cache
+from qgis_geonode.apiclient import models
+
+
+def _build_dataset(pk: int, title: str = "fake title") -> models.Dataset:
+    return models.Dataset(
+        pk=pk,
+        uuid=uuid.UUID("0ac5b5b4-a2c6-4d3c-a1b4-4e0a6e4f2a51"),
+        name=f"geonode:dataset{pk}",
+        dataset_sub_type=models.GeonodeResourceType.VECTOR_LAYER,
+        title=title,
+        abstract="",
+        published_date=None,
+        spatial_extent=QgsRectangle(0, 0, 1, 1),
+        temporal_extent=None,
+        srid=models.get_crs("EPSG:4326"),
+        thumbnail_url="",
+        link="",
+        detail_url="",
+        keywords=[],
+        category=None,
+        service_urls={},
+        default_style=models.BriefGeonodeStyle(name="", sld_url=""),
+        permissions=[models.GeonodePermission.VIEW_RESOURCEBASE],
+        language="eng",
+        license="",
+        constraints="",
+        owner={},
+        metadata_author={},
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return dataset_cache.DatasetDetailCache(tmp_path / "cache.sqlite", ttl=60)
+
+
+def test_dataset_cache_is_keyed_by_connection(cache):
+    cache.store("http://a.com", "abc", _build_dataset(1), "2022-01-01T00:00:00Z")
+    cached = cache.get("http://a.com", "abc", 1)
+    assert cached.title == "fake title"
+    assert cached.permissions == [models.GeonodePermission.VIEW_RESOURCEBASE]
+    assert cache.get("http://a.com", None, 1) is None
+    assert cache.get("http://b.com", "abc", 1) is None
+
+
+def test_dataset_cache_expires_datasets(cache):
+    cache.store("http://a.com", None, _build_dataset(1), None)
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get("http://a.com", None, 1) is None
+
+
+def test_dataset_cache_invalidates_modified_datasets(cache):
+    cache.store("http://a.com", None, _build_dataset(1), "2022-01-01T00:00:00Z")
+    cache.store("http://a.com", None, _build_dataset(2), "2022-01-01T00:00:00Z")
+    cache.store("http://a.com", None, _build_dataset(3), None)
+    cache.store("http://a.com", None, _build_dataset(4), "2022-03-01T00:00:00Z")
+    cache.store("http://a.com", "abc", _build_dataset(2), "2022-01-01T00:00:00Z")
+    dropped = cache.invalidate_modified(
+        "http://a.com",
+        None,
+        {
+            1: "2022-01-01T00:00:00Z",
+            2: "2022-02-01T00:00:00Z",
+            3: "2022-01-01T00:00:00Z",
+            # reported by an outdated response
+            4: "2022-02-01T00:00:00Z",
+        },
+    )
+    assert dropped == 2
+    assert cache.get("http://a.com", None, 1) is not None
+    assert cache.get("http://a.com", None, 2) is None
+    assert cache.get("http://a.com", None, 3) is None
+    assert cache.get("http://a.com", None, 4) is not None
+    # datasets retrieved with other credentials are left alone
+    assert cache.get("http://a.com", "abc", 2) is not None
+
+
+def test_dataset_cache_invalidates_single_dataset(cache):
+    cache.store("http://a.com", None, _build_dataset(1), "2022-01-01T00:00:00Z")
+    cache.store("http://a.com", None, _build_dataset(2), "2022-01-01T00:00:00Z")
+    cache.invalidate("http://a.com", None, 1)
+    assert cache.get("http://a.com", None, 1) is None
+    assert cache.get("http://a.com", None, 2) is not None
+
+
+def test_dataset_cache_compares_timestamps_regardless_of_format(cache):
+    cache.store("http://a.com", None, _build_dataset(1), "2022-01-01T00:00:00.123Z")
+    cache.store("http://a.com", None, _build_dataset(2), "2022-01-01T00:00:00Z")
+    dropped = cache.invalidate_modified(
+        "http://a.com",
+        None,
+        {
+            # earlier than the cached value, despite sorting after it as a string
+            1: "2022-01-01T00:00:00Z",
+            2: "2022-01-01T00:00:00.500000+00:00",
+        },
+    )
+    assert dropped == 1
+    assert cache.get("http://a.com", None, 1) is not None
+    assert cache.get("http://a.com", None, 2) is None
+
+
+def test_dataset_cache_purges_expired_and_oldest_datasets(tmp_path):
+    cache = dataset_cache.DatasetDetailCache(
+        tmp_path / "cache.sqlite", ttl=60, max_entries=2
+    )
+    for pk in range(1, 4):
+        cache.store("http://a.com", None, _build_dataset(pk), None)
+        time.sleep(0.01)
+    assert cache.get("http://a.com", None, 1) is None
+    assert cache.get("http://a.com", None, 3) is not None
+    time.sleep(0.2)
+    cache.ttl = 0.1
+    cache.store("http://a.com", None, _build_dataset(4), None)
+    with cache._connect() as connection:
+        num_rows = connection.execute("SELECT COUNT(*) FROM dataset").fetchone()[0]
+    assert num_rows == 1
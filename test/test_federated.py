@@ -0,0 +1,40 @@
+import types
+
+from qgis_geonode.apiclient import (
+    federated,
+    models,
+)
+
+
+def _build_brief_dataset(pk: int, title: str) -> models.BriefDataset:
+    raw_dataset = {"pk": pk, "title": title}
+    return models.BriefDataset.from_raw(
+        raw_dataset, {name: lambda raw, n=name: raw.get(n) for name in ("pk", "title")}
+    )
+
+
+def test_federated_search_merges_results_in_a_stable_order():
+    first = types.SimpleNamespace(id="1", name="First")
+    second = types.SimpleNamespace(id="2", name="Second")
+    federated_search = federated.FederatedSearch([])
+    federated_search.connections = [first, second]
+    outcomes = []
+    federated_search.server_finished.connect(outcomes.append)
+    pagination_info = models.GeonodePaginationInfo(2, 1, 10)
+    federated_search._handle_server_results(
+        second,
+        None,
+        ([_build_brief_dataset(1, "b"), _build_brief_dataset(2, "A")], pagination_info),
+    )
+    assert not federated_search.is_finished
+    federated_search._handle_server_results(
+        first,
+        None,
+        ([_build_brief_dataset(3, "b"), _build_brief_dataset(4, "c")], pagination_info),
+    )
+    assert federated_search.is_finished
+    assert [
+        (r.connection_settings.name, r.brief_dataset.pk)
+        for r in federated_search.results
+    ] == [("Second", 2), ("First", 3), ("Second", 1), ("First", 4)]
+    assert [o.connection_settings.name for o in outcomes] == ["Second", "First"]
@@ -0,0 +1,56 @@
+import time
+
+from qgis_geonode import http_cache
+
+
+def _get_response(url: str, size: int) -> http_cache.CachedResponse:
+    return http_cache.CachedResponse(
+        url=url,
+        etag=f'"{url}"',
+        last_modified=None,
+        http_status_code=200,
+        http_status_reason="OK",
+        body=b"x" * size,
+    )
+
+
+def test_http_cache_is_keyed_by_auth_config(tmp_path):
+    cache = http_cache.HttpResponseCache(tmp_path / "cache.sqlite", max_size=100)
+    cache.store(_get_response("http://fake.com/1", 10), auth_config="abc")
+    assert cache.get("http://fake.com/1", auth_config="abc") is not None
+    assert cache.get("http://fake.com/1") is None
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path):
+    cache = http_cache.HttpResponseCache(tmp_path / "cache.sqlite", max_size=25)
+    cache.store(_get_response("http://fake.com/1", 10))
+    cache.store(_get_response("http://fake.com/2", 10))
+    cache.record_hit("http://fake.com/1")
+    cache.store(_get_response("http://fake.com/3", 10))
+    assert cache.get("http://fake.com/1") is not None
+    assert cache.get("http://fake.com/2") is None
+    assert cache.get("http://fake.com/3") is not None
+    assert cache.stats.hits == 1
+    assert cache.stats.evictions == 1
+
+
+def test_http_cache_lookups_refresh_recency(tmp_path):
+    cache = http_cache.HttpResponseCache(tmp_path / "cache.sqlite", max_size=25)
+    cache.store(_get_response("http://fake.com/1", 10))
+    time.sleep(0.01)
+    cache.store(_get_response("http://fake.com/2", 10))
+    time.sleep(0.01)
+    assert cache.get("http://fake.com/1") is not None
+    cache.store(_get_response("http://fake.com/3", 10))
+    assert cache.get("http://fake.com/1") is not None
+    assert cache.get("http://fake.com/2") is None
+
+
+def test_http_cache_counts_lookups_that_find_nothing_as_misses(tmp_path):
+    cache = http_cache.HttpResponseCache(tmp_path / "cache.sqlite", max_size=100)
+    assert cache.get("http://fake.com/1") is None
+    cache.store(_get_response("http://fake.com/1", 10))
+    assert cache.get("http://fake.com/1") is not None
+    assert cache.get("http://fake.com/2") is None
+    assert cache.stats.misses == 2
+    assert cache.stats.hits == 0
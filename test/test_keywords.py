@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from qgis_geonode.apiclient import keywords
+
+
+@pytest.mark.parametrize(
+    "prefix, limit, expected",
+    [
+        pytest.param("", None, ["Roads", "water", "Water", "Waterways"], id="all"),
+        pytest.param("wat", None, ["water", "Water", "Waterways"], id="prefix"),
+        pytest.param("WATERW", None, ["Waterways"], id="case-insensitive"),
+        pytest.param("wat", 2, ["water", "Water"], id="limited"),
+        pytest.param("lakes", None, [], id="unknown"),
+    ],
+)
+def test_keyword_trie_complete(prefix, limit, expected):
+    trie = keywords.KeywordTrie(["water", "Waterways", "Roads", "Water", "Roads"])
+    assert len(trie) == 4
+    assert trie.complete(prefix, limit=limit) == expected
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [
+        pytest.param("Waterways", "Waterways", id="exact"),
+        pytest.param("waterWAYS", "Waterways", id="case-insensitive"),
+        pytest.param("Waterway", None, id="prefix-only"),
+    ],
+)
+def test_keyword_trie_get(keyword, expected):
+    trie = keywords.KeywordTrie(["Waterways", "Roads"])
+    assert trie.get(keyword) == expected
+
+
+def test_keyword_vocabulary_cache_expires_vocabularies():
+    cache = keywords.KeywordVocabularyCache(ttl=60)
+    fresh_key = ("http://a.com", "")
+    expired_key = ("http://b.com", "")
+    cache.store(fresh_key, keywords.KeywordVocabulary(keywords.KeywordTrie(["a"])))
+    expired = keywords.KeywordVocabulary(keywords.KeywordTrie(["b"]))
+    expired.fetched_at = time.monotonic() - 61
+    cache.store(expired_key, expired)
+    assert cache.get(fresh_key).keywords.get("a") == "a"
+    assert cache.get(expired_key) is None
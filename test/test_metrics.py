@@ -0,0 +1,85 @@
+import csv
+import datetime as dt
+import json
+
+import pytest
+
+from qgis_geonode import metrics, network
+
+
+def _build_timing(
+    total_time: float,
+    operation: network.RequestOperation = network.RequestOperation.SEARCH,
+    outcome: metrics.RequestOutcome = metrics.RequestOutcome.SUCCESS,
+    cache_status: metrics.CacheStatus = metrics.CacheStatus.MISS,
+) -> metrics.RequestTiming:
+    return metrics.RequestTiming(
+        url="http://fake.geonode/api/v2/datasets/",
+        method="GET",
+        operation=operation,
+        outcome=outcome,
+        cache_status=cache_status,
+        finished_at=dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc),
+        http_status_code=200,
+        bytes_received=10,
+        total_time=total_time,
+    )
+
+
+@pytest.mark.parametrize(
+    "rank, expected",
+    [
+        pytest.param(50, 50),
+        pytest.param(90, 90),
+        pytest.param(99, 99),
+        pytest.param(100, 100),
+        pytest.param(0, 1),
+    ],
+)
+def test_percentile(rank, expected):
+    assert metrics.percentile(range(100, 0, -1), rank) == expected
+
+
+def test_request_metrics_keeps_most_recent_timings():
+    request_metrics = metrics.RequestMetrics(capacity=3)
+    for total_time in range(5):
+        request_metrics.record(_build_timing(total_time))
+    assert [t.total_time for t in request_metrics.timings()] == [2, 3, 4]
+
+
+def test_request_metrics_summarize():
+    request_metrics = metrics.RequestMetrics()
+    request_metrics.record(_build_timing(10))
+    request_metrics.record(_build_timing(30, outcome=metrics.RequestOutcome.TIMED_OUT))
+    request_metrics.record(
+        _build_timing(20, cache_status=metrics.CacheStatus.REVALIDATED)
+    )
+    request_metrics.record(
+        _build_timing(5, operation=network.RequestOperation.THUMBNAIL)
+    )
+    search_summary, thumbnail_summary = request_metrics.summarize()
+    assert search_summary.operation == network.RequestOperation.SEARCH
+    assert search_summary.num_requests == 3
+    assert search_summary.num_timeouts == 1
+    assert search_summary.num_cache_hits == 1
+    assert search_summary.bytes_received == 30
+    assert search_summary.total_time == {50: 20, 90: 30, 99: 30}
+    assert search_summary.queue_wait == {}
+    assert thumbnail_summary.num_requests == 1
+
+
+def test_request_metrics_export(tmp_path):
+    request_metrics = metrics.RequestMetrics()
+    request_metrics.record(_build_timing(10))
+    json_path = tmp_path / "metrics.json"
+    request_metrics.export_json(json_path)
+    exported = json.loads(json_path.read_text())
+    assert exported["requests"][0]["operation"] == "search"
+    assert exported["summary"][0]["num_requests"] == 1
+    assert "retries" in exported
+    csv_path = tmp_path / "metrics.csv"
+    request_metrics.export_csv(csv_path)
+    with csv_path.open() as fh:
+        rows = list(csv.DictReader(fh))
+    assert rows[0]["cache_status"] == "miss"
+    assert rows[0]["total_time"] == "10"
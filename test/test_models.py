@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+import qgis.core
+
+from qgis_geonode.apiclient import models
+
+
+def test_get_crs_parses_each_definition_once():
+    models.clear_crs_cache()
+    first = models.get_crs("EPSG:4326")
+    second = models.get_crs("EPSG:4326")
+    assert first == qgis.core.QgsCoordinateReferenceSystem("EPSG:4326")
+    assert first == second
+    assert list(models._crs_cache) == ["EPSG:4326"]
+
+
+def test_get_crs_from_several_threads():
+    models.clear_crs_cache()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(models.get_crs("EPSG:3857")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8
+    assert all(crs.authid() == "EPSG:3857" for crs in results)
+    assert list(models._crs_cache) == ["EPSG:3857"]
+
+
+def test_brief_dataset_parses_fields_on_first_access():
+    parsed_fields = []
+
+    def parse(field_name):
+        def parser(raw):
+            parsed_fields.append(field_name)
+            return raw.get(field_name)
+
+        return parser
+
+    field_parsers = {name: parse(name) for name in models.BriefDataset._FIELDS}
+    brief_dataset = models.BriefDataset.from_raw(
+        {"pk": 1, "title": "fake title"}, field_parsers
+    )
+    assert parsed_fields == []
+    assert brief_dataset.title == "fake title"
+    assert brief_dataset.title == "fake title"
+    assert parsed_fields == ["title"]
+    brief_dataset.title = "another title"
+    assert brief_dataset.title == "another title"
+    assert not hasattr(brief_dataset, "__dict__")
+
+
+def test_brief_dataset_requires_every_field():
+    with pytest.raises(TypeError):
+        models.BriefDataset(pk=1, title="fake title")
@@ -0,0 +1,225 @@
+import pytest
+import qgis.core
+from qgis.PyQt import (
+    QtCore,
+    QtNetwork,
+)
+
+from qgis_geonode import network
+
+
+@pytest.mark.parametrize(
+    "method, http_status_code, attempt, expected",
+    [
+        pytest.param(network.HttpMethod.GET, 503, 1, True),
+        pytest.param(network.HttpMethod.PUT, 429, 2, True),
+        pytest.param(network.HttpMethod.GET, 503, 3, False),
+        pytest.param(network.HttpMethod.POST, 503, 1, False),
+        pytest.param(network.HttpMethod.GET, 404, 1, False),
+        pytest.param(network.HttpMethod.GET, None, 1, False),
+    ],
+)
+def test_retry_policy_should_retry(method, http_status_code, attempt, expected):
+    policy = network.RetryPolicy(max_attempts=3)
+    assert policy.should_retry(method, http_status_code, attempt) == expected
+
+
+@pytest.mark.parametrize(
+    "attempt, retry_after, minimum, maximum",
+    [
+        pytest.param(1, None, 0, 500),
+        pytest.param(3, None, 0, 2000),
+        pytest.param(10, None, 0, 8000),
+        pytest.param(1, 3000, 3000, 3000),
+    ],
+)
+def test_retry_policy_get_delay(attempt, retry_after, minimum, maximum):
+    policy = network.RetryPolicy(base_delay=500, max_delay=8000)
+    assert minimum <= policy.get_delay(attempt, retry_after) <= maximum
+
+
+def test_parsed_network_reply_body_view_of_streamed_response(tmp_path):
+    body_path = tmp_path / "body"
+    body_path.write_bytes(b"<sld/>")
+    parsed = network.ParsedNetworkReply(
+        http_status_code=200,
+        http_status_reason="OK",
+        qt_error=None,
+        response_body=QtCore.QByteArray(),
+        body_path=body_path,
+    )
+    with parsed.body_view() as view:
+        assert view[:] == b"<sld/>"
+    parsed.release_body()
+    assert not body_path.exists()
+    assert parsed.body_path is None
+
+
+@pytest.mark.parametrize(
+    "first_etag, second_etag, expected",
+    [
+        pytest.param(None, None, True, id="unconditional"),
+        pytest.param('"1"', '"1"', True, id="same-etag"),
+        pytest.param('"1"', None, False, id="conditional-and-unconditional"),
+        pytest.param('"1"', '"2"', False, id="different-etags"),
+    ],
+)
+def test_get_coalescing_key_accounts_for_etag(first_etag, second_etag, expected):
+    url = QtCore.QUrl("http://fake.com/api/v2/datasets/1/")
+    first = network.RequestToPerform(url, etag=first_etag)
+    second = network.RequestToPerform(url, etag=second_etag)
+    result = network.get_coalescing_key(first, None) == network.get_coalescing_key(
+        second, None
+    )
+    assert result == expected
+
+
+def test_request_coalescer_hands_abandoned_request_over_to_follower():
+    coalescer = network.RequestCoalescer()
+    key = ("", "http://fake.com/thumbnail.png", "")
+    replies = []
+    take_overs = []
+    assert not coalescer.attach(key, replies.append)
+    assert coalescer.attach(
+        key, replies.append, take_over=lambda: take_overs.append("first") or True
+    )
+    assert coalescer.attach(
+        key, replies.append, take_over=lambda: take_overs.append("second") or True
+    )
+    # the owner is cancelled while others are waiting for its request
+    assert coalescer.abandon(key)
+    assert take_overs == ["first"]
+    assert replies == []
+    parsed = network.ParsedNetworkReply(
+        http_status_code=200,
+        http_status_reason="OK",
+        qt_error=None,
+        response_body=QtCore.QByteArray(b"png"),
+    )
+    coalescer.resolve(key, parsed)
+    assert len(replies) == 1
+    assert replies[0].response_body == parsed.response_body
+    assert not coalescer.attach(key, replies.append)
+
+
+def test_request_coalescer_abandon_without_willing_followers():
+    coalescer = network.RequestCoalescer()
+    key = ("", "http://fake.com/thumbnail.png", "")
+    replies = []
+    assert not coalescer.abandon(key)
+    assert not coalescer.attach(key, replies.append)
+    assert coalescer.attach(key, replies.append, take_over=lambda: False)
+    assert not coalescer.abandon(key)
+    assert replies == [None]
+    assert not coalescer.attach(key, replies.append)
+
+
+class _FakeNetworkAccessManager(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)
+    requestTimedOut = QtCore.pyqtSignal(object)
+
+
+class _FakeRequest:
+    """Stands for both the reply contents and the request parameters of QGIS"""
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+
+    def requestId(self) -> int:
+        return self.request_id
+
+
+def _register_recording_route(router, manager, request_id, calls):
+    router.register(
+        manager,
+        request_id,
+        lambda reply: calls.append(("finished", request_id, reply.requestId())),
+        lambda params: calls.append(("timed out", request_id, params.requestId())),
+    )
+
+
+def test_reply_router_routes_replies_to_their_owners():
+    router = network.ReplyRouter()
+    manager = _FakeNetworkAccessManager()
+    calls = []
+    for request_id in (1, 2, 3):
+        _register_recording_route(router, manager, request_id, calls)
+    for request_id in (2, 4, 3, 1):
+        manager.finished.emit(_FakeRequest(request_id))
+    assert calls == [
+        ("finished", 2, 2),
+        ("finished", 3, 3),
+        ("finished", 1, 1),
+    ]
+    assert len(router) == 0
+
+
+def test_reply_router_ignores_late_replies():
+    router = network.ReplyRouter()
+    manager = _FakeNetworkAccessManager()
+    calls = []
+    _register_recording_route(router, manager, 1, calls)
+    _register_recording_route(router, manager, 2, calls)
+    # the owner of the first request gave up on it
+    router.unregister(1)
+    manager.finished.emit(_FakeRequest(1))
+    manager.finished.emit(_FakeRequest(2))
+    # the route is gone once its request has finished
+    manager.finished.emit(_FakeRequest(2))
+    assert calls == [("finished", 2, 2)]
+
+
+def test_reply_router_routes_aborted_replies_once():
+    router = network.ReplyRouter()
+    manager = _FakeNetworkAccessManager()
+    calls = []
+    _register_recording_route(router, manager, 1, calls)
+    manager.requestTimedOut.emit(_FakeRequest(1))
+    # the network access manager still reports the aborted request as finished
+    manager.finished.emit(_FakeRequest(1))
+    manager.finished.emit(_FakeRequest(1))
+    assert calls == [("timed out", 1, 1), ("finished", 1, 1)]
+    assert len(router) == 0
+
+
+def test_reply_router_listens_to_each_manager_once():
+    router = network.ReplyRouter()
+    manager = _FakeNetworkAccessManager()
+    calls = []
+    _register_recording_route(router, manager, 1, calls)
+    _register_recording_route(router, manager, 2, calls)
+    manager.finished.emit(_FakeRequest(1))
+    assert calls == [("finished", 1, 1)]
+
+
+class _RecordingDevice(QtCore.QBuffer):
+    """A device that remembers the size of every chunk written to it"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunk_sizes = []
+        self.open(QtCore.QIODevice.WriteOnly)
+
+    def writeData(self, data) -> int:
+        self.chunk_sizes.append(len(data))
+        return super().writeData(data)
+
+
+def test_response_streamer_writes_body_in_chunks(
+    qgis_application, mock_geonode_server, qtbot
+):
+    manager = qgis.core.QgsNetworkAccessManager.instance()
+    reply = manager.get(
+        QtNetwork.QNetworkRequest(
+            QtCore.QUrl("http://localhost:9000/api/v2/datasets/1/")
+        )
+    )
+    device = _RecordingDevice()
+    streamer = network.ResponseStreamer(reply, device, buffer_size=256)
+    with qtbot.waitSignal(reply.finished, timeout=10000):
+        pass
+    assert streamer.finish() is None
+    assert len(device.chunk_sizes) > 1
+    assert max(device.chunk_sizes) <= 256
+    assert reply.bytesAvailable() == 0
+    assert streamer.bytes_written == len(device.data())
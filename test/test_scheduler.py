@@ -0,0 +1,52 @@
+from qgis_geonode import scheduler
+from qgis_geonode.network import RequestPriority
+
+
+def test_scheduler_limits_concurrent_requests_per_host():
+    dispatched = []
+    request_scheduler = scheduler.RequestScheduler(max_concurrent_requests_per_host=1)
+    request_scheduler.submit(
+        "a.com", RequestPriority.INTERACTIVE, lambda: dispatched.append(1)
+    )
+    request_scheduler.submit(
+        "a.com", RequestPriority.INTERACTIVE, lambda: dispatched.append(2)
+    )
+    request_scheduler.submit(
+        "b.com", RequestPriority.INTERACTIVE, lambda: dispatched.append(3)
+    )
+    assert dispatched == [1, 3]
+    assert request_scheduler.queue_depth("a.com") == 1
+    request_scheduler.release("a.com")
+    assert dispatched == [1, 3, 2]
+    assert request_scheduler.stats()["a.com"].dispatched == 2
+
+
+def test_scheduler_dispatches_queued_requests_by_priority():
+    dispatched = []
+    request_scheduler = scheduler.RequestScheduler(max_concurrent_requests_per_host=1)
+    request_scheduler.submit("a.com", RequestPriority.INTERACTIVE, lambda: None)
+    thumbnail = request_scheduler.submit(
+        "a.com", RequestPriority.THUMBNAIL, lambda: dispatched.append("thumbnail")
+    )
+    request_scheduler.submit(
+        "a.com", RequestPriority.DETAIL, lambda: dispatched.append("detail")
+    )
+    request_scheduler.submit(
+        "a.com", RequestPriority.INTERACTIVE, lambda: dispatched.append("search")
+    )
+    assert request_scheduler.discard(thumbnail)
+    request_scheduler.release("a.com")
+    request_scheduler.release("a.com")
+    request_scheduler.release("a.com")
+    assert dispatched == ["search", "detail"]
+    assert request_scheduler.queue_depth() == 0
+
+
+def test_scheduler_is_busy():
+    request_scheduler = scheduler.RequestScheduler(max_concurrent_requests_per_host=1)
+    assert not request_scheduler.is_busy("a.com")
+    request_scheduler.submit("a.com", RequestPriority.INTERACTIVE, lambda: None)
+    assert request_scheduler.is_busy("a.com")
+    assert not request_scheduler.is_busy("b.com")
+    request_scheduler.release("a.com")
+    assert not request_scheduler.is_busy("a.com")
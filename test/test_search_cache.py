@@ -0,0 +1,51 @@
+import time
+
+from qgis_geonode.apiclient import models, search_cache
+
+
+def _build_page(current_page: int = 1) -> search_cache.SearchPage:
+    return search_cache.SearchPage(
+        brief_datasets=[],
+        pagination_info=models.GeonodePaginationInfo(
+            total_records=30, current_page=current_page, page_size=10
+        ),
+    )
+
+
+def test_search_page_cache_evicts_least_recently_used_pages():
+    cache = search_cache.SearchPageCache(max_pages=2, ttl=60)
+    first_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=1")
+    second_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=2")
+    third_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=3")
+    cache.store(first_key, _build_page(1))
+    cache.store(second_key, _build_page(2))
+    assert cache.get(first_key) is not None
+    cache.store(third_key, _build_page(3))
+    assert cache.get(second_key) is None
+    assert cache.get(first_key).pagination_info.current_page == 1
+    assert cache.get(third_key).pagination_info.current_page == 3
+
+
+def test_search_page_cache_serves_stale_pages_until_they_expire():
+    cache = search_cache.SearchPageCache(max_pages=2, ttl=60, max_stale=60)
+    fresh_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=1")
+    stale_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=2")
+    expired_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=3")
+    for key, age in ((fresh_key, 0), (stale_key, 61), (expired_key, 121)):
+        page = _build_page()
+        page.fetched_at = time.monotonic() - age
+        cache.store(key, page)
+    assert not cache.is_stale(cache.get(fresh_key))
+    assert cache.is_stale(cache.get(stale_key))
+    assert cache.get(expired_key) is None
+
+
+def test_search_page_cache_clear_connection():
+    cache = search_cache.SearchPageCache(max_pages=10, ttl=60)
+    first_key = ("http://a.com", "", "http://a.com/api/v2/datasets/?page=1")
+    second_key = ("http://b.com", "", "http://b.com/api/v2/datasets/?page=1")
+    cache.store(first_key, _build_page())
+    cache.store(second_key, _build_page())
+    cache.clear("http://a.com")
+    assert cache.get(first_key) is None
+    assert cache.get(second_key) is not None
@@ -0,0 +1,63 @@
+import time
+
+from qgis_geonode import style_cache
+
+_NAMED_LAYER = "<NamedLayer><Name>fake</Name></NamedLayer>"
+
+
+def test_style_cache_is_keyed_by_auth_config(tmp_path):
+    cache = style_cache.StyleCache(tmp_path / "cache.sqlite")
+    cache.store("http://fake.com/style.sld", "abc", '"1"', _NAMED_LAYER)
+    cached = cache.get("http://fake.com/style.sld", "abc")
+    assert cached.etag == '"1"'
+    assert cached.named_layer == _NAMED_LAYER
+    assert cache.get("http://fake.com/style.sld") is None
+
+
+def test_style_cache_revalidation_makes_styles_fresh_again(tmp_path):
+    cache = style_cache.StyleCache(tmp_path / "cache.sqlite", freshness=60)
+    cache.store("http://fake.com/style.sld", None, '"1"', _NAMED_LAYER)
+    cached = cache.get("http://fake.com/style.sld")
+    assert cache.is_fresh(cached)
+    cached.fetched_at = time.time() - 61
+    assert not cache.is_fresh(cached)
+    cache.record_revalidation("http://fake.com/style.sld")
+    assert cache.is_fresh(cache.get("http://fake.com/style.sld"))
+
+
+def test_disabled_style_cache_stores_nothing(tmp_path):
+    cache = style_cache.StyleCache(tmp_path / "cache.sqlite", enabled=False)
+    cache.store("http://fake.com/style.sld", None, '"1"', _NAMED_LAYER)
+    cache.enabled = True
+    assert cache.get("http://fake.com/style.sld") is None
+
+
+def test_style_cache_invalidates_single_style(tmp_path):
+    cache = style_cache.StyleCache(tmp_path / "cache.sqlite")
+    cache.store("http://fake.com/style1.sld", None, '"1"', _NAMED_LAYER)
+    cache.store("http://fake.com/style2.sld", None, '"1"', _NAMED_LAYER)
+    cache.invalidate("http://fake.com/style1.sld")
+    assert cache.get("http://fake.com/style1.sld") is None
+    assert cache.get("http://fake.com/style2.sld") is not None
+
+
+def test_style_cache_evicts_least_recently_used_styles(tmp_path):
+    cache = style_cache.StyleCache(
+        tmp_path / "cache.sqlite", max_size=2 * len(_NAMED_LAYER)
+    )
+    cache.store("http://fake.com/style1.sld", None, '"1"', _NAMED_LAYER)
+    time.sleep(0.01)
+    cache.store("http://fake.com/style2.sld", None, '"1"', _NAMED_LAYER)
+    time.sleep(0.01)
+    cache.get("http://fake.com/style1.sld")
+    time.sleep(0.01)
+    cache.store("http://fake.com/style3.sld", None, '"1"', _NAMED_LAYER)
+    assert cache.get("http://fake.com/style1.sld") is not None
+    assert cache.get("http://fake.com/style2.sld") is None
+    assert cache.get("http://fake.com/style3.sld") is not None
+
+
+def test_style_cache_skips_styles_larger_than_its_budget(tmp_path):
+    cache = style_cache.StyleCache(tmp_path / "cache.sqlite", max_size=10)
+    cache.store("http://fake.com/style.sld", None, '"1"', _NAMED_LAYER)
+    assert cache.get("http://fake.com/style.sld") is None
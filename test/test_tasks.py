@@ -0,0 +1,145 @@
+import json
+
+import pytest
+from qgis.PyQt import QtCore
+
+from qgis_geonode import network
+from qgis_geonode.tasks import (
+    network_task,
+    tasks,
+)
+
+
+@pytest.mark.parametrize(
+    "upload_timeout, expected",
+    [
+        pytest.param(None, 10 * 60 * 1000, id="default"),
+        pytest.param(30 * 60 * 1000, 30 * 60 * 1000, id="explicit"),
+    ],
+)
+def test_layer_uploader_task_upload_timeout(qgis_application, upload_timeout, expected):
+    extra_kwargs = {"upload_timeout": upload_timeout} if upload_timeout else {}
+    task = tasks.LayerUploaderTask(
+        None,
+        QtCore.QUrl("http://fake.com/api/v2/uploads/upload/"),
+        allow_public_access=False,
+        authcfg="",
+        network_task_timeout=5000,
+        **extra_kwargs,
+    )
+    upload_request = task.requests_to_perform[0]
+    assert upload_request.timeout == expected
+    assert task._get_request_timeout(upload_request) == expected
+
+
+def test_network_task_batch_deadline_is_only_extended_by_retries(qgis_application):
+    task = network_task.NetworkRequestTask(
+        [network.RequestToPerform(QtCore.QUrl("http://fake.com"))],
+        network_task_timeout=5000,
+        retry_policy=network.RetryPolicy(time_budget=20000),
+    )
+    assert task._get_batch_timeout() == 5000 + network_task._TIMEOUT_GRACE_PERIOD
+    task._extend_batch_deadline(task._get_batch_timeout())
+    assert task._get_remaining_batch_time() <= task._get_batch_timeout()
+    task._extend_batch_deadline(10000)
+    assert task._get_remaining_batch_time() > task._get_batch_timeout()
+
+
+def test_async_network_task_completes_without_a_nested_event_loop(
+    qgis_application, mock_geonode_server, qtbot
+):
+    task = network_task.AsyncNetworkRequestTask(
+        [
+            network.RequestToPerform(
+                QtCore.QUrl("http://localhost:9000/api/v2/datasets/1/"),
+                use_cache=False,
+            )
+        ],
+        network_task_timeout=5000,
+    )
+    with qtbot.waitSignal(task.task_done, timeout=10000) as blocker:
+        task.start()
+    assert blocker.args == [True]
+    assert task.response_contents[0].http_status_code == 200
+    assert task not in network_task._running_async_tasks
+
+
+def test_async_network_task_cancellation_aborts_requests(
+    qgis_application, unresponsive_server, qtbot
+):
+    task = network_task.AsyncNetworkRequestTask(
+        [network.RequestToPerform(QtCore.QUrl(unresponsive_server), use_cache=False)],
+        network_task_timeout=5000,
+    )
+    task.start()
+    qtbot.waitUntil(lambda: len(task._pending_replies) > 0, timeout=5000)
+    with qtbot.waitSignal(task.task_done, timeout=1000) as blocker:
+        task.cancel()
+    assert blocker.args == [False]
+    assert task.response_contents == [None]
+    assert task.timed_out_requests == set()
+    assert task not in network_task._running_async_tasks
+
+
+def test_async_network_task_aborts_requests_past_their_deadline(
+    qgis_application, unresponsive_server, qtbot
+):
+    task = network_task.AsyncNetworkRequestTask(
+        [
+            network.RequestToPerform(
+                QtCore.QUrl(unresponsive_server), use_cache=False, timeout=200
+            )
+        ],
+        network_task_timeout=5000,
+    )
+    with qtbot.waitSignal(task.task_done, timeout=5000) as blocker:
+        task.start()
+    assert blocker.args == [False]
+    assert task.timed_out_requests == {0}
+    assert task.response_contents == [None]
+
+
+def test_network_task_response_handler_processes_responses(
+    qgis_application, mock_geonode_server
+):
+    handled = []
+
+    def handle_responses(response_contents):
+        handled.append(response_contents)
+        return json.loads(response_contents[0].response_body.data())["dataset"]["pk"]
+
+    task = network_task.NetworkRequestTask(
+        [
+            network.RequestToPerform(
+                QtCore.QUrl("http://localhost:9000/api/v2/datasets/1/"),
+                use_cache=False,
+            )
+        ],
+        network_task_timeout=5000,
+        response_handler=handle_responses,
+    )
+    assert task.run()
+    assert handled == [task.response_contents]
+    assert task.processed_response == "184"
+
+
+def test_network_task_streams_response_body_to_output_device(
+    qgis_application, mock_geonode_server
+):
+    output_device = QtCore.QBuffer()
+    output_device.open(QtCore.QIODevice.WriteOnly)
+    task = network_task.NetworkRequestTask(
+        [
+            network.RequestToPerform(
+                QtCore.QUrl("http://localhost:9000/api/v2/datasets/1/"),
+                output_device=output_device,
+            )
+        ],
+        network_task_timeout=5000,
+    )
+    assert task.run()
+    parsed = task.response_contents[0]
+    assert parsed.http_status_code == 200
+    # the body went to the device rather than being kept in memory
+    assert parsed.response_body.isEmpty()
+    assert json.loads(output_device.data().data())["dataset"]["pk"] == "184"